@@ -15,9 +15,11 @@
 #    under the License.
 
 """Metadata request handler."""
+import collections
 import hashlib
 import hmac
 import os
+import time
 
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -59,7 +61,19 @@ metadata_opts = [
                     'this should improve response times of the metadata API '
                     'when under heavy load. Higher values may increase memory'
                     'usage and result in longer times for host metadata '
-                    'changes to take effect.')
+                    'changes to take effect.'),
+    cfg.IntOpt('metadata_cache_local_size',
+               default=0,
+               min=0,
+               help='Number of entries of the in-process cache of the '
+                    'metadata API, kept in front of the cache configured '
+                    'in the [cache] section. It holds the metadata of the '
+                    'most recent instances along with the documents already '
+                    'rendered for each path, so that repeated requests from '
+                    'an instance, e.g. by cloud-init during a boot storm, '
+                    'neither reload the instance nor render the documents '
+                    'again. Entries expire after metadata_cache_expiration '
+                    'seconds. 0 disables the in-process cache.'),
 ]
 
 CONF.register_opts(metadata_proxy_opts, 'neutron')
@@ -68,19 +82,70 @@ CONF.register_opts(metadata_opts)
 LOG = logging.getLogger(__name__)
 
 
+class LocalMetadataCache(object):
+    """In-process LRU cache with a time to live for its entries.
+
+    The least recently used entries are evicted once there are more than
+    max_entries of them.
+    """
+
+    def __init__(self, max_entries, expiration_time):
+        self.max_entries = max_entries
+        self.expiration_time = expiration_time
+        self._entries = collections.OrderedDict()
+        self.stats = collections.Counter()
+
+    def get(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None or entry[0] < time.time():
+            self.stats['misses'] += 1
+            return None
+        self._entries[key] = entry
+        self.stats['hits'] += 1
+        return entry[1]
+
+    def set(self, key, value):
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+        self._entries[key] = (time.time() + self.expiration_time, value)
+
+
 class MetadataRequestHandler(wsgi.Application):
     """Serve metadata."""
 
     def __init__(self):
         self._cache = cache_utils.get_client(
                 expiration_time=CONF.metadata_cache_expiration)
+        self._local_cache = None
+        if (CONF.metadata_cache_local_size > 0 and
+                CONF.metadata_cache_expiration > 0):
+            self._local_cache = LocalMetadataCache(
+                CONF.metadata_cache_local_size,
+                CONF.metadata_cache_expiration)
+
+    def _get_cached_metadata(self, cache_key):
+        if self._local_cache is not None:
+            data = self._local_cache.get(cache_key)
+            if data:
+                return data
+        data = self._cache.get(cache_key)
+        if data and self._local_cache is not None:
+            self._local_cache.set(cache_key, data)
+        return data
+
+    def _set_cached_metadata(self, cache_key, data):
+        if CONF.metadata_cache_expiration > 0:
+            self._cache.set(cache_key, data)
+            if self._local_cache is not None:
+                self._local_cache.set(cache_key, data)
 
     def get_metadata_by_remote_address(self, address):
         if not address:
             raise exception.FixedIpNotFoundForAddress(address=address)
 
         cache_key = 'metadata-{0!s}'.format(address)
-        data = self._cache.get(cache_key)
+        data = self._get_cached_metadata(cache_key)
         if data:
             LOG.debug("Using cached metadata for %s", address)
             return data
@@ -90,14 +155,13 @@ class MetadataRequestHandler(wsgi.Application):
         except exception.NotFound:
             return None
 
-        if CONF.metadata_cache_expiration > 0:
-            self._cache.set(cache_key, data)
+        self._set_cached_metadata(cache_key, data)
 
         return data
 
     def get_metadata_by_instance_id(self, instance_id, address):
         cache_key = 'metadata-{0!s}'.format(instance_id)
-        data = self._cache.get(cache_key)
+        data = self._get_cached_metadata(cache_key)
         if data:
             LOG.debug("Using cached metadata for instance %s", instance_id)
             return data
@@ -107,11 +171,37 @@ class MetadataRequestHandler(wsgi.Application):
         except exception.NotFound:
             return None
 
-        if CONF.metadata_cache_expiration > 0:
-            self._cache.set(cache_key, data)
+        self._set_cached_metadata(cache_key, data)
 
         return data
 
+    def _render(self, meta_data, path):
+        """Returns the body and the content type of the document at path."""
+        try:
+            data = meta_data.lookup(path)
+        except base.InvalidMetadataPath:
+            raise webob.exc.HTTPNotFound()
+
+        if callable(data):
+            return data
+
+        return base.ec2_md_print(data), meta_data.get_mimetype()
+
+    def _render_cached(self, meta_data, path):
+        if self._local_cache is None:
+            return self._render(meta_data, path)
+
+        # NOTE: The documents of an instance are cached as long as its
+        # metadata would be, as they are rendered from it.
+        cache_key = ('document', meta_data.instance.uuid, meta_data.address,
+                     os.path.normpath(path))
+        document = self._local_cache.get(cache_key)
+        if document is None:
+            document = self._render(meta_data, path)
+            if not callable(document):
+                self._local_cache.set(cache_key, document)
+        return document
+
     @webob.dec.wsgify(RequestClass=wsgi.Request)
     def __call__(self, req):
         if os.path.normpath(req.path_info) == "/":
@@ -136,21 +226,17 @@ class MetadataRequestHandler(wsgi.Application):
         if meta_data is None:
             raise webob.exc.HTTPNotFound()
 
-        try:
-            data = meta_data.lookup(req.path_info)
-        except base.InvalidMetadataPath:
-            raise webob.exc.HTTPNotFound()
-
-        if callable(data):
-            return data(req, meta_data)
+        document = self._render_cached(meta_data, req.path_info)
+        if callable(document):
+            return document(req, meta_data)
 
-        resp = base.ec2_md_print(data)
+        resp, content_type = document
         if isinstance(resp, six.text_type):
             req.response.text = resp
         else:
             req.response.body = resp
 
-        req.response.content_type = meta_data.get_mimetype()
+        req.response.content_type = content_type
         return req.response
 
     def _handle_remote_ip_request(self, req):
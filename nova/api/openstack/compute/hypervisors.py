@@ -39,8 +39,9 @@ class HypervisorsController(wsgi.Controller):
         super(HypervisorsController, self).__init__()
 
     def _view_hypervisor(self, hypervisor, service, detail, servers=None,
-                         **kwargs):
-        alive = self.servicegroup_api.service_is_up(service)
+                         alive=None, **kwargs):
+        if alive is None:
+            alive = self.servicegroup_api.service_is_up(service)
         hyp_dict = {
             'id': hypervisor.id,
             'hypervisor_hostname': hypervisor.hypervisor_hostname,
@@ -74,18 +75,31 @@ class HypervisorsController(wsgi.Controller):
 
         return hyp_dict
 
+    def _view_hypervisors(self, context, compute_nodes, detail):
+        # NOTE: Get all the compute services, and check whether they are up,
+        # at once instead of once per hypervisor.
+        services_by_host = {
+            service.host: service for service in
+            self.host_api.service_get_all(
+                context, filters={'binary': 'nova-compute'})}
+        services = [services_by_host.get(hyp.host) or
+                    self.host_api.service_get_by_compute_host(context,
+                                                              hyp.host)
+                    for hyp in compute_nodes]
+        up_services = set(service.id for service in
+                          self.servicegroup_api.get_up_services(services))
+        return [self._view_hypervisor(hyp, service, detail,
+                                      alive=service.id in up_services)
+                for hyp, service in zip(compute_nodes, services)]
+
     @extensions.expected_errors(())
     def index(self, req):
         context = req.environ['nova.context']
         authorize(context)
         compute_nodes = self.host_api.compute_node_get_all(context)
         req.cache_db_compute_nodes(compute_nodes)
-        return dict(hypervisors=[self._view_hypervisor(
-                                 hyp,
-                                 self.host_api.service_get_by_compute_host(
-                                     context, hyp.host),
-                                 False)
-                                 for hyp in compute_nodes])
+        return dict(hypervisors=self._view_hypervisors(context, compute_nodes,
+                                                       False))
 
     @extensions.expected_errors(())
     def detail(self, req):
@@ -93,12 +107,8 @@ class HypervisorsController(wsgi.Controller):
         authorize(context)
         compute_nodes = self.host_api.compute_node_get_all(context)
         req.cache_db_compute_nodes(compute_nodes)
-        return dict(hypervisors=[self._view_hypervisor(
-                                 hyp,
-                                 self.host_api.service_get_by_compute_host(
-                                     context, hyp.host),
-                                 True)
-                                 for hyp in compute_nodes])
+        return dict(hypervisors=self._view_hypervisors(context, compute_nodes,
+                                                       True))
 
     @extensions.expected_errors(404)
     def show(self, req, id):
@@ -62,8 +62,7 @@ class ServiceController(object):
 
         return services
 
-    def _get_service_detail(self, svc, detailed):
-        alive = self.servicegroup_api.service_is_up(svc)
+    def _get_service_detail(self, svc, detailed, alive):
         state = (alive and "up") or "down"
         active = 'enabled'
         if svc['disabled']:
@@ -81,9 +80,12 @@ class ServiceController(object):
 
     def _get_services_list(self, req, detailed):
         services = self._get_services(req)
+        up_services = set(svc['id'] for svc in
+                          self.servicegroup_api.get_up_services(services))
         svcs = []
         for svc in services:
-            svcs.append(self._get_service_detail(svc, detailed))
+            svcs.append(self._get_service_detail(svc, detailed,
+                                                 svc['id'] in up_services))
 
         return svcs
 
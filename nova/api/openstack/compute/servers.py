@@ -41,6 +41,7 @@ from nova import exception
 from nova.i18n import _
 from nova.i18n import _LW
 from nova.image import glance
+from nova.network.security_group import openstack_driver
 from nova import objects
 from nova import utils
 
@@ -57,6 +58,7 @@ CONF.import_opt('extensions_whitelist', 'nova.api.openstack',
 
 LOG = logging.getLogger(__name__)
 authorize = extensions.os_compute_authorizer(ALIAS)
+soft_authorize = extensions.os_compute_soft_authorizer(ALIAS)
 
 
 class ServersController(wsgi.Controller):
@@ -400,7 +402,7 @@ class ServersController(wsgi.Controller):
             # merge our expected attrs with what the view builder needs for
             # showing details
             expected_attrs = self._view_builder.get_show_expected_attrs(
-                                                                expected_attrs)
+                expected_attrs + self._get_extensions_expected_attrs(req))
 
         try:
             instance_list = self.compute_api.get_all(elevated or context,
@@ -424,6 +426,29 @@ class ServersController(wsgi.Controller):
         req.cache_db_instances(instance_list)
         return response
 
+    def _get_extensions_expected_attrs(self, req):
+        """Returns the attributes the enabled extensions read on each server
+
+        The extensions which extend the server details are given the
+        instances cached in the request. Joining the attributes they need in
+        the query of the instances means a page of servers costs a fixed
+        number of database queries, instead of lazy-loading them once per
+        instance.
+        """
+        context = req.environ['nova.context']
+        loaded_extensions = self.extension_info.get_extensions()
+        expected_attrs = []
+        if ('os-extended-server-attributes' in loaded_extensions and
+                api_version_request.is_supported(req, min_version='2.16') and
+                soft_authorize(context, action='show:host_status')):
+            # NOTE: The host status of each server is computed from the
+            # nova-compute service of its host.
+            expected_attrs.append('services')
+        if ('os-security-groups' in loaded_extensions and
+                not openstack_driver.is_neutron_security_groups()):
+            expected_attrs.append('security_groups')
+        return expected_attrs
+
     def _get_server(self, context, req, instance_uuid, is_detail=False):
         """Utility function for looking up an instance by uuid.
 
@@ -63,8 +63,7 @@ class ServiceController(wsgi.Controller):
 
         return _services
 
-    def _get_service_detail(self, svc, additional_fields):
-        alive = self.servicegroup_api.service_is_up(svc)
+    def _get_service_detail(self, svc, additional_fields, alive):
         state = (alive and "up") or "down"
         active = 'enabled'
         if svc['disabled']:
@@ -85,7 +84,12 @@ class ServiceController(wsgi.Controller):
 
     def _get_services_list(self, req, additional_fields=()):
         _services = self._get_services(req)
-        return [self._get_service_detail(svc, additional_fields)
+        # NOTE: Check whether all the services are up at once instead of
+        # once per service.
+        up_services = set(svc['id'] for svc in
+                          self.servicegroup_api.get_up_services(_services))
+        return [self._get_service_detail(svc, additional_fields,
+                                         svc['id'] in up_services)
                 for svc in _services]
 
     def _enable(self, body, context):
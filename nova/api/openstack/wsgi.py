@@ -27,6 +27,7 @@ import webob
 
 from nova.api.openstack import api_version_request as api_version
 from nova.api.openstack import versioned_method
+import nova.conf
 from nova import exception
 from nova import i18n
 from nova.i18n import _
@@ -36,6 +37,8 @@ from nova import utils
 from nova import wsgi
 
 
+CONF = nova.conf.CONF
+
 LOG = logging.getLogger(__name__)
 
 _SUPPORTED_CONTENT_TYPES = (
@@ -296,6 +299,26 @@ class JSONDictSerializer(ActionDispatcher):
     def default(self, data):
         return six.text_type(jsonutils.dumps(data))
 
+    def serialize_iter(self, data):
+        """Serializes a dict of collections one item at a time.
+
+        Yields the same JSON document as serialize(), as utf-8 encoded
+        chunks, so that the whole body never has to be held in memory.
+        """
+        yield b'{'
+        for index, (key, value) in enumerate(data.items()):
+            prefix = ', ' if index else ''
+            prefix += jsonutils.dumps(key) + ': '
+            if not isinstance(value, (list, tuple)):
+                yield utils.utf8(prefix + jsonutils.dumps(value))
+                continue
+            yield utils.utf8(prefix + '[')
+            for item_index, item in enumerate(value):
+                item = jsonutils.dumps(item)
+                yield utils.utf8(', ' + item if item_index else item)
+            yield b']'
+        yield b'}'
+
 
 def response(code):
     """Attaches response code to a method.
@@ -352,10 +375,16 @@ class ResponseObject(object):
 
         serializer = self.serializer
 
-        body = None
-        if self.obj is not None:
-            body = serializer.serialize(self.obj)
-        response = webob.Response(body=body)
+        if self._is_streamable():
+            # NOTE: Without a Content-Length, the body is sent with chunked
+            # transfer encoding as it is being serialized.
+            response = webob.Response(
+                app_iter=serializer.serialize_iter(self.obj))
+        else:
+            body = None
+            if self.obj is not None:
+                body = serializer.serialize(self.obj)
+            response = webob.Response(body=body)
         if response.headers.get('Content-Length'):
             # NOTE(andreykurilin): we need to encode 'Content-Length' header,
             # since webob.Response auto sets it if "body" attr is presented.
@@ -368,6 +397,17 @@ class ResponseObject(object):
         response.headers['Content-Type'] = utils.utf8(content_type)
         return response
 
+    def _is_streamable(self):
+        """Whether the wrapped object is a large collection to stream."""
+
+        threshold = CONF.wsgi.streaming_response_threshold
+        if (not threshold or not isinstance(self.obj, dict) or
+                not hasattr(self.serializer, 'serialize_iter')):
+            return False
+        return any(isinstance(value, (list, tuple)) and
+                   len(value) >= threshold
+                   for value in self.obj.values())
+
     @property
     def code(self):
         """Retrieve the response status."""
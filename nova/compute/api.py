@@ -3567,37 +3567,38 @@ class API(base.Base):
                 context, instances_by_host[host], events_by_host[host])
 
     def get_instance_host_status(self, instance):
-        if instance.host:
-            try:
-                service = [service for service in instance.services if
-                           service.binary == 'nova-compute'][0]
-                if service.forced_down:
-                    host_status = fields_obj.HostStatus.DOWN
-                elif service.disabled:
-                    host_status = fields_obj.HostStatus.MAINTENANCE
-                else:
-                    alive = self.servicegroup_api.service_is_up(service)
-                    host_status = ((alive and fields_obj.HostStatus.UP) or
-                                   fields_obj.HostStatus.UNKNOWN)
-            except IndexError:
-                host_status = fields_obj.HostStatus.NONE
-        else:
-            host_status = fields_obj.HostStatus.NONE
-        return host_status
+        return self.get_instances_host_statuses([instance])[instance.uuid]
 
     def get_instances_host_statuses(self, instance_list):
+        services = dict()
+        for instance in instance_list:
+            if instance.host and instance.host not in services:
+                services[instance.host] = next(
+                    (service for service in instance.services
+                     if service.binary == 'nova-compute'), None)
+        # NOTE: Check whether the compute services are up all at once, which
+        # is a single request with the memcached servicegroup driver.
+        up_hosts = set(service.host for service in
+                       self.servicegroup_api.get_up_services(
+                           [service for service in services.values()
+                            if service and not service.disabled]))
         host_status_dict = dict()
+        for host, service in services.items():
+            if service is None:
+                host_status = fields_obj.HostStatus.NONE
+            elif service.forced_down:
+                host_status = fields_obj.HostStatus.DOWN
+            elif service.disabled:
+                host_status = fields_obj.HostStatus.MAINTENANCE
+            elif service.host in up_hosts:
+                host_status = fields_obj.HostStatus.UP
+            else:
+                host_status = fields_obj.HostStatus.UNKNOWN
+            host_status_dict[host] = host_status
         host_statuses = dict()
         for instance in instance_list:
-            if instance.host:
-                if instance.host not in host_status_dict:
-                    host_status = self.get_instance_host_status(instance)
-                    host_status_dict[instance.host] = host_status
-                else:
-                    host_status = host_status_dict[instance.host]
-            else:
-                host_status = fields_obj.HostStatus.NONE
-            host_statuses[instance.uuid] = host_status
+            host_statuses[instance.uuid] = host_status_dict.get(
+                instance.host, fields_obj.HostStatus.NONE)
         return host_statuses
 
 
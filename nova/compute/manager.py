@@ -66,6 +66,7 @@ from nova.compute import task_states
 from nova.compute import utils as compute_utils
 from nova.compute import vm_states
 from nova import conductor
+from nova.conductor import batch as conductor_batch
 import nova.conf
 from nova import consoleauth
 import nova.context
@@ -166,6 +167,20 @@ interval_opts = [
                default=60,
                help="Number of seconds between instance network information "
                     "cache updates"),
+    cfg.IntOpt('heal_instance_info_cache_batch_size',
+               min=1,
+               default=1,
+               help='Number of instances whose network information cache is '
+                    'updated on each run of the periodic healing task. When '
+                    'greater than 1, the network API may list the resources '
+                    'of the whole batch at once.'),
+    cfg.IntOpt('heal_instance_info_cache_min_age',
+               min=0,
+               default=0,
+               help='Number of seconds after an update of the network '
+                    'information cache of an instance during which the '
+                    'periodic healing task skips that instance. 0 always '
+                    'updates the cache.'),
     cfg.IntOpt('reclaim_instance_interval',
                min=0,
                default=0,
@@ -671,7 +686,7 @@ class ComputeVirtAPI(virtapi.VirtAPI):
 class ComputeManager(manager.Manager):
     """Manages the running instances from creation to destruction."""
 
-    target = messaging.Target(version='4.11')
+    target = messaging.Target(version='4.12')
 
     # How long to wait in seconds before re-issuing a shutdown
     # signal to an instance during power off.  The overall
@@ -1866,7 +1881,21 @@ class ComputeManager(manager.Manager):
             # for a while and we want to make sure that nothing else tries
             # to do anything with this instance while we wait.
             with self._build_semaphore:
-                self._do_build_and_run_instance(*args, **kwargs)
+                with conductor_batch.object_action_batch(context) as batch:
+                    self._do_build_and_run_instance(*args, **kwargs)
+                    # NOTE: Nothing waits for this greenthread, so an error
+                    # saving the queued changes is logged here.
+                    try:
+                        batch.flush()
+                    except Exception:
+                        LOG.exception(_LE('Failed to save the changes made '
+                                          'to the instance while building '
+                                          'it'), instance=instance)
+                LOG.debug('Made %(calls)d calls to nova-conductor for '
+                          '%(actions)d object actions while building the '
+                          'instance', {'calls': batch.calls,
+                                       'actions': batch.actions},
+                          instance=instance)
 
         # NOTE(danms): We spawn here to return the RPC worker thread back to
         # the pool. Since what follows could take a really long time, we don't
@@ -5717,12 +5746,12 @@ class ComputeManager(manager.Manager):
         spacing=CONF.heal_instance_info_cache_interval)
     def _heal_instance_info_cache(self, context):
         """Called periodically.  On every call, try to update the
-        info_cache's network information for another instance by
+        info_cache's network information for other instances by
         calling to the network manager.
 
         This is implemented by keeping a cache of uuids of instances
-        that live on this host.  On each call, we pop one off of a
-        list, pull the DB record, and try the call to the network API.
+        that live on this host.  On each call, we pop a batch off of a
+        list, pull the DB records, and try the call to the network API.
         If anything errors don't fail, as it's possible the instance
         has been deleted, etc.
         """
@@ -5730,16 +5759,23 @@ class ComputeManager(manager.Manager):
         if not heal_interval:
             return
 
+        batch_size = CONF.heal_instance_info_cache_batch_size
         instance_uuids = getattr(self, '_instance_uuids_to_heal', [])
-        instance = None
+        instances = []
+        num_fresh = 0
 
         LOG.debug('Starting heal instance info cache')
 
         if not instance_uuids:
             # The list of instances to heal is empty so rebuild it
             LOG.debug('Rebuilding the list of instances to heal')
+            # The info cache is only needed to skip the recently updated ones.
+            expected_attrs = []
+            if CONF.heal_instance_info_cache_min_age:
+                expected_attrs.append('info_cache')
             db_instances = objects.InstanceList.get_by_host(
-                context, self.host, expected_attrs=[], use_slave=True)
+                context, self.host, expected_attrs=expected_attrs,
+                use_slave=True)
             for inst in db_instances:
                 # We don't want to refresh the cache for instances
                 # which are building or deleting so don't put them
@@ -5754,53 +5790,82 @@ class ComputeManager(manager.Manager):
                               'because it is being deleted.', instance=inst)
                     continue
 
-                if not instance:
-                    # Save the first one we find so we don't
-                    # have to get it again
-                    instance = inst
+                if len(instances) < batch_size:
+                    if self._info_cache_is_fresh(inst):
+                        LOG.debug('Skipping network cache update for '
+                                  'instance because it was updated '
+                                  'recently.', instance=inst)
+                        num_fresh += 1
+                        continue
+                    # Save the first ones we find so we don't
+                    # have to get them again
+                    instances.append(inst)
                 else:
                     instance_uuids.append(inst['uuid'])
 
             self._instance_uuids_to_heal = instance_uuids
-        else:
-            # Find the next valid instance on the list
-            while instance_uuids:
-                try:
-                    inst = objects.Instance.get_by_uuid(
-                            context, instance_uuids.pop(0),
-                            expected_attrs=['system_metadata', 'info_cache',
-                                            'flavor'],
-                            use_slave=True)
-                except exception.InstanceNotFound:
-                    # Instance is gone.  Try to grab another.
-                    continue
 
-                # Check the instance hasn't been migrated
-                if inst.host != self.host:
-                    LOG.debug('Skipping network cache update for instance '
-                              'because it has been migrated to another '
-                              'host.', instance=inst)
-                # Check the instance isn't being deleting
-                elif inst.task_state == task_states.DELETING:
-                    LOG.debug('Skipping network cache update for instance '
-                              'because it is being deleted.', instance=inst)
-                else:
-                    instance = inst
-                    break
+        # Find the next valid instances on the list
+        while instance_uuids and len(instances) < batch_size:
+            try:
+                inst = objects.Instance.get_by_uuid(
+                        context, instance_uuids.pop(0),
+                        expected_attrs=['system_metadata', 'info_cache',
+                                        'flavor'],
+                        use_slave=True)
+            except exception.InstanceNotFound:
+                # Instance is gone.  Try to grab another.
+                continue
 
-        if instance:
+            # Check the instance hasn't been migrated
+            if inst.host != self.host:
+                LOG.debug('Skipping network cache update for instance '
+                          'because it has been migrated to another '
+                          'host.', instance=inst)
+            # Check the instance isn't being deleting
+            elif inst.task_state == task_states.DELETING:
+                LOG.debug('Skipping network cache update for instance '
+                          'because it is being deleted.', instance=inst)
+            elif self._info_cache_is_fresh(inst):
+                LOG.debug('Skipping network cache update for instance '
+                          'because it was updated recently.', instance=inst)
+                num_fresh += 1
+            else:
+                instances.append(inst)
+
+        if not instances:
+            LOG.debug("Didn't find any instances for network info cache "
+                      "update.")
+            return
+
+        kwargs = {}
+        if len(instances) > 1:
+            try:
+                prefetched = self.network_api.prefetch_instances_nw_info(
+                    context, instances)
+                if prefetched is not None:
+                    kwargs['prefetched'] = prefetched
+            except Exception:
+                LOG.warning(_LW('Failed to list the network resources of '
+                                '%d instances at once, refreshing their '
+                                'network info_cache one by one.'),
+                            len(instances), exc_info=True)
+
+        num_refreshed = 0
+        for instance in instances:
             # We have an instance now to refresh
             try:
                 # Call to network API to get instance info.. this will
                 # force an update to the instance's info_cache
-                self.network_api.get_instance_nw_info(context, instance)
+                self.network_api.get_instance_nw_info(context, instance,
+                                                      **kwargs)
                 LOG.debug('Updated the network info_cache for instance',
                           instance=instance)
+                num_refreshed += 1
             except exception.InstanceNotFound:
                 # Instance is gone.
                 LOG.debug('Instance no longer exists. Unable to refresh',
                           instance=instance)
-                return
             except exception.InstanceInfoCacheNotFound:
                 # InstanceInfoCache is gone.
                 LOG.debug('InstanceInfoCache no longer exists. '
@@ -5808,9 +5873,24 @@ class ComputeManager(manager.Manager):
             except Exception:
                 LOG.error(_LE('An error occurred while refreshing the network '
                               'cache.'), instance=instance, exc_info=True)
-        else:
-            LOG.debug("Didn't find any instances for network info cache "
-                      "update.")
+
+        LOG.debug('Refreshed the network info_cache of %(num_refreshed)d '
+                  'instances, skipped %(num_fresh)d recently updated ones, '
+                  '%(num_left)d instances left to heal.',
+                  {'num_refreshed': num_refreshed, 'num_fresh': num_fresh,
+                   'num_left': len(instance_uuids)})
+
+    @staticmethod
+    def _info_cache_is_fresh(instance):
+        min_age = CONF.heal_instance_info_cache_min_age
+        if not min_age:
+            return False
+        info_cache = instance.info_cache
+        if info_cache is None:
+            return False
+        updated_at = info_cache.updated_at or info_cache.created_at
+        return (updated_at is not None and
+                timeutils.is_newer_than(updated_at, min_age))
 
     @periodic_task.periodic_task
     def _poll_rebooting_instances(self, context):
@@ -6168,12 +6248,21 @@ class ComputeManager(manager.Manager):
         number of virtual machines known by the database, we proceed in a lazy
         loop, one database record at a time, checking if the hypervisor has the
         same power state as is in the database.
+
+        If the driver reports the power states of all its instances at once,
+        only the instances whose power state needs to be handled are synced.
         """
+        start = time.time()
         db_instances = objects.InstanceList.get_by_host(context, self.host,
                                                         expected_attrs=[],
                                                         use_slave=True)
 
-        num_vm_instances = self.driver.get_num_instances()
+        try:
+            vm_power_states = self.driver.get_power_states()
+            num_vm_instances = len(vm_power_states)
+        except NotImplementedError:
+            vm_power_states = {}
+            num_vm_instances = self.driver.get_num_instances()
         num_db_instances = len(db_instances)
 
         if num_vm_instances != num_db_instances:
@@ -6201,10 +6290,19 @@ class ComputeManager(manager.Manager):
 
             self._syncs_in_progress.pop(db_instance.uuid)
 
+        num_syncs = 0
         for db_instance in db_instances:
             # process syncs asynchronously - don't want instance locking to
             # block entire periodic task thread
             uuid = db_instance.uuid
+            # NOTE: The bulk power states are only used to skip the instances
+            # already in sync. They are read without the instance lock, so the
+            # sync reads the power state again from the driver under the lock.
+            vm_power_state = vm_power_states.get(uuid)
+            if (vm_power_state is not None and
+                    self._power_state_in_sync(db_instance, vm_power_state)):
+                continue
+            num_syncs += 1
             if uuid in self._syncs_in_progress:
                 LOG.debug('Sync already in progress for {0!s}'.format(uuid))
             else:
@@ -6212,6 +6310,38 @@ class ComputeManager(manager.Manager):
                 self._syncs_in_progress[uuid] = True
                 self._sync_power_pool.spawn_n(_sync, db_instance)
 
+        LOG.debug("Compared the power states of %(num_db_instances)s "
+                  "instances in %(seconds).3f seconds, %(num_syncs)s of them "
+                  "need to be synced.",
+                  {'num_db_instances': num_db_instances,
+                   'seconds': time.time() - start,
+                   'num_syncs': num_syncs})
+
+    @staticmethod
+    def _power_state_in_sync(db_instance, vm_power_state):
+        """Whether _sync_instance_power_state would have nothing to do.
+
+        That is the power state in the database matches the one from the
+        hypervisor, and it is the expected one for the vm_state.
+        """
+        if (db_instance.task_state is not None or
+                db_instance.power_state != vm_power_state):
+            return False
+        vm_state = db_instance.vm_state
+        if vm_state == vm_states.ACTIVE:
+            return vm_power_state == power_state.RUNNING
+        elif vm_state == vm_states.STOPPED:
+            return vm_power_state in (power_state.NOSTATE,
+                                      power_state.SHUTDOWN,
+                                      power_state.CRASHED)
+        elif vm_state == vm_states.PAUSED:
+            return vm_power_state not in (power_state.SHUTDOWN,
+                                          power_state.CRASHED)
+        elif vm_state in (vm_states.SOFT_DELETED, vm_states.DELETED):
+            return vm_power_state in (power_state.NOSTATE,
+                                      power_state.SHUTDOWN)
+        return True
+
     def _query_driver_power_state_and_sync(self, context, db_instance):
         if db_instance.task_state is not None:
             LOG.info(_LI("During sync_power_state the instance has a "
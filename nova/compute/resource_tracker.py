@@ -18,11 +18,14 @@ Track resources like memory and disk for a compute host.  Provides the
 scheduler with useful information about availability through the ComputeNode
 model.
 """
+import collections
 import copy
+import hashlib
 
 from oslo_log import log as logging
 from oslo_serialization import jsonutils
 from oslo_utils import importutils
+import six
 
 from nova.compute import claims
 from nova.compute import monitors
@@ -48,6 +51,24 @@ COMPUTE_RESOURCE_SEMAPHORE = "compute_resources"
 
 CONF.import_opt('my_ip', 'nova.netconf')
 
+# The ComputeNode fields stored as JSON text in the database, which are
+# compared by the hash of their content.
+_SERIALIZED_FIELDS = frozenset(['metrics', 'numa_topology',
+                                'pci_device_pools', 'stats',
+                                'supported_hv_specs'])
+
+
+def _strip_changes(primitive):
+    """Remove the list of changed fields from nested object primitives."""
+    if isinstance(primitive, dict):
+        primitive.pop('nova_object.changes', None)
+        for value in primitive.values():
+            _strip_changes(value)
+    elif isinstance(primitive, list):
+        for value in primitive:
+            _strip_changes(value)
+    return primitive
+
 
 def _instance_in_resize_state(instance):
     """Returns True if the instance is in one of the resizing states.
@@ -87,7 +108,12 @@ class ResourceTracker(object):
         self.monitors = monitor_handler.monitors
         self.ext_resources_handler = \
             ext_resources.ResourceHandler(CONF.compute_resources)
-        self.old_resources = objects.ComputeNode()
+        # NOTE: The value, or the hash of the content of the serialized
+        # fields, of each ComputeNode field as last saved, see
+        # _resource_change().
+        self.saved_fields = {}
+        self.save_stats = collections.Counter()
+        self._last_metrics = None
         self.scheduler_client = scheduler_client.SchedulerClient()
         self.ram_allocation_ratio = CONF.ram_allocation_ratio
         self.cpu_allocation_ratio = CONF.cpu_allocation_ratio
@@ -530,7 +556,9 @@ class ResourceTracker(object):
         metrics = self._get_host_metrics(context, self.nodename)
         # TODO(pmurray): metrics should not be a json string in ComputeNode,
         # but it is. This should be changed in ComputeNode
-        self.compute_node.metrics = jsonutils.dumps(metrics)
+        if metrics != self._last_metrics:
+            self.compute_node.metrics = jsonutils.dumps(metrics)
+            self._last_metrics = metrics
 
         # update the compute_node
         self._update(context)
@@ -628,20 +656,63 @@ class ResourceTracker(object):
                   'used_vcpus': ucpu,
                   'pci_stats': pci_stats})
 
+    def _get_field_digest(self, field):
+        """Return the value of a compute node field, or the hash of its
+        content for the fields serialized to JSON, and its size in bytes.
+        """
+        compute_node = self.compute_node
+        value = compute_node.fields[field].to_primitive(
+            compute_node, field, getattr(compute_node, field))
+        if field not in _SERIALIZED_FIELDS or value is None:
+            return value, len(six.text_type(value))
+        if not isinstance(value, six.string_types):
+            value = jsonutils.dumps(_strip_changes(value), sort_keys=True)
+        data = value.encode('utf-8')
+        return hashlib.sha1(data).hexdigest(), len(data)
+
     def _resource_change(self):
-        """Check to see if any resources have changed."""
-        if not obj_base.obj_equal_prims(self.compute_node, self.old_resources):
-            self.old_resources = copy.deepcopy(self.compute_node)
-            return True
-        return False
+        """Check to see if any resources have changed.
+
+        The fields which were set to the value they had when the compute
+        node was last saved are no longer marked as changed, so that only the
+        changed columns are written.
+
+        :returns: dict of the changed fields to their value or hash, and
+                  size, empty if no resource changed
+        """
+        changes = {}
+        unchanged = []
+        for field in self.compute_node.obj_what_changed():
+            digest = self._get_field_digest(field)
+            if (field in self.saved_fields and
+                    self.saved_fields[field] == digest[0]):
+                unchanged.append(field)
+                self.save_stats['bytes_skipped'] += digest[1]
+            else:
+                changes[field] = digest
+        if unchanged:
+            self.compute_node.obj_reset_changes(unchanged, recursive=True)
+        return changes
 
     def _update(self, context):
         """Update partial stats locally and populate them to Scheduler."""
         self._write_ext_resources(self.compute_node)
-        if not self._resource_change():
+        changes = self._resource_change()
+        if not changes:
+            self.save_stats['saves_skipped'] += 1
             return
         # Persist the stats to the Scheduler
         self.scheduler_client.update_resource_stats(self.compute_node)
+        for field, (digest, size) in six.iteritems(changes):
+            self.saved_fields[field] = digest
+            self.save_stats['bytes_written'] += size
+        self.save_stats['saves'] += 1
+        self.save_stats['fields_written'] += len(changes)
+        LOG.debug('Saved the fields %(fields)s of the compute node '
+                  '%(node)s, %(bytes)d bytes',
+                  {'fields': ', '.join(sorted(changes)),
+                   'node': self.nodename,
+                   'bytes': sum(size for digest, size in changes.values())})
         if self.pci_tracker:
             self.pci_tracker.save(context)
 
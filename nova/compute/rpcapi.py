@@ -332,6 +332,9 @@ class ComputeAPI(object):
         ... Mitaka supports messaging version 4.11. So, any changes to
         existing methods in 4.x after that point should be done so that they
         can handle the version_cap being set to 4.11
+
+        * 4.12 - Accept objects in the compact form of the
+                 NovaObjectSerializer
     '''
 
     VERSION_ALIASES = {
@@ -353,6 +356,8 @@ class ComputeAPI(object):
                                                    upgrade_level)
         serializer = objects_base.NovaObjectSerializer()
         self.client = self.get_client(target, version_cap, serializer)
+        serializer.compact = (CONF.compact_object_primitives and
+                              self.client.can_send_version('4.12'))
 
     def _determine_version_cap(self, target):
         global LAST_VERSION
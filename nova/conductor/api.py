@@ -55,6 +55,12 @@ class LocalAPI(object):
         return self._manager.object_backport_versions(context, objinst,
                                                       object_versions)
 
+    def service_report_state(self, context, service_ref):
+        """Report the state of a service using the db servicegroup."""
+        # NOTE: The database is written directly, there is no nova-conductor
+        # to collect the reports.
+        service_ref.save()
+
 
 class LocalComputeTaskAPI(object):
     def __init__(self):
@@ -127,6 +133,15 @@ class API(LocalAPI):
         self._manager = rpcapi.ConductorAPI()
         self.base_rpcapi = baserpc.BaseAPI(topic=CONF.conductor.topic)
 
+    def service_report_state(self, context, service_ref):
+        """Report the state of a service using the db servicegroup."""
+        if not self._manager.can_report_service_state():
+            service_ref.save()
+            return
+        self._manager.service_report_state(context, service_ref.id,
+                                           service_ref.report_count)
+        service_ref.obj_reset_changes(['report_count'])
+
     def wait_until_ready(self, context, early_timeout=10, early_attempts=10):
         '''Wait until a conductor service is up and running.
 
@@ -0,0 +1,147 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Batching of the object saves sent to nova-conductor."""
+
+import contextlib
+
+from oslo_log import log as logging
+from oslo_utils import excutils
+from oslo_versionedobjects import base as ovo_base
+import six
+
+import nova.conf
+from nova.i18n import _LE
+
+CONF = nova.conf.CONF
+LOG = logging.getLogger(__name__)
+
+# The objects whose save() only writes the changes made to the object and
+# returns nothing the caller needs.
+DEFERRABLE_OBJECTS = frozenset(['BlockDeviceMapping', 'Instance',
+                                'Migration'])
+
+
+def _apply_updates(objinst, updates):
+    # NOTE: This applies the updates as the remotable methods do, but leaves
+    # alone the fields changed since the save was queued, which are saved by
+    # the next save of the object.
+    changed = objinst.obj_what_changed()
+    changed_fields = set(objinst._changed_fields)
+    for key, value in six.iteritems(updates):
+        if key not in objinst.fields or key in changed:
+            continue
+        if not isinstance(value, ovo_base.VersionedObject):
+            value = objinst.fields[key].from_primitive(objinst, key, value)
+        setattr(objinst, key, value)
+    objinst._changed_fields = changed_fields
+
+
+class ObjectActionBatch(object):
+    """Queues the object saves made with a context.
+
+    The queued saves are sent to nova-conductor in a single
+    object_action_batch() call before any other call made to nova-conductor
+    with the context, and when the batch is flushed. An error raised by one
+    of the queued saves is raised by that call.
+
+    The calls made to nova-conductor with the context, and the object actions
+    they carried, are counted in calls and actions.
+
+    :param context: The context whose object saves are queued
+    :param defer: Whether to queue the saves, or only count the calls
+    """
+
+    def __init__(self, context, defer=True):
+        self.context = context
+        self.defer = defer
+        self.calls = 0
+        self.actions = 0
+        self._conductor = None
+        self._pending = []
+
+    def queue_action(self, conductor, objinst, objmethod, args, kwargs):
+        """Queue an object action, if it can be deferred.
+
+        :returns: True if the action was queued, False if it has to be sent
+                  to nova-conductor by the caller.
+        """
+        if (self.defer and objmethod == 'save' and not args and not kwargs
+                and objinst._context is self.context
+                and objinst.obj_name() in DEFERRABLE_OBJECTS
+                and conductor.can_send_object_action_batch()):
+            self.actions += 1
+            self._conductor = conductor
+            self._pending.append((objinst, objinst.obj_clone()))
+            objinst.obj_reset_changes(recursive=True)
+            return True
+        self.start_call()
+        return False
+
+    def start_call(self, object_action=True):
+        """Flush the queued saves before a call to nova-conductor.
+
+        :param object_action: Whether the call carries an object action
+        """
+        self.flush()
+        self.calls += 1
+        if object_action:
+            self.actions += 1
+
+    def flush(self):
+        """Send the queued saves to nova-conductor."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        self.calls += 1
+        try:
+            results = self._conductor.object_action_batch(
+                self.context,
+                [(clone, 'save', (), {}) for objinst, clone in pending])
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                # NOTE: Mark the changes again, so that they are sent by the
+                # next save of the objects.
+                for objinst, clone in pending:
+                    objinst._changed_fields |= clone._changed_fields
+        for (objinst, clone), (updates, result) in zip(pending, results):
+            _apply_updates(objinst, updates)
+
+
+@contextlib.contextmanager
+def object_action_batch(context):
+    """Batch the object saves made with a context.
+
+    With [conductor]batch_object_saves set, the saves of the objects listed
+    in DEFERRABLE_OBJECTS are queued, see ObjectActionBatch. The queued saves
+    are flushed when leaving the block, including when it raises.
+
+    :returns: The ObjectActionBatch of the context
+    """
+    if context.object_action_batch is not None:
+        yield context.object_action_batch
+        return
+
+    batch = ObjectActionBatch(context, defer=CONF.conductor.batch_object_saves)
+    context.object_action_batch = batch
+    try:
+        yield batch
+    except Exception:
+        with excutils.save_and_reraise_exception():
+            try:
+                batch.flush()
+            except Exception:
+                LOG.exception(_LE('Failed to save the queued objects'))
+    else:
+        batch.flush()
+    finally:
+        context.object_action_batch = None
@@ -19,7 +19,9 @@ import copy
 from oslo_config import cfg
 from oslo_log import log as logging
 import oslo_messaging as messaging
+from oslo_service import periodic_task
 from oslo_utils import excutils
+from oslo_utils import timeutils
 import six
 
 from nova.compute import rpcapi as compute_rpcapi
@@ -40,6 +42,7 @@ from nova import rpc
 from nova.scheduler import client as scheduler_client
 from nova.scheduler import utils as scheduler_utils
 from nova import servicegroup
+from nova.servicegroup import heartbeats as servicegroup_heartbeats
 from nova import utils
 
 LOG = logging.getLogger(__name__)
@@ -59,13 +62,24 @@ class ConductorManager(manager.Manager):
     namespace.  See the ComputeTaskManager class for details.
     """
 
-    target = messaging.Target(version='3.0')
+    target = messaging.Target(version='3.3')
 
     def __init__(self, *args, **kwargs):
         super(ConductorManager, self).__init__(service_name='conductor',
                                                *args, **kwargs)
         self.compute_task_mgr = ComputeTaskManager()
         self.additional_endpoints.append(self.compute_task_mgr)
+        if (CONF.heartbeat_batch_interval and
+                '_flush_service_heartbeats' not in self._periodic_spacing):
+            # NOTE: Added here rather than with the decorator, as its spacing
+            # comes from an option which is not parsed yet when the class is
+            # defined. Nothing runs while the batching is off.
+            @periodic_task.periodic_task(
+                spacing=CONF.heartbeat_batch_interval)
+            def _flush_service_heartbeats(manager, context):
+                manager._flush_service_heartbeats(context)
+
+            self.add_periodic_task(_flush_service_heartbeats)
 
     # NOTE(hanlind): This can be removed in version 4.0 of the RPC API
     def provider_fw_rule_get_all(self, context):
@@ -120,6 +134,16 @@ class ConductorManager(manager.Manager):
         updates['obj_what_changed'] = objinst.obj_what_changed()
         return updates, result
 
+    def object_action_batch(self, context, actions):
+        """Perform a list of actions on objects, in order.
+
+        :param actions: A list of (objinst, objmethod, args, kwargs)
+        :returns: The list of the (updates, result) of each action, as
+                  returned by object_action()
+        """
+        return [self.object_action(context, objinst, objmethod, args, kwargs)
+                for objinst, objmethod, args, kwargs in actions]
+
     def object_backport_versions(self, context, objinst, object_versions):
         target = object_versions[objinst.obj_name()]
         LOG.debug('Backporting %(obj)s to %(ver)s with versions %(manifest)s',
@@ -131,6 +155,35 @@ class ConductorManager(manager.Manager):
         return objinst.obj_to_primitive(target_version=target,
                                         version_manifest=object_versions)
 
+    def service_report_state(self, context, service_id, report_count):
+        """Record a state report of a service using the db servicegroup.
+
+        With [DEFAULT]heartbeat_batch_interval set, the report is only
+        written to the database by the next _flush_service_heartbeats() run,
+        together with all the other reports received in the meantime.
+        """
+        if CONF.heartbeat_batch_interval:
+            servicegroup_heartbeats.get_heartbeat_buffer().add(service_id,
+                                                               report_count)
+        else:
+            self.db.service_report_states(
+                context, {service_id: (report_count, timeutils.utcnow())})
+
+    def _flush_service_heartbeats(self, context):
+        heartbeats = servicegroup_heartbeats.get_heartbeat_buffer()
+        try:
+            flushed = heartbeats.flush(context)
+        except Exception:
+            LOG.exception(_LE('Failed to write the state reports of the '
+                              'services, retrying on the next run'))
+            return
+        if flushed:
+            LOG.debug('Wrote the state reports of %(flushed)d services in '
+                      'one update, %(reports)d reports in %(writes)d updates '
+                      'so far', {'flushed': flushed,
+                                 'reports': heartbeats.stats['reports'],
+                                 'writes': heartbeats.stats['writes']})
+
     def reset(self):
         objects.Service.clear_min_version_cache()
 
@@ -144,7 +197,7 @@ class ComputeTaskManager(base.Base):
     may involve coordinating activities on multiple compute nodes.
     """
 
-    target = messaging.Target(namespace='compute_task', version='1.14')
+    target = messaging.Target(namespace='compute_task', version='1.15')
 
     def __init__(self):
         super(ComputeTaskManager, self).__init__()
@@ -198,6 +198,10 @@ class ConductorAPI(object):
     that they can handle the version_cap being set to 3.0.
 
     * Remove provider_fw_rule_get_all()
+
+    * 3.1  - Add service_report_state()
+    * 3.2  - Add object_action_batch()
+    * 3.3  - Accept objects in the compact form of the NovaObjectSerializer
     """
 
     VERSION_ALIASES = {
@@ -219,6 +223,8 @@ class ConductorAPI(object):
         self.client = rpc.get_client(target,
                                      version_cap=version_cap,
                                      serializer=serializer)
+        serializer.compact = (CONF.compact_object_primitives and
+                              self.client.can_send_version('3.3'))
 
     # TODO(hanlind): This method can be removed once oslo.versionedobjects
     # has been converted to use version_manifests in remotable_classmethod
@@ -234,6 +240,9 @@ class ConductorAPI(object):
 
     def object_class_action_versions(self, context, objname, objmethod,
                                      object_versions, args, kwargs):
+        batch = getattr(context, 'object_action_batch', None)
+        if batch is not None:
+            batch.start_call()
         cctxt = self.client.prepare()
         return cctxt.call(context, 'object_class_action_versions',
                           objname=objname, objmethod=objmethod,
@@ -241,15 +250,38 @@ class ConductorAPI(object):
                           args=args, kwargs=kwargs)
 
     def object_action(self, context, objinst, objmethod, args, kwargs):
+        batch = getattr(context, 'object_action_batch', None)
+        if batch is not None and batch.queue_action(self, objinst, objmethod,
+                                                    args, kwargs):
+            # NOTE: Like the result of a save() made by nova-conductor, the
+            # changes of the object are reset. They are sent to
+            # nova-conductor, and its updates applied to the object, when
+            # the batch is flushed.
+            return {'obj_what_changed': set()}, None
         cctxt = self.client.prepare()
         return cctxt.call(context, 'object_action', objinst=objinst,
                           objmethod=objmethod, args=args, kwargs=kwargs)
 
+    def can_send_object_action_batch(self):
+        return self.client.can_send_version('3.2')
+
+    def object_action_batch(self, context, actions):
+        cctxt = self.client.prepare(version='3.2')
+        return cctxt.call(context, 'object_action_batch', actions=actions)
+
     def object_backport_versions(self, context, objinst, object_versions):
         cctxt = self.client.prepare()
         return cctxt.call(context, 'object_backport_versions', objinst=objinst,
                           object_versions=object_versions)
 
+    def can_report_service_state(self):
+        return self.client.can_send_version('3.1')
+
+    def service_report_state(self, context, service_id, report_count):
+        cctxt = self.client.prepare(version='3.1')
+        return cctxt.call(context, 'service_report_state',
+                          service_id=service_id, report_count=report_count)
+
 
 class ComputeTaskAPI(object):
     """Client side of the conductor 'compute' namespaced RPC API
@@ -271,6 +303,7 @@ class ComputeTaskAPI(object):
     1.12 - Added request_spec to rebuild_instance()
     1.13 - Added request_spec to migrate_server()
     1.14 - Added request_spec to unshelve_instance()
+    1.15 - Accept objects in the compact form of the NovaObjectSerializer
     """
 
     def __init__(self):
@@ -280,6 +313,16 @@ class ComputeTaskAPI(object):
                                   version='1.0')
         serializer = objects_base.NovaObjectSerializer()
         self.client = rpc.get_client(target, serializer=serializer)
+        serializer.compact = (CONF.compact_object_primitives and
+                              self.client.can_send_version('1.15'))
+
+    def _prepare(self, context, version):
+        # NOTE: The object saves queued with the context are sent first, so
+        # that the conductor works on what the caller saved.
+        batch = getattr(context, 'object_action_batch', None)
+        if batch is not None:
+            batch.start_call(object_action=False)
+        return self.client.prepare(version=version)
 
     def migrate_server(self, context, instance, scheduler_hint, live, rebuild,
                   flavor, block_migration, disk_over_commit,
@@ -306,7 +349,7 @@ class ComputeTaskAPI(object):
             kw['instance'] = jsonutils.to_primitive(
                     objects_base.obj_to_primitive(instance))
             version = '1.4'
-        cctxt = self.client.prepare(version=version)
+        cctxt = self._prepare(context, version)
         return cctxt.call(context, 'migrate_server', **kw)
 
     def build_instances(self, context, instances, image, filter_properties,
@@ -336,7 +379,7 @@ class ComputeTaskAPI(object):
             kw.update({'block_device_mapping': bdm_p,
                        'legacy_bdm': legacy_bdm})
 
-        cctxt = self.client.prepare(version=version)
+        cctxt = self._prepare(context, version)
         cctxt.cast(context, 'build_instances', **kw)
 
     def unshelve_instance(self, context, instance, request_spec=None):
@@ -347,7 +390,7 @@ class ComputeTaskAPI(object):
         if not self.client.can_send_version(version):
             version = '1.3'
             del kw['request_spec']
-        cctxt = self.client.prepare(version=version)
+        cctxt = self._prepare(context, version)
         cctxt.cast(context, 'unshelve_instance', **kw)
 
     def rebuild_instance(self, ctxt, instance, new_pass, injected_files,
@@ -371,5 +414,5 @@ class ComputeTaskAPI(object):
         if not self.client.can_send_version(version):
             version = '1.8'
             del kw['request_spec']
-        cctxt = self.client.prepare(version=version)
+        cctxt = self._prepare(ctxt, version)
         cctxt.cast(ctxt, 'rebuild_instance', **kw)
@@ -46,11 +46,21 @@ workers = cfg.IntOpt(
     help='Number of workers for OpenStack Conductor service. '
          'The default will be the number of CPUs available.')
 
+batch_object_saves = cfg.BoolOpt(
+    'batch_object_saves',
+    default=False,
+    help='Queue the saves of instances, migrations and block device '
+         'mappings made by nova-compute while it builds an instance, and send '
+         'them to nova-conductor in a single call, made before the next call '
+         'to nova-conductor or at the end of the build. An error raised while '
+         'saving one of these objects is then raised by that later call.')
+
 ALL_OPTS = [
     use_local,
     topic,
     manager,
-    workers]
+    workers,
+    batch_object_saves]
 
 
 def register_opts(conf):
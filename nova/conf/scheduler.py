@@ -99,6 +99,32 @@ a different scheduler, this option has no effect.
     specified in 'scheduler_default_filters'.
 """)
 
+batch_placement_opt = cfg.BoolOpt("scheduler_batch_placement",
+        default=False,
+        help="""
+When this option is True, a request for several instances filters and weighs
+all the hosts only once, for the first instance. For each following instance,
+only the host which was picked for the previous instance, along with the hosts
+whose server group filters may have changed, are filtered and weighed again,
+and the best host is taken from a priority queue. This makes large multi-create
+requests much faster on deployments with many compute nodes.
+
+The weights of the hosts which are weighed again are normalized with the bounds
+computed for the first instance, so the hosts picked may differ slightly from
+the ones picked when this option is False.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect.
+
+* Services that use this:
+
+    ``nova-scheduler``
+
+* Related options:
+
+    scheduler_host_subset_size
+""")
+
 host_mgr_avail_filt_opt = cfg.MultiStrOpt("scheduler_available_filters",
         default=["nova.scheduler.filters.all_filters"],
         help="""
@@ -156,6 +182,62 @@ a different scheduler, this option has no effect.
     exception will be raised.
 """)
 
+host_mgr_vectorized_filters_opt = cfg.BoolOpt(
+        "scheduler_use_vectorized_filters",
+        default=False,
+        help="""
+When this option is True, the resources of all the hosts are loaded into arrays
+once per request, and the filters which support it (RamFilter, CoreFilter,
+DiskFilter, NumInstancesFilter, IoOpsFilter and their aggregate variants)
+evaluate all the hosts at once instead of one host at a time. The other filters
+are still run for each host. This reduces the CPU time spent filtering on
+deployments with thousands of compute nodes.
+
+This requires the numpy library to be installed; if it is not, this option has
+no effect.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect.
+
+* Services that use this:
+
+    ``nova-scheduler``
+
+* Related options:
+
+    scheduler_default_filters
+""")
+
+host_mgr_filter_cache_size_opt = cfg.IntOpt(
+        "scheduler_filter_cache_size",
+        default=0,
+        min=0,
+        help="""
+The number of distinct requests for which the results of the cacheable filters
+are kept in memory. The AvailabilityZoneFilter, ComputeCapabilitiesFilter,
+ImagePropertiesFilter, AggregateInstanceExtraSpecsFilter and
+AggregateImagePropertiesIsolation filters only depend on the flavor extra specs
+or the image properties of the request, and on the aggregates and capabilities
+of the host. Their result for each host is cached, so that later requests with
+the same flavor or image do not need to evaluate them again. The cached results
+are dropped whenever an aggregate is updated or deleted, and the results of a
+host are evaluated again when its capabilities are refreshed. When the cache is
+full, the least recently used request is evicted.
+
+Setting this option to 0 disables the cache.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect.
+
+* Services that use this:
+
+    ``nova-scheduler``
+
+* Related options:
+
+    scheduler_default_filters
+""")
+
 host_mgr_sched_wgt_cls_opt = cfg.ListOpt("scheduler_weight_classes",
         default=["nova.scheduler.weights.all_weighers"],
         help="""
@@ -183,6 +265,33 @@ a different scheduler, this option has no effect.
     None
 """)
 
+host_mgr_vectorized_weighers_opt = cfg.BoolOpt(
+        "scheduler_use_vectorized_weighers",
+        default=False,
+        help="""
+When this option is True, the weights returned by each weigher are normalized
+and added up with arrays instead of one host at a time, and only the
+'scheduler_host_subset_size' hosts with the highest weights are sorted. The
+resulting order of the hosts is the same as when this option is False. This
+reduces the CPU time spent weighing on deployments with thousands of compute
+nodes.
+
+This requires the numpy library to be installed; if it is not, this option has
+no effect.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect.
+
+* Services that use this:
+
+    ``nova-scheduler``
+
+* Related options:
+
+    scheduler_weight_classes
+    scheduler_host_subset_size
+""")
+
 host_mgr_tracks_inst_chg_opt = cfg.BoolOpt("scheduler_tracks_instance_changes",
         default=True,
         help="""
@@ -208,6 +317,55 @@ a different scheduler, this option has no effect.
     None
 """)
 
+host_mgr_incremental_refresh_opt = cfg.BoolOpt(
+        "scheduler_incremental_host_refresh",
+        default=False,
+        help="""
+When this option is True, the HostManager keeps its view of the compute nodes
+between scheduling requests and only fetches the compute node records which
+have been created, updated or deleted since the previous request, instead of
+reloading every compute node record each time. This makes the per-request
+database cost proportional to the amount of change in the deployment rather
+than to its size, which matters on deployments with thousands of compute
+nodes.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect.
+
+* Services that use this:
+
+    ``nova-scheduler``
+
+* Related options:
+
+    scheduler_host_full_refresh_interval
+""")
+
+host_mgr_full_refresh_interval_opt = cfg.IntOpt(
+        "scheduler_host_full_refresh_interval",
+        default=600,
+        min=0,
+        help="""
+When incremental host refreshes are enabled, this is the maximum number of
+seconds between two full reloads of the compute node records. Full reloads
+guard against records whose update timestamp was set by a transaction which
+committed after the previous incremental refresh ran.
+
+Setting this to 0 forces a full reload on every request, which is equivalent to
+disabling incremental refreshes.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect.
+
+* Services that use this:
+
+    ``nova-scheduler``
+
+* Related options:
+
+    scheduler_incremental_host_refresh
+""")
+
 rpc_sched_topic_opt = cfg.StrOpt("scheduler_topic",
         default="scheduler",
         help="""
@@ -322,6 +480,29 @@ be sure to test this with your selected scheduler.
     ``nova-service service_down_time``
 """)
 
+timings_log_interval_opt = cfg.IntOpt("scheduler_timings_log_interval",
+        default=0,
+        min=0,
+        help="""
+When this option is greater than 0, the scheduler records the wall time spent
+in each filter and weigher, along with the number of hosts they were given and
+the number of hosts which passed, and the time spent loading the hosts from the
+database. Every N seconds, where N is the value of this option, a histogram of
+these timings is logged at the INFO level and the timings are reset. This helps
+finding out which filter or weigher is slow on a given deployment.
+
+Setting this option to 0 disables the timings.
+
+* Services that use this:
+
+    ``nova-scheduler``
+
+* Related options:
+
+    scheduler_default_filters
+    scheduler_weight_classes
+""")
+
 isolated_img_opt = cfg.ListOpt("isolated_images",
         default=[],
         help="""
@@ -914,16 +1095,23 @@ soft_anti_affinity_weight_opt = cfg.FloatOpt(
 
 
 default_opts = [host_subset_size_opt,
+               batch_placement_opt,
                bm_default_filter_opt,
                use_bm_filters_opt,
                host_mgr_avail_filt_opt,
                host_mgr_default_filt_opt,
+               host_mgr_vectorized_filters_opt,
+               host_mgr_filter_cache_size_opt,
                host_mgr_sched_wgt_cls_opt,
+               host_mgr_vectorized_weighers_opt,
                host_mgr_tracks_inst_chg_opt,
+               host_mgr_incremental_refresh_opt,
+               host_mgr_full_refresh_interval_opt,
                rpc_sched_topic_opt,
                sched_driver_host_mgr_opt,
                driver_opt,
                driver_period_opt,
+               timings_log_interval_opt,
                scheduler_json_config_location_opt,
                isolated_img_opt,
                isolated_host_opt,
@@ -265,6 +265,15 @@ Interdependencies to other options:
 * ``compute_driver``: Only the libvirt driver uses this option.
 """)
 
+native_image_info = cfg.BoolOpt(
+    'native_image_info',
+    default=False,
+    help='Read the format, virtual size, cluster size and backing file of '
+         'the qcow2 and raw disk images from their headers instead of '
+         'running qemu-img info, and keep them while the image files are '
+         'unchanged. qemu-img info is still run for the other formats, the '
+         'encrypted images and the qcow2 images with internal snapshots.')
+
 injected_network_template = cfg.StrOpt(
     'injected_network_template',
     default=paths.basedir_def('nova/virt/interfaces.template'),
@@ -334,6 +343,7 @@ ALL_OPTS = [vcpu_pin_set,
             firewall_driver,
             allow_same_net_traffic,
             force_raw_images,
+            native_image_info,
             injected_network_template,
             virt_mkfs,
             resize_fs_using_block_device,
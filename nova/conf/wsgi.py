@@ -101,6 +101,18 @@ client_socket_timeout = cfg.IntOpt(
          "wait forever.",
     deprecated_group='DEFAULT')
 
+streaming_response_threshold = cfg.IntOpt(
+    'streaming_response_threshold',
+    default=0,
+    min=0,
+    help='Minimum number of items in a collection response of the '
+         'OpenStack Compute API, e.g. GET /servers/detail, above which '
+         'the response body is serialized one item at a time and sent '
+         'with chunked transfer encoding, instead of being dumped in a '
+         'single string. This lowers the memory used by the API '
+         'workers and the time to the first byte of large listings. '
+         'A value of 0 disables streaming.')
+
 ALL_OPTS = [api_paste_config,
             wsgi_log_format,
             secure_proxy_ssl_header,
@@ -111,7 +123,8 @@ ALL_OPTS = [api_paste_config,
             default_pool_size,
             max_header_line,
             keep_alive,
-            client_socket_timeout
+            client_socket_timeout,
+            streaming_response_threshold
             ]
 
 
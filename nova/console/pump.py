@@ -0,0 +1,151 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Copy of the console traffic between two TCP sockets."""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import socket
+import sys
+
+from eventlet import hubs
+from oslo_config import cfg
+
+
+pump_opts = [
+    cfg.IntOpt('console_proxy_buffer_size',
+               default=65536,
+               min=4096,
+               help='Size in bytes of the reads made by the console proxies '
+                    'on the client and hypervisor connections. Larger reads '
+                    'lower the number of frames and of system calls per '
+                    'byte proxied.'),
+    cfg.BoolOpt('console_proxy_splice',
+                default=False,
+                help='Copy the traffic of the console connections which are '
+                     'TCP on both ends, like those of nova-xvpvncproxy, in '
+                     'the kernel with splice(2) instead of reading and '
+                     'writing it in the proxy. This needs Linux, the traffic '
+                     'is copied by the proxy otherwise.'),
+]
+
+CONF = cfg.CONF
+CONF.register_opts(pump_opts)
+
+
+# From linux/splice.h
+SPLICE_F_MOVE = 1
+SPLICE_F_NONBLOCK = 2
+
+_libc_splice = None
+
+
+def _load_splice():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                           use_errno=True)
+        func = libc.splice
+    except (OSError, AttributeError):
+        return None
+    # ssize_t splice(int fd_in, loff_t *off_in, int fd_out, loff_t *off_out,
+    #                size_t len, unsigned int flags);
+    func.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int,
+                     ctypes.c_void_p, ctypes.c_size_t, ctypes.c_uint]
+    func.restype = ctypes.c_ssize_t
+    return func
+
+
+def _get_splice():
+    global _libc_splice
+    if _libc_splice is None:
+        _libc_splice = _load_splice() or False
+    return _libc_splice
+
+
+def can_splice():
+    return CONF.console_proxy_splice and bool(_get_splice())
+
+
+def pump(source, dest):
+    """Copy the data received on source to dest until source is closed.
+
+    :returns: True once source is closed or failed, False if the data could
+              not be sent to dest.
+    """
+    if can_splice():
+        return _splice(source, dest)
+    return _copy(source, dest)
+
+
+def _copy(source, dest):
+    # NOTE: The same buffer is used for every read, the data is sent from a
+    # view of it rather than from a new string per read.
+    buf = bytearray(CONF.console_proxy_buffer_size)
+    view = memoryview(buf)
+    while True:
+        try:
+            size = source.recv_into(buf)
+        except Exception:
+            return True
+        if not size:
+            return True
+        try:
+            # sendall raises an exception on write error, unlike send
+            dest.sendall(view[:size])
+        except Exception:
+            return False
+
+
+def _splice_once(src_fd, dest_fd, size, wait_fd, **wait):
+    splice = _get_splice()
+    while True:
+        result = splice(src_fd, None, dest_fd, None, size,
+                        SPLICE_F_MOVE | SPLICE_F_NONBLOCK)
+        if result >= 0:
+            return result
+        err = ctypes.get_errno()
+        if err == errno.EINTR:
+            continue
+        if err != errno.EAGAIN:
+            raise OSError(err, os.strerror(err))
+        hubs.trampoline(wait_fd, **wait)
+
+
+def _splice(source, dest):
+    # NOTE: splice(2) needs a pipe on one end, the data moves from source to
+    # the pipe and from the pipe to dest without being copied to the proxy.
+    size = CONF.console_proxy_buffer_size
+    source_fd = source.fileno()
+    dest_fd = dest.fileno()
+    pipe_r, pipe_w = os.pipe()
+    try:
+        while True:
+            try:
+                pending = _splice_once(source_fd, pipe_w, size,
+                                       source_fd, read=True)
+            except (OSError, socket.error):
+                return True
+            if not pending:
+                return True
+            while pending:
+                try:
+                    pending -= _splice_once(pipe_r, dest_fd, pending,
+                                            dest_fd, write=True)
+                except (OSError, socket.error):
+                    return False
+    finally:
+        os.close(pipe_r)
+        os.close(pipe_w)
@@ -28,6 +28,7 @@ import six.moves.urllib.parse as urlparse
 import websockify
 
 from nova.consoleauth import rpcapi as consoleauth_rpcapi
+from nova.consoleauth import token_cache
 from nova import context
 from nova import exception
 from nova.i18n import _
@@ -42,6 +43,8 @@ console_origin_opts = [
                      'proxy servers'),
 ]
 CONF.register_opts(console_origin_opts)
+CONF.import_opt('console_proxy_buffer_size', 'nova.console.pump')
+CONF.import_opt('console_token_ttl', 'nova.consoleauth.manager')
 
 
 class NovaProxyRequestHandlerBase(object):
@@ -68,6 +71,27 @@ class NovaProxyRequestHandlerBase(object):
 
         return origin_proto in expected_protos
 
+    def _check_token(self, ctxt, token):
+        rpcapi = consoleauth_rpcapi.ConsoleAuthAPI()
+        if not (CONF.console_token_cache_ttl or
+                CONF.console_token_negative_cache_ttl):
+            return rpcapi.check_token(ctxt, token=token)
+
+        # NOTE: Clients like noVNC reconnect often with the same token, reuse
+        # the result of the last validation by nova-consoleauth.
+        cache = token_cache.get_token_cache()
+        entry = cache.get(token)
+        if entry is not None:
+            return entry['connect_info']
+        connect_info = rpcapi.check_token(ctxt, token=token)
+        if connect_info:
+            cache.set_valid(token, connect_info,
+                            connect_info['last_activity_at'] +
+                            CONF.console_token_ttl)
+        else:
+            cache.set_invalid(token)
+        return connect_info
+
     def new_websocket_client(self):
         """Called after a new WebSocket connection has been established."""
         # Reopen the eventlet hub to make sure we don't share an epoll
@@ -100,8 +124,7 @@ class NovaProxyRequestHandlerBase(object):
                     token = cookie['token'].value
 
         ctxt = context.get_admin_context()
-        rpcapi = consoleauth_rpcapi.ConsoleAuthAPI()
-        connect_info = rpcapi.check_token(ctxt, token=token)
+        connect_info = self._check_token(ctxt, token)
 
         if not connect_info:
             raise exception.InvalidToken(token=token)
@@ -168,6 +191,8 @@ class NovaProxyRequestHandlerBase(object):
 class NovaProxyRequestHandler(NovaProxyRequestHandlerBase,
                               websockify.ProxyRequestHandler):
     def __init__(self, *args, **kwargs):
+        # NOTE: The request is handled by the constructor of the base class.
+        self.buffer_size = CONF.console_proxy_buffer_size
         websockify.ProxyRequestHandler.__init__(self, *args, **kwargs)
 
     def socket(self, *args, **kwargs):
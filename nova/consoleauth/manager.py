@@ -27,6 +27,7 @@ from nova import cache_utils
 from nova.cells import rpcapi as cells_rpcapi
 from nova.compute import rpcapi as compute_rpcapi
 import nova.conf
+from nova.consoleauth import token_cache
 from nova.i18n import _LI, _LW
 from nova import manager
 from nova import objects
@@ -154,3 +155,5 @@ class ConsoleAuthManager(manager.Manager):
         self.mc.delete_multi(
                 [tok.encode('UTF-8') for tok in tokens])
         self.mc_instance.delete(instance_uuid.encode('UTF-8'))
+        # NOTE: Also revoke the tokens which the console proxies validated.
+        token_cache.get_token_cache().delete(tokens)
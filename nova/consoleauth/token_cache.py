@@ -0,0 +1,121 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Cache of the console tokens checked by the console proxies."""
+
+import time
+
+from oslo_config import cfg
+from oslo_serialization import jsonutils
+
+from nova import cache_utils
+
+
+token_cache_opts = [
+    cfg.IntOpt('console_token_cache_ttl',
+               default=0,
+               min=0,
+               help='Seconds during which the console proxies reuse the '
+                    'result of the validation of a console token by '
+                    'nova-consoleauth, for the connections which reuse the '
+                    'same token. The result is never kept past the expiry of '
+                    'the token, and is dropped when the tokens of the '
+                    'instance are deleted. As the proxies handle each '
+                    'connection in a separate process, the cache is only '
+                    'shared between connections when memcached_servers or '
+                    'the [cache] section are configured. 0 disables the '
+                    'cache.'),
+    cfg.IntOpt('console_token_negative_cache_ttl',
+               default=0,
+               min=0,
+               help='Seconds during which the console proxies reject a '
+                    'console token which nova-consoleauth found invalid, '
+                    'without checking it again. 0 disables the caching of '
+                    'invalid tokens.'),
+]
+
+CONF = cfg.CONF
+CONF.register_opts(token_cache_opts)
+
+
+class ConsoleTokenCache(object):
+    """Caches the connection info of the console tokens.
+
+    The entries are stored with the time at which they expire, which is the
+    earliest of the expiry of the token and of the configured TTL.
+    """
+
+    def __init__(self):
+        self._mc = None
+
+    @property
+    def mc(self):
+        if self._mc is None:
+            self._mc = cache_utils.get_client(
+                max(CONF.console_token_cache_ttl,
+                    CONF.console_token_negative_cache_ttl))
+        return self._mc
+
+    @staticmethod
+    def _key(token):
+        return ('console_token_cache-%s' % token).encode('UTF-8')
+
+    def get(self, token):
+        """Return the cached entry of a token, or None.
+
+        The 'connect_info' of the entry is None for an invalid token.
+        """
+        entry = self.mc.get(self._key(token))
+        if entry is None:
+            return None
+        entry = jsonutils.loads(entry)
+        if entry['expires_at'] <= time.time():
+            return None
+        return entry
+
+    def _set(self, token, connect_info, expires_at):
+        self.mc.set(self._key(token),
+                    jsonutils.dumps({'connect_info': connect_info,
+                                     'expires_at': expires_at}))
+
+    def set_valid(self, token, connect_info, token_expires_at):
+        if not CONF.console_token_cache_ttl:
+            return
+        expires_at = min(time.time() + CONF.console_token_cache_ttl,
+                         token_expires_at)
+        self._set(token, connect_info, expires_at)
+
+    def set_invalid(self, token):
+        if not CONF.console_token_negative_cache_ttl:
+            return
+        self._set(token, None,
+                  time.time() + CONF.console_token_negative_cache_ttl)
+
+    def delete(self, tokens):
+        """Drop the cached entries of the given tokens."""
+        if tokens:
+            self.mc.delete_multi([self._key(token) for token in tokens])
+
+
+_TOKEN_CACHE = None
+
+
+def get_token_cache():
+    global _TOKEN_CACHE
+    if _TOKEN_CACHE is None:
+        _TOKEN_CACHE = ConsoleTokenCache()
+    return _TOKEN_CACHE
+
+
+def reset_state():
+    global _TOKEN_CACHE
+    _TOKEN_CACHE = None
@@ -148,6 +148,10 @@ class RequestContext(context.RequestContext):
         # It is only manipulated using the target_cell contextmanager
         # provided by this module
         self.db_connection = None
+        # NOTE: The following attribute is used by nova-compute to queue the
+        # object saves it sends to nova-conductor. It is only manipulated
+        # using nova.conductor.batch.object_action_batch().
+        self.object_action_batch = None
         self.user_auth_plugin = user_auth_plugin
         if self.is_admin is None:
             self.is_admin = policy.check_is_admin(self)
@@ -177,6 +177,16 @@ def service_update(context, service_id, values):
     return IMPL.service_update(context, service_id, values)
 
 
+def service_report_states(context, reports):
+    """Record the state reports of several services in one update.
+
+    :param reports: a dict of the report count of each service, and of the
+                    time it was reported at, keyed by service id
+    :returns: the number of services updated
+    """
+    return IMPL.service_report_states(context, reports)
+
+
 ###################
 
 
@@ -248,6 +258,20 @@ def compute_node_get_all(context):
     return IMPL.compute_node_get_all(context)
 
 
+def compute_node_get_all_changed_since(context, changed_since):
+    """Get computeNodes created, updated or deleted since a given time.
+
+    Soft-deleted compute nodes are returned as well, so that callers caching
+    compute nodes can drop them.
+
+    :param context: The security context
+    :param changed_since: datetime after which changes are returned
+
+    :returns: List of dictionaries each containing compute node properties
+    """
+    return IMPL.compute_node_get_all_changed_since(context, changed_since)
+
+
 def compute_node_get_all_by_host(context, host):
     """Get compute nodes by host name
 
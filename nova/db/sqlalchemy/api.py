@@ -618,10 +618,30 @@ def service_update(context, service_id, values):
     return service_ref
 
 
+@oslo_db_api.wrap_db_retry(max_retries=5, retry_on_deadlock=True)
+@pick_context_manager_writer
+def service_report_states(context, reports):
+    if not reports:
+        return 0
+    # NOTE: Like in service_update(), a state report always moves
+    # last_seen_up, but all the reports are written with a single UPDATE.
+    report_count = sql.case(
+        {service_id: report[0] for service_id, report in reports.items()},
+        value=models.Service.id)
+    last_seen_up = sql.case(
+        {service_id: report[1] for service_id, report in reports.items()},
+        value=models.Service.id)
+    return model_query(context, models.Service).\
+        filter(models.Service.id.in_(list(reports))).\
+        update({'report_count': report_count,
+                'last_seen_up': last_seen_up},
+               synchronize_session=False)
+
+
 ###################
 
 
-def _compute_node_select(context, filters=None):
+def _compute_node_select(context, filters=None, read_deleted=None):
     # NOTE(jaypipes): With the addition of the resource-providers database
     # schema, inventory and allocation information for various resources
     # on a compute node are to be migrated from the compute_nodes and
@@ -770,7 +790,9 @@ def _compute_node_select(context, filters=None):
 
     select = sa.select(cols_in_output).select_from(disk_join)
 
-    if context.read_deleted == "no":
+    if read_deleted is None:
+        read_deleted = context.read_deleted
+    if read_deleted == "no":
         select = select.where(cn_tbl.c.deleted == 0)
     if "compute_id" in filters:
         select = select.where(cn_tbl.c.id == filters["compute_id"])
@@ -781,6 +803,11 @@ def _compute_node_select(context, filters=None):
     if "hypervisor_hostname" in filters:
         hyp_hostname = filters["hypervisor_hostname"]
         select = select.where(cn_tbl.c.hypervisor_hostname == hyp_hostname)
+    if "changed_since" in filters:
+        changed_since = filters["changed_since"]
+        select = select.where(sql.or_(cn_tbl.c.created_at >= changed_since,
+                                      cn_tbl.c.updated_at >= changed_since,
+                                      cn_tbl.c.deleted_at >= changed_since))
 
     engine = get_engine(context)
     conn = engine.connect()
@@ -843,6 +870,15 @@ def compute_node_get_all(context):
     return _compute_node_select(context)
 
 
+@pick_context_manager_reader
+def compute_node_get_all_changed_since(context, changed_since):
+    changed_since = timeutils.normalize_time(changed_since)
+    # NOTE: Deleted compute nodes have to be returned too, otherwise
+    # callers caching the compute nodes would never notice they are gone.
+    return _compute_node_select(context, {"changed_since": changed_since},
+                                read_deleted="yes")
+
+
 @pick_context_manager_reader
 def compute_node_search_by_hypervisor(context, hypervisor_match):
     field = models.ComputeNode.hypervisor_hostname
@@ -17,6 +17,8 @@
 Filter support
 """
 
+import time
+
 from oslo_log import log as logging
 
 from nova.i18n import _LI
@@ -65,9 +67,27 @@ class BaseFilterHandler(loadables.BaseLoader):
     This class should be subclassed where one needs to use filters.
     """
 
+    # Set to a nova.scheduler.timings.SchedulerTimings to record the time
+    # spent in each filter
+    timings = None
+
+    def _get_filter_context(self, objs, spec_obj):
+        """Return an object shared by all the filters run for a request.
+
+        Can be overridden in a subclass to precompute data about all the
+        objects once, before running the filters. It is handed over to
+        _filter_all() for each filter.
+        """
+        return None
+
+    def _filter_all(self, filter_, objs, spec_obj, filter_context):
+        """Run a single filter against the list of objects."""
+        return filter_.filter_all(objs, spec_obj)
+
     def get_filtered_objects(self, filters, objs, spec_obj, index=0):
         list_objs = list(objs)
         LOG.debug("Starting with %d host(s)", len(list_objs))
+        filter_context = self._get_filter_context(list_objs, spec_obj)
         # Track the hosts as they are removed. The 'full_filter_results' list
         # contains the host/nodename info for every host that passes each
         # filter, while the 'part_filter_results' list just tracks the number
@@ -82,12 +102,18 @@ class BaseFilterHandler(loadables.BaseLoader):
             if filter_.run_filter_for_index(index):
                 cls_name = filter_.__class__.__name__
                 start_count = len(list_objs)
-                objs = filter_.filter_all(list_objs, spec_obj)
+                start_time = time.time()
+                objs = self._filter_all(filter_, list_objs, spec_obj,
+                                        filter_context)
                 if objs is None:
                     LOG.debug("Filter %s says to stop filtering", cls_name)
                     return
                 list_objs = list(objs)
                 end_count = len(list_objs)
+                if self.timings is not None:
+                    self.timings.record('filter', cls_name,
+                                        time.time() - start_time,
+                                        start_count, end_count)
                 part_filter_results.append(log_msg % {"cls_name": cls_name,
                         "start": start_count, "end": end_count})
                 if list_objs:
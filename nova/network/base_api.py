@@ -265,6 +265,16 @@ class NetworkAPI(base.Base):
         """Template method, so a subclass can implement for neutron/network."""
         raise NotImplementedError()
 
+    def prefetch_instances_nw_info(self, context, instances):
+        """Lists the network resources of several instances at once.
+
+        The returned value can be passed as the prefetched argument of
+        get_instance_nw_info() for each of the instances, so that refreshing
+        their network info does not query the network service per instance.
+        Returns None when the network API does not support it.
+        """
+        return None
+
     def create_pci_requests_for_sriov_ports(self, context,
                                             pci_requests,
                                             requested_networks):
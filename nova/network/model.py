@@ -470,6 +470,94 @@ class NetworkInfo(list):
         return jsonutils.dumps(self)
 
 
+class LazyNetworkInfo(NetworkInfo):
+    """NetworkInfo which is only hydrated from its JSON when accessed.
+
+    Instances are often loaded with their info cache only to read a few
+    fields of it, or none at all. This keeps the JSON of the network info
+    and only builds the VIF models the first time the list is used. The
+    fixed_ips(), floating_ips() and json() methods are served from the JSON
+    without building the VIFs, and len() without building anything.
+    The JSON is parsed right away, so that invalid JSON is still rejected.
+
+    Like NetworkInfoAsyncWrapper, this relies on the list methods: functions
+    reading the list storage directly, e.g. the C JSON encoder, see an empty
+    list until the network info is hydrated.
+    """
+
+    def __init__(self, network_info):
+        super(LazyNetworkInfo, self).__init__()
+        self._json = None
+        if isinstance(network_info, six.string_types):
+            self._json = network_info
+            network_info = jsonutils.loads(network_info)
+        # NOTE: The list of VIF dicts, or None once hydrated.
+        self._network_info = network_info
+
+    def hydrate_now(self):
+        """Builds the VIF models, if not done already."""
+        if self._network_info is not None:
+            vifs = [VIF.hydrate(vif) for vif in self._network_info]
+            self._network_info = None
+            self._json = None
+            list.extend(self, vifs)
+
+    def _raw_fixed_ips(self):
+        return [fixed_ip for vif in self._network_info
+                for subnet in vif['network']['subnets']
+                for fixed_ip in subnet['ips']]
+
+    def fixed_ips(self):
+        if self._network_info is None:
+            return super(LazyNetworkInfo, self).fixed_ips()
+        return [FixedIP.hydrate(ip) for ip in self._raw_fixed_ips()]
+
+    def floating_ips(self):
+        if self._network_info is None:
+            return super(LazyNetworkInfo, self).floating_ips()
+        return [IP.hydrate(floating_ip) for fixed_ip in self._raw_fixed_ips()
+                for floating_ip in fixed_ip.get('floating_ips', [])]
+
+    def json(self):
+        if self._network_info is None:
+            return super(LazyNetworkInfo, self).json()
+        if self._json is None:
+            self._json = jsonutils.dumps(self._network_info)
+        return self._json
+
+    def __len__(self):
+        if self._network_info is not None:
+            return len(self._network_info)
+        return super(LazyNetworkInfo, self).__len__()
+
+    def __reduce__(self):
+        # NOTE: Copies and pickles are plain, hydrated, NetworkInfo.
+        return NetworkInfo, (list(self),)
+
+
+def _hydrating(method):
+    def wrapper(self, *args, **kwargs):
+        self.hydrate_now()
+        for arg in args:
+            if isinstance(arg, LazyNetworkInfo):
+                arg.hydrate_now()
+        return method(self, *args, **kwargs)
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+for _name in ('__add__', '__contains__', '__delitem__', '__delslice__',
+              '__eq__', '__ge__', '__getitem__', '__getslice__', '__gt__',
+              '__iadd__', '__imul__', '__iter__', '__le__', '__lt__',
+              '__mul__', '__ne__', '__repr__', '__reversed__', '__rmul__',
+              '__setitem__', '__setslice__', 'append', 'clear', 'copy',
+              'count', 'extend', 'index', 'insert', 'pop', 'remove',
+              'reverse', 'sort'):
+    if hasattr(list, _name):
+        setattr(LazyNetworkInfo, _name, _hydrating(getattr(list, _name)))
+
+
 class NetworkInfoAsyncWrapper(NetworkInfo):
     """Wrapper around NetworkInfo that allows retrieving NetworkInfo
     in an async manner.
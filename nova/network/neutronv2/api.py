@@ -15,6 +15,7 @@
 #    under the License.
 #
 
+import collections
 import copy
 import time
 import uuid
@@ -57,6 +58,27 @@ neutron_opts = [
                 default=600,
                 help='Number of seconds before querying neutron for'
                      ' extensions'),
+    cfg.BoolOpt('coalesce_port_queries',
+                default=False,
+                help='Query the floating IPs, subnets and DHCP ports of all '
+                     'the ports of an instance at once when building its '
+                     'network info, instead of querying them port by port. '
+                     'The number of neutron requests then does not depend on '
+                     'the number of ports of the instance.'),
+    cfg.IntOpt('subnet_cache_ttl',
+               default=0,
+               min=0,
+               help='Number of seconds during which the subnets and the DHCP '
+                    'ports of the subnets of the instance ports are cached '
+                    'by nova, rather than being queried from neutron each '
+                    'time the network info of an instance is built. 0 '
+                    'disables the cache.'),
+    cfg.IntOpt('subnet_cache_size',
+               default=1000,
+               min=1,
+               help='Maximum number of subnets and lists of DHCP ports kept '
+                    'in the cache enabled by subnet_cache_ttl. The least '
+                    'recently used ones are evicted first.'),
    ]
 
 NEUTRON_GROUP = 'neutron'
@@ -84,6 +106,7 @@ soft_external_network_attach_authorize = extensions.soft_core_authorizer(
 
 _SESSION = None
 _ADMIN_AUTH = None
+_RESPONSE_CACHE = None
 
 
 def list_opts():
@@ -107,9 +130,11 @@ def list_opts():
 def reset_state():
     global _ADMIN_AUTH
     global _SESSION
+    global _RESPONSE_CACHE
 
     _ADMIN_AUTH = None
     _SESSION = None
+    _RESPONSE_CACHE = None
 
 
 def _load_auth_plugin(conf):
@@ -155,6 +180,50 @@ def get_client(context, admin=False):
                             region_name=CONF.neutron.region_name)
 
 
+class ResponseCache(object):
+    """Short-lived cache of neutron resources, by resource type and id.
+
+    The least recently used entries are evicted once there are more than
+    max_entries of them. The stats count the cache hits and misses, and the
+    neutron requests saved by the cache or by coalescing the queries of
+    several ports.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self.stats = collections.Counter()
+
+    def get(self, resource, key):
+        entry = self._entries.pop((resource, key), None)
+        if entry is None or entry[0] < time.time():
+            self.stats['misses'] += 1
+            return None
+        self._entries[(resource, key)] = entry
+        self.stats['hits'] += 1
+        return entry[1]
+
+    def set(self, resource, key, value):
+        self._entries.pop((resource, key), None)
+        if len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+        self._entries[(resource, key)] = (time.time() + self.ttl, value)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def get_response_cache():
+    global _RESPONSE_CACHE
+
+    if _RESPONSE_CACHE is None:
+        _RESPONSE_CACHE = ResponseCache(CONF.neutron.subnet_cache_ttl,
+                                        CONF.neutron.subnet_cache_size)
+    return _RESPONSE_CACHE
+
+
 def _is_not_duplicate(item, items, items_list_name, instance):
     present = item in items
 
@@ -172,6 +241,46 @@ def _is_not_duplicate(item, items, items_list_name, instance):
     return not present
 
 
+class PrefetchedNetworkResources(object):
+    """The neutron resources of several instances, listed at once.
+
+    Built by API.prefetch_instances_nw_info() and looked up while building
+    the network info model of each of the instances.
+    """
+
+    def __init__(self, ports, networks, subnets, dhcp_ports, floating_ips):
+        self._ports = collections.defaultdict(list)
+        for port in ports:
+            self._ports[port['device_id']].append(port)
+        self._networks = {net['id']: net for net in networks}
+        self._subnets = {subnet['id']: subnet for subnet in subnets}
+        self._dhcp_ports = collections.defaultdict(list)
+        for port in dhcp_ports:
+            self._dhcp_ports[port['network_id']].append(port)
+        self._floating_ips = collections.defaultdict(list)
+        for fip in floating_ips:
+            key = (fip['fixed_ip_address'], fip['port_id'])
+            self._floating_ips[key].append(fip)
+
+    def get_ports(self, instance):
+        return [port for port in self._ports[instance.uuid]
+                if port['tenant_id'] == instance.project_id]
+
+    def get_networks(self, net_ids):
+        return [self._networks[net_id] for net_id in net_ids
+                if net_id in self._networks]
+
+    def get_subnets(self, subnet_ids):
+        return [self._subnets[subnet_id] for subnet_id in subnet_ids
+                if subnet_id in self._subnets]
+
+    def get_dhcp_ports(self, network_id):
+        return self._dhcp_ports[network_id]
+
+    def get_floating_ips(self, fixed_ip, port_id):
+        return self._floating_ips[(fixed_ip, port_id)]
+
+
 class API(base_api.NetworkAPI):
     """API for interacting with the neutron 2.x API."""
 
@@ -937,7 +1046,8 @@ class API(base_api.NetworkAPI):
 
     def _get_instance_nw_info(self, context, instance, networks=None,
                               port_ids=None, admin_client=None,
-                              preexisting_port_ids=None, **kwargs):
+                              preexisting_port_ids=None, prefetched=None,
+                              **kwargs):
         # NOTE(danms): This is an inner method intended to be called
         # by other code that updates instance nwinfo. It *must* be
         # called with the refresh_cache-%(instance_uuid) lock held!
@@ -948,11 +1058,98 @@ class API(base_api.NetworkAPI):
         compute_utils.refresh_info_cache_for_instance(context, instance)
         nw_info = self._build_network_info_model(context, instance, networks,
                                                  port_ids, admin_client,
-                                                 preexisting_port_ids)
+                                                 preexisting_port_ids,
+                                                 prefetched)
         return network_model.NetworkInfo.hydrate(nw_info)
 
+    def prefetch_instances_nw_info(self, context, instances):
+        """Lists the neutron resources of several instances at once.
+
+        The ports of the instances, their subnets, the DHCP ports of these
+        subnets, the floating IPs of the ports and the networks in the info
+        caches of the instances each take a single neutron request.
+        """
+        client = get_client(context, admin=True)
+        ports = client.list_ports(
+            device_id=[instance.uuid for instance in instances]).get(
+                'ports', [])
+
+        net_ids = set()
+        for instance in instances:
+            ifaces = compute_utils.get_nw_info_for_instance(instance)
+            net_ids.update(iface['network']['id'] for iface in ifaces)
+        networks = []
+        if net_ids:
+            networks = client.list_networks(id=list(net_ids)).get(
+                'networks', [])
+
+        return self._prefetch_ports_resources(client, ports, networks)
+
+    def _prefetch_ports_resources(self, client, ports, networks=()):
+        """Lists the subnets, DHCP ports and floating IPs of ports at once."""
+        subnet_ids = []
+        for port in ports:
+            for fixed_ip in port['fixed_ips']:
+                if fixed_ip['subnet_id'] not in subnet_ids:
+                    subnet_ids.append(fixed_ip['subnet_id'])
+        subnets = []
+        dhcp_ports = []
+        if subnet_ids:
+            subnets = self._list_subnets(client, subnet_ids)
+        if subnets:
+            network_ids = []
+            for subnet in subnets:
+                if subnet['network_id'] not in network_ids:
+                    network_ids.append(subnet['network_id'])
+            dhcp_ports = self._list_dhcp_ports(client, network_ids)
+
+        floating_ips = []
+        if ports:
+            floating_ips = self._safe_get_floating_ips(
+                client, port_id=[port['id'] for port in ports])
+
+        return PrefetchedNetworkResources(ports, networks, subnets,
+                                          dhcp_ports, floating_ips)
+
+    def _list_subnets(self, client, subnet_ids):
+        """Lists subnets by id, through the subnet cache if enabled."""
+        if not CONF.neutron.subnet_cache_ttl:
+            return client.list_subnets(id=subnet_ids).get('subnets', [])
+
+        cache = get_response_cache()
+        subnets = [cache.get('subnet', subnet_id) for subnet_id in subnet_ids]
+        if all(subnets):
+            cache.stats['requests_saved'] += 1
+            return subnets
+        subnets = client.list_subnets(id=subnet_ids).get('subnets', [])
+        for subnet in subnets:
+            cache.set('subnet', subnet['id'], subnet)
+        return subnets
+
+    def _list_dhcp_ports(self, client, network_ids):
+        """Lists the DHCP ports of networks, through the subnet cache."""
+        search_opts = {'network_id': network_ids,
+                       'device_owner': 'network:dhcp'}
+        if not CONF.neutron.subnet_cache_ttl:
+            return client.list_ports(**search_opts).get('ports', [])
+
+        if isinstance(network_ids, six.string_types):
+            network_ids = [network_ids]
+        cache = get_response_cache()
+        cached_ports = [cache.get('dhcp_ports', network_id)
+                        for network_id in network_ids]
+        if all(ports is not None for ports in cached_ports):
+            cache.stats['requests_saved'] += 1
+            return [port for ports in cached_ports for port in ports]
+        dhcp_ports = client.list_ports(**search_opts).get('ports', [])
+        for network_id in network_ids:
+            cache.set('dhcp_ports', network_id,
+                      [port for port in dhcp_ports
+                       if port['network_id'] == network_id])
+        return dhcp_ports
+
     def _gather_port_ids_and_networks(self, context, instance, networks=None,
-                                      port_ids=None):
+                                      port_ids=None, prefetched=None):
         """Return an instance's complete list of port_ids and networks."""
 
         if ((networks is None and port_ids is not None) or
@@ -969,9 +1166,12 @@ class API(base_api.NetworkAPI):
             net_ids = [iface['network']['id'] for iface in ifaces]
 
         if networks is None:
-            networks = self._get_available_networks(context,
-                                                    instance.project_id,
-                                                    net_ids)
+            if prefetched is not None:
+                networks = prefetched.get_networks(net_ids)
+            else:
+                networks = self._get_available_networks(context,
+                                                        instance.project_id,
+                                                        net_ids)
         # an interface was added/removed from instance.
         else:
 
@@ -1601,12 +1801,16 @@ class API(base_api.NetworkAPI):
         """Force add a network to the project."""
         raise NotImplementedError()
 
-    def _nw_info_get_ips(self, client, port):
+    def _nw_info_get_ips(self, client, port, prefetched=None):
         network_IPs = []
         for fixed_ip in port['fixed_ips']:
             fixed = network_model.FixedIP(address=fixed_ip['ip_address'])
-            floats = self._get_floating_ips_by_fixed_and_port(
-                client, fixed_ip['ip_address'], port['id'])
+            if prefetched is not None:
+                floats = prefetched.get_floating_ips(fixed_ip['ip_address'],
+                                                     port['id'])
+            else:
+                floats = self._get_floating_ips_by_fixed_and_port(
+                    client, fixed_ip['ip_address'], port['id'])
             for ip in floats:
                 fip = network_model.IP(address=ip['floating_ip_address'],
                                        type='floating')
@@ -1614,8 +1818,9 @@ class API(base_api.NetworkAPI):
             network_IPs.append(fixed)
         return network_IPs
 
-    def _nw_info_get_subnets(self, context, port, network_IPs):
-        subnets = self._get_subnets_from_port(context, port)
+    def _nw_info_get_subnets(self, context, port, network_IPs,
+                             prefetched=None):
+        subnets = self._get_subnets_from_port(context, port, prefetched)
         for subnet in subnets:
             subnet['ips'] = [fixed_ip for fixed_ip in network_IPs
                              if fixed_ip.is_in_subnet(subnet)]
@@ -1700,7 +1905,7 @@ class API(base_api.NetworkAPI):
 
     def _build_network_info_model(self, context, instance, networks=None,
                                   port_ids=None, admin_client=None,
-                                  preexisting_port_ids=None):
+                                  preexisting_port_ids=None, prefetched=None):
         """Return list of ordered VIFs attached to instance.
 
         :param context: Request context.
@@ -1718,6 +1923,8 @@ class API(base_api.NetworkAPI):
                         an instance is de-allocated. Supplied list will
                         be added to the cached list of preexisting port
                         IDs for this instance.
+        :param prefetched: The PrefetchedNetworkResources of the instance,
+                           if any, used instead of querying neutron.
         """
 
         search_opts = {'tenant_id': instance.project_id,
@@ -1727,14 +1934,22 @@ class API(base_api.NetworkAPI):
         else:
             client = admin_client
 
-        data = client.list_ports(**search_opts)
-
-        current_neutron_ports = data.get('ports', [])
+        if prefetched is not None:
+            current_neutron_ports = prefetched.get_ports(instance)
+        else:
+            data = client.list_ports(**search_opts)
+            current_neutron_ports = data.get('ports', [])
         nw_info_refresh = networks is None and port_ids is None
         networks, port_ids = self._gather_port_ids_and_networks(
-                context, instance, networks, port_ids)
+                context, instance, networks, port_ids, prefetched)
         nw_info = network_model.NetworkInfo()
 
+        if (prefetched is None and CONF.neutron.coalesce_port_queries and
+                current_neutron_ports):
+            prefetched = self._prefetch_ports_resources(
+                client, current_neutron_ports)
+            self._count_coalesced_requests(current_neutron_ports)
+
         if preexisting_port_ids is None:
             preexisting_port_ids = []
         preexisting_port_ids = set(
@@ -1754,10 +1969,12 @@ class API(base_api.NetworkAPI):
                     vif_active = True
 
                 network_IPs = self._nw_info_get_ips(client,
-                                                    current_neutron_port)
+                                                    current_neutron_port,
+                                                    prefetched)
                 subnets = self._nw_info_get_subnets(context,
                                                     current_neutron_port,
-                                                    network_IPs)
+                                                    network_IPs,
+                                                    prefetched)
 
                 devname = "tap" + current_neutron_port['id']
                 devname = devname[:network_model.NIC_NAME_LEN]
@@ -1788,9 +2005,36 @@ class API(base_api.NetworkAPI):
                              'Removing from network info_cache.'), port_id,
                          instance=instance)
 
+        if CONF.neutron.coalesce_port_queries or CONF.neutron.subnet_cache_ttl:
+            cache = get_response_cache()
+            LOG.debug('Neutron response cache: %(entries)d entries, '
+                      '%(hits)d hits, %(misses)d misses, %(evictions)d '
+                      'evictions, %(requests_saved)d neutron requests saved '
+                      'by the cache and the coalesced port queries',
+                      {'entries': len(cache),
+                       'hits': cache.stats['hits'],
+                       'misses': cache.stats['misses'],
+                       'evictions': cache.stats['evictions'],
+                       'requests_saved': cache.stats['requests_saved']},
+                      instance=instance)
+
         return nw_info
 
-    def _get_subnets_from_port(self, context, port):
+    @staticmethod
+    def _count_coalesced_requests(ports):
+        """Counts the requests saved by _prefetch_ports_resources()."""
+        num_requests = 0
+        for port in ports:
+            fixed_ips = port['fixed_ips']
+            if fixed_ips:
+                # The floating IPs of each fixed IP, the subnets of the port
+                # and the DHCP ports of each subnet
+                num_requests += len(fixed_ips) + 1 + len(
+                    set(ip['subnet_id'] for ip in fixed_ips))
+        get_response_cache().stats['requests_saved'] += max(
+            0, num_requests - 3)
+
+    def _get_subnets_from_port(self, context, port, prefetched=None):
         """Return the subnets for a given port."""
 
         fixed_ips = port['fixed_ips']
@@ -1801,9 +2045,12 @@ class API(base_api.NetworkAPI):
         # related to the port. To avoid this, the method returns here.
         if not fixed_ips:
             return []
-        search_opts = {'id': [ip['subnet_id'] for ip in fixed_ips]}
-        data = get_client(context).list_subnets(**search_opts)
-        ipam_subnets = data.get('subnets', [])
+        subnet_ids = [ip['subnet_id'] for ip in fixed_ips]
+        if prefetched is not None:
+            ipam_subnets = prefetched.get_subnets(subnet_ids)
+        else:
+            ipam_subnets = self._list_subnets(get_client(context),
+                                              subnet_ids)
         subnets = []
 
         for subnet in ipam_subnets:
@@ -1814,10 +2061,11 @@ class API(base_api.NetworkAPI):
             }
 
             # attempt to populate DHCP server field
-            search_opts = {'network_id': subnet['network_id'],
-                           'device_owner': 'network:dhcp'}
-            data = get_client(context).list_ports(**search_opts)
-            dhcp_ports = data.get('ports', [])
+            if prefetched is not None:
+                dhcp_ports = prefetched.get_dhcp_ports(subnet['network_id'])
+            else:
+                dhcp_ports = self._list_dhcp_ports(get_client(context),
+                                                   subnet['network_id'])
             for p in dhcp_ports:
                 for ip_pair in p['fixed_ips']:
                     if ip_pair['subnet_id'] == subnet['id']:
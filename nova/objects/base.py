@@ -216,6 +216,85 @@ class ObjectListBase(ovoo_base.ObjectListBase):
             return primitive.get(key, default)
 
 
+COMPACT_PRIMITIVE_KEY = 'nova_object.compact'
+_COMPACT_OBJECT_KEY = 'nova_object.ref'
+_PRIMITIVE_KEYS = frozenset(['nova_object.name', 'nova_object.namespace',
+                             'nova_object.version', 'nova_object.data',
+                             'nova_object.changes'])
+
+
+def _compact_value(value, schemas):
+    if isinstance(value, dict):
+        if ('nova_object.name' in value and
+                value.get('nova_object.namespace') == 'nova' and
+                _PRIMITIVE_KEYS.issuperset(value)):
+            data = value['nova_object.data']
+            changes = value.get('nova_object.changes', [])
+            if set(changes).issubset(data):
+                names = tuple(sorted(data))
+                key = (value['nova_object.name'],
+                       value['nova_object.version'], names)
+                ref = [schemas.setdefault(key, len(schemas)),
+                       [_compact_value(data[name], schemas)
+                        for name in names]]
+                if changes:
+                    indexes = {name: i for i, name in enumerate(names)}
+                    ref.append(sorted(indexes[name] for name in changes))
+                return {_COMPACT_OBJECT_KEY: ref}
+        return {k: _compact_value(v, schemas) for k, v in six.iteritems(value)}
+    elif isinstance(value, (list, tuple)):
+        return value.__class__(_compact_value(v, schemas) for v in value)
+    return value
+
+
+def _expand_value(value, schemas):
+    if isinstance(value, dict):
+        if len(value) == 1 and _COMPACT_OBJECT_KEY in value:
+            ref = value[_COMPACT_OBJECT_KEY]
+            name, version, names = schemas[ref[0]]
+            primitive = {
+                'nova_object.name': name,
+                'nova_object.namespace': 'nova',
+                'nova_object.version': version,
+                'nova_object.data': {
+                    field: _expand_value(v, schemas)
+                    for field, v in zip(names, ref[1])},
+            }
+            if len(ref) > 2:
+                primitive['nova_object.changes'] = [names[i] for i in ref[2]]
+            return primitive
+        return {k: _expand_value(v, schemas) for k, v in six.iteritems(value)}
+    elif isinstance(value, (list, tuple)):
+        return value.__class__(_expand_value(v, schemas) for v in value)
+    return value
+
+
+def compact_primitive(primitive):
+    """Make the compact form of an object primitive.
+
+    The field names of the objects, and their name and version, are stored
+    once per kind of object in a table. The objects are stored as the index
+    of their kind in that table and the list of their field values, and the
+    list of the indexes of their changed fields.
+
+    :param primitive: The result of obj_to_primitive() on an object
+    :returns: A dict with the COMPACT_PRIMITIVE_KEY key, which
+              expand_primitive() turns back into primitive
+    """
+    schemas = {}
+    root = _compact_value(primitive, schemas)
+    table = [None] * len(schemas)
+    for (name, version, names), index in six.iteritems(schemas):
+        table[index] = [name, version, list(names)]
+    return {COMPACT_PRIMITIVE_KEY: [table, root]}
+
+
+def expand_primitive(compact):
+    """Return the object primitive made compact by compact_primitive()."""
+    table, root = compact[COMPACT_PRIMITIVE_KEY]
+    return _expand_value(root, table)
+
+
 class NovaObjectSerializer(messaging.NoOpSerializer):
     """A NovaObject-aware Serializer.
 
@@ -223,8 +302,14 @@ class NovaObjectSerializer(messaging.NoOpSerializer):
     ability to serialize and deserialize NovaObject entities. Any service
     that needs to accept or return NovaObjects as arguments or result values
     should pass this to its RPCClient and RPCServer objects.
+
+    Objects are serialized in the form made by compact_primitive() when
+    compact is set, which RPC clients only do when the RPC version of the
+    server allows it. Both forms are deserialized.
     """
 
+    compact = False
+
     @property
     def conductor(self):
         if not hasattr(self, '_conductor'):
@@ -281,9 +366,13 @@ class NovaObjectSerializer(messaging.NoOpSerializer):
         elif (hasattr(entity, 'obj_to_primitive') and
               callable(entity.obj_to_primitive)):
             entity = entity.obj_to_primitive()
+            if self.compact:
+                entity = compact_primitive(entity)
         return entity
 
     def deserialize_entity(self, context, entity):
+        if isinstance(entity, dict) and COMPACT_PRIMITIVE_KEY in entity:
+            entity = expand_primitive(entity)
         if isinstance(entity, dict) and 'nova_object.name' in entity:
             entity = self._process_object(context, entity)
         elif isinstance(entity, (tuple, list, set, dict)):
@@ -15,6 +15,7 @@
 
 from oslo_log import log as logging
 from oslo_serialization import jsonutils
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 from oslo_utils import versionutils
 
@@ -25,6 +26,7 @@ from nova import objects
 from nova.objects import base
 from nova.objects import fields
 from nova.objects import pci_device_pool
+from nova import utils
 
 CONF = nova.conf.CONF
 LOG = logging.getLogger(__name__)
@@ -376,7 +378,8 @@ class ComputeNodeList(base.ObjectListBase, base.NovaObject):
     # Version 1.12 ComputeNode version 1.12
     # Version 1.13 ComputeNode version 1.13
     # Version 1.14 ComputeNode version 1.14
-    VERSION = '1.14'
+    # Version 1.15 Added get_all_changed_since()
+    VERSION = '1.15'
     fields = {
         'objects': fields.ListOfObjectsField('ComputeNode'),
         }
@@ -387,6 +390,27 @@ class ComputeNodeList(base.ObjectListBase, base.NovaObject):
         return base.obj_make_list(context, cls(context), objects.ComputeNode,
                                   db_computes)
 
+    @base.remotable_classmethod
+    def _get_all_changed_since(cls, context, changed_since):
+        # NOTE: The timestamp is a string primitive for the remote call, so
+        # it has to be converted back to a datetime for the DB API call.
+        changed_since = timeutils.parse_isotime(changed_since)
+        db_computes = db.compute_node_get_all_changed_since(context,
+                                                            changed_since)
+        return base.obj_make_list(context, cls(context), objects.ComputeNode,
+                                  db_computes)
+
+    @classmethod
+    def get_all_changed_since(cls, context, changed_since):
+        """Get compute nodes created, updated or deleted since a given time.
+
+        :param context: nova request context
+        :param changed_since: datetime after which changes are returned
+        :returns: ComputeNodeList, including the soft-deleted compute nodes
+        """
+        return cls._get_all_changed_since(context,
+                                          utils.isotime(changed_since))
+
     @base.remotable_classmethod
     def get_by_hypervisor(cls, context, hypervisor_match):
         db_computes = db.compute_node_search_by_hypervisor(context,
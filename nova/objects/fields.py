@@ -608,8 +608,8 @@ class NetworkModel(FieldType):
         if isinstance(value, network_model.NetworkInfo):
             return value
         elif isinstance(value, six.string_types):
-            # Hmm, do we need this?
-            return network_model.NetworkInfo.hydrate(value)
+            # NOTE: This is the JSON of the info cache loaded from the DB.
+            return network_model.LazyNetworkInfo(value)
         else:
             raise ValueError(_('A NetworkModel is required in field %s') %
                              attr)
@@ -620,7 +620,7 @@ class NetworkModel(FieldType):
 
     @staticmethod
     def from_primitive(obj, attr, value):
-        return network_model.NetworkInfo.hydrate(value)
+        return network_model.LazyNetworkInfo(value)
 
     def stringify(self, value):
         return 'NetworkModel({0!s})'.format((
@@ -21,12 +21,14 @@ import nova.conductor.rpcapi
 import nova.conductor.tasks.live_migrate
 import nova.conf
 import nova.console.manager
+import nova.console.pump
 import nova.console.rpcapi
 import nova.console.serial
 import nova.console.xvp
 import nova.consoleauth
 import nova.consoleauth.manager
 import nova.consoleauth.rpcapi
+import nova.consoleauth.token_cache
 import nova.crypto
 import nova.db.api
 import nova.db.base
@@ -39,6 +41,7 @@ import nova.notifications
 import nova.objects.network
 import nova.paths
 import nova.quota
+import nova.rpc
 import nova.service
 import nova.servicegroup.api
 import nova.spice
@@ -55,13 +58,17 @@ def list_opts():
              [nova.consoleauth.consoleauth_topic_opt],
              [nova.db.base.db_driver_opt],
              [nova.ipv6.api.ipv6_backend_opt],
+             [nova.rpc.compact_primitives_opt],
              [nova.servicegroup.api.servicegroup_driver_opt],
+             [nova.servicegroup.api.heartbeat_batch_interval_opt],
              nova.cloudpipe.pipelib.cloudpipe_opts,
              nova.cmd.novnc.opts,
              nova.console.manager.console_manager_opts,
+             nova.console.pump.pump_opts,
              nova.console.rpcapi.rpcapi_opts,
              nova.console.xvp.xvp_opts,
              nova.consoleauth.manager.consoleauth_opts,
+             nova.consoleauth.token_cache.token_cache_opts,
              nova.crypto.crypto_opts,
              nova.db.api.db_opts,
              nova.db.sqlalchemy.api.db_opts,
@@ -49,6 +49,17 @@ notification_opts = [
 
 CONF.register_opts(notification_opts)
 
+compact_primitives_opt = cfg.BoolOpt(
+    'compact_object_primitives',
+    default=False,
+    help='Send the objects in the messages to nova-compute and '
+         'nova-conductor in a compact form, which does not repeat the field '
+         'names of the objects of the same kind and the keys describing each '
+         'object. It is only used with the services whose RPC API version '
+         'shows that they can read it.')
+
+CONF.register_opt(compact_primitives_opt)
+
 LOG = logging.getLogger(__name__)
 
 TRANSPORT = None
@@ -19,6 +19,7 @@ You can customize this scheduler by specifying your own Host Filters and
 Weighing Functions.
 """
 
+import heapq
 import random
 
 from oslo_log import log as logging
@@ -107,6 +108,9 @@ class FilterScheduler(driver.Scheduler):
         num_instances = spec_obj.num_instances
         # NOTE(sbauza): Adding one field for any out-of-tree need
         spec_obj.config_options = config_options
+        if CONF.scheduler_batch_placement and num_instances > 1:
+            return self._schedule_batch(hosts, spec_obj)
+
         for num in range(num_instances):
             # Filter local hosts based on requirements ...
             hosts = self.host_manager.get_filtered_hosts(hosts,
@@ -117,13 +121,13 @@ class FilterScheduler(driver.Scheduler):
 
             LOG.debug("Filtered %(hosts)s", {'hosts': hosts})
 
+            scheduler_host_subset_size = max(1,
+                                             CONF.scheduler_host_subset_size)
             weighed_hosts = self.host_manager.get_weighed_hosts(hosts,
-                    spec_obj)
+                    spec_obj, limit=scheduler_host_subset_size)
 
             LOG.debug("Weighed %(hosts)s", {'hosts': weighed_hosts})
 
-            scheduler_host_subset_size = max(1,
-                                             CONF.scheduler_host_subset_size)
             if scheduler_host_subset_size < len(weighed_hosts):
                 weighed_hosts = weighed_hosts[0:scheduler_host_subset_size]
             chosen_host = random.choice(weighed_hosts)
@@ -133,11 +137,89 @@ class FilterScheduler(driver.Scheduler):
 
             # Now consume the resources so the filter/weights
             # will change for the next instance.
-            chosen_host.obj.consume_from_request(spec_obj)
+            self._consume_selected_host(chosen_host, spec_obj)
+        return selected_hosts
+
+    def _consume_selected_host(self, chosen_host, spec_obj):
+        chosen_host.obj.consume_from_request(spec_obj)
+        if spec_obj.instance_group is not None:
+            spec_obj.instance_group.hosts.append(chosen_host.obj.host)
+            # hosts has to be not part of the updates when saving
+            spec_obj.instance_group.obj_reset_changes(['hosts'])
+
+    def _schedule_batch(self, hosts, spec_obj):
+        """Place all the instances of a request with a single filtering pass.
+
+        The hosts are filtered and weighed once, then kept in a priority queue
+        ordered by weight. After each placement, only the hosts whose filter
+        results may have changed are filtered and weighed again before being
+        put back into the queue: the host which was just consumed, and the
+        hosts that the server group filters could now reject.
+        """
+        num_instances = spec_obj.num_instances
+        scheduler_host_subset_size = max(1, CONF.scheduler_host_subset_size)
+
+        hosts = list(self.host_manager.get_filtered_hosts(hosts, spec_obj,
+                                                          index=0))
+        if not hosts:
+            return []
+        LOG.debug("Filtered %(hosts)s", {'hosts': hosts})
+
+        weighed_hosts = self.host_manager.get_weighed_hosts(hosts, spec_obj)
+        bounds = self.host_manager.get_weight_bounds()
+
+        # NOTE: The position of the host in the filtered list breaks the ties
+        # between equal weights, like the stable sort of the weight handler.
+        positions = {id(host): position for position, host in enumerate(hosts)}
+        queue = [(-weighed_host.weight, positions[id(weighed_host.obj)],
+                  weighed_host) for weighed_host in weighed_hosts]
+        heapq.heapify(queue)
+
+        selected_hosts = []
+        for num in range(num_instances):
+            if not queue:
+                # Can't get any more locally.
+                break
+
+            best_entries = [heapq.heappop(queue) for _ in
+                            range(min(scheduler_host_subset_size,
+                                      len(queue)))]
+            chosen_entry = random.choice(best_entries)
+            for entry in best_entries:
+                if entry is not chosen_entry:
+                    heapq.heappush(queue, entry)
+            chosen_host = chosen_entry[2]
+
+            LOG.debug("Selected host: %(host)s", {'host': chosen_host})
+            selected_hosts.append(chosen_host)
+            self._consume_selected_host(chosen_host, spec_obj)
+
+            if num == num_instances - 1:
+                break
+
+            stale_entries = [chosen_entry]
             if spec_obj.instance_group is not None:
-                spec_obj.instance_group.hosts.append(chosen_host.obj.host)
-                # hosts has to be not part of the updates when saving
-                spec_obj.instance_group.obj_reset_changes(['hosts'])
+                group = spec_obj.instance_group
+                if 'affinity' in (group.policies or []):
+                    # Every other host may now be rejected.
+                    stale_entries.extend(queue)
+                    queue = []
+                else:
+                    # The other nodes of the chosen host may now be rejected.
+                    stale_host = chosen_host.obj.host
+                    stale_entries.extend(entry for entry in queue
+                                         if entry[2].obj.host == stale_host)
+                    queue = [entry for entry in queue
+                             if entry[2].obj.host != stale_host]
+                    heapq.heapify(queue)
+
+            stale_hosts = [entry[2].obj for entry in stale_entries]
+            for host in self.host_manager.get_filtered_hosts(
+                    stale_hosts, spec_obj, index=num + 1) or []:
+                weighed_host = self.host_manager.weigh_host(host, spec_obj,
+                                                            bounds)
+                heapq.heappush(queue, (-weighed_host.weight,
+                                       positions[id(host)], weighed_host))
         return selected_hosts
 
     def _get_all_host_states(self, context):
@@ -16,11 +16,29 @@
 """
 Scheduler host filters
 """
+import collections
+
+from oslo_log import log as logging
+
+import nova.conf
 from nova import filters
+from nova.i18n import _LW
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CONF = nova.conf.CONF
+LOG = logging.getLogger(__name__)
 
 
 class BaseHostFilter(filters.BaseFilter):
     """Base class for host filters."""
+
+    # Set to True in a subclass implementing hosts_pass()
+    vectorized = False
+
     def _filter_one(self, obj, filter_properties):
         """Return True if the object passes the filter, otherwise False."""
         return self.host_passes(obj, filter_properties)
@@ -31,10 +49,170 @@ class BaseHostFilter(filters.BaseFilter):
         """
         raise NotImplementedError()
 
+    def hosts_pass(self, columns, filter_properties):
+        """Return an array of booleans telling which hosts pass the filter.
+
+        :param columns: HostStateColumnsView of the hosts to filter
+
+        Override this in a subclass along with setting vectorized to True.
+        """
+        raise NotImplementedError()
+
+    def get_cache_key(self, filter_properties):
+        """Return a hashable key of the request data the filter depends on.
+
+        Override this in a subclass whose result for a host only depends on
+        this key, on the aggregates of the host and on get_host_cache_key(),
+        so that the results can be reused for later requests with the same
+        key. Returns None if the results must not be cached.
+        """
+        return None
+
+    def get_host_cache_key(self, host_state):
+        """Return a hashable key of the host data the filter depends on,
+        besides the aggregates of the host.
+        """
+        return None
+
+
+class HostStateColumns(object):
+    """Columnar view of the resources of a list of HostStates.
+
+    Each HostState attribute is loaded into an array the first time a filter
+    asks for it, so that the vectorized filters can evaluate all the hosts at
+    once instead of one at a time.
+    """
+
+    def __init__(self, host_states):
+        self.host_states = host_states
+        self._indexes = {id(host_state): i
+                         for i, host_state in enumerate(host_states)}
+        self._columns = {}
+
+    def column(self, name):
+        column = self._columns.get(name)
+        if column is None:
+            column = numpy.array([getattr(host_state, name)
+                                  for host_state in self.host_states],
+                                 dtype=float)
+            self._columns[name] = column
+        return column
+
+    def view(self, host_states):
+        """Return a view of the columns restricted to some of the hosts."""
+        indexes = numpy.array([self._indexes[id(host_state)]
+                               for host_state in host_states], dtype=int)
+        return HostStateColumnsView(self, host_states, indexes)
+
+
+class HostStateColumnsView(object):
+    """Columns of a subset of the hosts of a HostStateColumns."""
+
+    def __init__(self, columns, host_states, indexes):
+        self._columns = columns
+        self.host_states = host_states
+        self._indexes = indexes
+
+    def __getitem__(self, name):
+        return self._columns.column(name)[self._indexes]
+
+    def __len__(self):
+        return len(self.host_states)
+
+    def map(self, func):
+        """Return an array of the values of func for each HostState."""
+        return numpy.array([func(host_state)
+                            for host_state in self.host_states], dtype=float)
+
+    def set_limits(self, key, values, mask):
+        """Set the limits of the hosts selected by mask to the values."""
+        for i in numpy.flatnonzero(mask):
+            self.host_states[i].limits[key] = float(values[i])
+
+
+class HostFilterResultCache(object):
+    """Results of the cacheable filters for each host, per request key.
+
+    The least recently used request keys are evicted once there are more than
+    max_keys of them.
+    """
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._results = collections.OrderedDict()
+        self.stats = collections.Counter()
+
+    def get_results(self, filter_, cache_key):
+        """Return the dict of (host, nodename) to (host key, passed)."""
+        key = (filter_.__class__.__name__, cache_key)
+        results = self._results.pop(key, None)
+        if results is None:
+            results = {}
+            if len(self._results) >= self.max_keys:
+                self._results.popitem(last=False)
+        self._results[key] = results
+        return results
+
+    def clear(self):
+        self._results.clear()
+        self.stats['clears'] += 1
+
 
 class HostFilterHandler(filters.BaseFilterHandler):
     def __init__(self):
         super(HostFilterHandler, self).__init__(BaseHostFilter)
+        self.use_vectorized_filters = CONF.scheduler_use_vectorized_filters
+        if self.use_vectorized_filters and numpy is None:
+            LOG.warning(_LW("The numpy library is not available, the "
+                            "scheduler filters will not be vectorized."))
+            self.use_vectorized_filters = False
+        self.result_cache = None
+        if CONF.scheduler_filter_cache_size > 0:
+            self.result_cache = HostFilterResultCache(
+                CONF.scheduler_filter_cache_size)
+
+    def clear_cached_results(self):
+        if self.result_cache is not None:
+            self.result_cache.clear()
+
+    def _get_filter_context(self, host_states, spec_obj):
+        if self.use_vectorized_filters:
+            return HostStateColumns(host_states)
+
+    def _filter_all(self, filter_, host_states, spec_obj, columns):
+        if self.result_cache is not None:
+            cache_key = filter_.get_cache_key(spec_obj)
+            if cache_key is not None:
+                return self._filter_all_cached(filter_, host_states, spec_obj,
+                                               cache_key)
+        if columns is None or not filter_.vectorized:
+            return super(HostFilterHandler, self)._filter_all(
+                filter_, host_states, spec_obj, columns)
+        passes = filter_.hosts_pass(columns.view(host_states), spec_obj)
+        return [host_states[i] for i in numpy.flatnonzero(passes)]
+
+    def _filter_all_cached(self, filter_, host_states, spec_obj, cache_key):
+        results = self.result_cache.get_results(filter_, cache_key)
+        stats = self.result_cache.stats
+        passing_host_states = []
+        for host_state in host_states:
+            # NOTE: A request started before the aggregates were updated may
+            # store results computed from the previous aggregates after the
+            # cache was cleared, the generation keeps them from being reused.
+            host_key = (filter_.get_host_cache_key(host_state),
+                        host_state.aggregates_generation)
+            result = results.get((host_state.host, host_state.nodename))
+            if result is not None and result[0] == host_key:
+                passed = result[1]
+                stats['hits'] += 1
+            else:
+                passed = filter_.host_passes(host_state, spec_obj)
+                results[(host_state.host, host_state.nodename)] = (host_key,
+                                                                   passed)
+                stats['misses'] += 1
+            if passed:
+                passing_host_states.append(host_state)
+        return passing_host_states
 
 
 def all_filters():
@@ -31,6 +31,10 @@ class AggregateImagePropertiesIsolation(filters.BaseHostFilter):
     # Aggregate data and instance type does not change within a request
     run_filter_once_per_request = True
 
+    def get_cache_key(self, spec_obj):
+        image_props = spec_obj.image.properties if spec_obj.image else {}
+        return utils.image_props_cache_key(image_props)
+
     def host_passes(self, host_state, spec_obj):
         """Checks a host in an aggregate that metadata key/value match
         with image properties.
@@ -19,6 +19,7 @@ import six
 
 from nova.scheduler import filters
 from nova.scheduler.filters import extra_specs_ops
+from nova.scheduler.filters import utils
 
 
 LOG = logging.getLogger(__name__)
@@ -30,6 +31,14 @@ class ComputeCapabilitiesFilter(filters.BaseHostFilter):
     # Instance type and host capabilities do not change within a request
     run_filter_once_per_request = True
 
+    def get_cache_key(self, spec_obj):
+        return utils.extra_specs_cache_key(spec_obj.flavor)
+
+    def get_host_cache_key(self, host_state):
+        # NOTE: The capabilities can be any attribute of the host, which are
+        # all refreshed when the update time of the host changes.
+        return host_state.updated
+
     def _get_capabilities(self, host_state, scope):
         cap = host_state
         for index in range(0, len(scope)):
@@ -26,9 +26,16 @@ LOG = logging.getLogger(__name__)
 
 class BaseCoreFilter(filters.BaseHostFilter):
 
+    vectorized = True
+
     def _get_cpu_allocation_ratio(self, host_state, spec_obj):
         raise NotImplementedError
 
+    def _get_cpu_allocation_ratios(self, columns, spec_obj):
+        return columns.map(
+            lambda host_state: self._get_cpu_allocation_ratio(host_state,
+                                                              spec_obj))
+
     def host_passes(self, host_state, spec_obj):
         """Return True if host has sufficient CPU cores."""
         if not host_state.vcpus_total:
@@ -68,6 +75,32 @@ class BaseCoreFilter(filters.BaseHostFilter):
 
         return True
 
+    def hosts_pass(self, columns, spec_obj):
+        """Return the hosts which have sufficient CPU cores."""
+        instance_vcpus = spec_obj.vcpus
+        host_vcpus_total = columns['vcpus_total']
+        cpu_allocation_ratio = self._get_cpu_allocation_ratios(columns,
+                                                               spec_obj)
+        vcpus_total = host_vcpus_total * cpu_allocation_ratio
+        has_limit = vcpus_total > 0
+
+        # Do not allow an instance to overcommit against itself, only
+        # against other instances.
+        overcommits = has_limit & (host_vcpus_total < instance_vcpus)
+        free_vcpus = vcpus_total - columns['vcpus_used']
+        passes = ~overcommits & (free_vcpus >= instance_vcpus)
+
+        # Fail safe for the hosts whose VCPUs are not set
+        vcpus_not_set = host_vcpus_total == 0
+        if vcpus_not_set.any():
+            LOG.warning(_LW("VCPUs not set; assuming CPU collection broken"))
+            passes |= vcpus_not_set
+
+        # Only provide a VCPU limit to compute if the virt driver is reporting
+        # an accurate count of installed VCPUs. (XenServer driver does not)
+        columns.set_limits('vcpu', vcpus_total, has_limit)
+        return passes
+
 
 class CoreFilter(BaseCoreFilter):
     """CoreFilter filters based on CPU core utilization."""
@@ -75,6 +108,9 @@ class CoreFilter(BaseCoreFilter):
     def _get_cpu_allocation_ratio(self, host_state, spec_obj):
         return host_state.cpu_allocation_ratio
 
+    def _get_cpu_allocation_ratios(self, columns, spec_obj):
+        return columns['cpu_allocation_ratio']
+
 
 class AggregateCoreFilter(BaseCoreFilter):
     """AggregateCoreFilter with per-aggregate CPU subscription flag.
@@ -28,9 +28,14 @@ CONF = nova.conf.CONF
 class DiskFilter(filters.BaseHostFilter):
     """Disk Filter with over subscription flag."""
 
+    vectorized = True
+
     def _get_disk_allocation_ratio(self, host_state, spec_obj):
         return host_state.disk_allocation_ratio
 
+    def _get_disk_allocation_ratios(self, columns, spec_obj):
+        return columns['disk_allocation_ratio']
+
     def host_passes(self, host_state, spec_obj):
         """Filter based on disk usage."""
         requested_disk = (1024 * (spec_obj.root_gb +
@@ -59,6 +64,24 @@ class DiskFilter(filters.BaseHostFilter):
         host_state.limits['disk_gb'] = disk_gb_limit
         return True
 
+    def hosts_pass(self, columns, spec_obj):
+        """Filter based on disk usage."""
+        requested_disk = (1024 * (spec_obj.root_gb +
+                                  spec_obj.ephemeral_gb) +
+                          spec_obj.swap)
+
+        total_usable_disk_mb = columns['total_usable_disk_gb'] * 1024
+        disk_allocation_ratio = self._get_disk_allocation_ratios(columns,
+                                                                 spec_obj)
+
+        disk_mb_limit = total_usable_disk_mb * disk_allocation_ratio
+        used_disk_mb = total_usable_disk_mb - columns['free_disk_mb']
+        usable_disk_mb = disk_mb_limit - used_disk_mb
+        passes = usable_disk_mb >= requested_disk
+
+        columns.set_limits('disk_gb', disk_mb_limit / 1024, passes)
+        return passes
+
 
 class AggregateDiskFilter(DiskFilter):
     """AggregateDiskFilter with per-aggregate disk allocation ratio flag.
@@ -80,3 +103,8 @@ class AggregateDiskFilter(DiskFilter):
             ratio = host_state.disk_allocation_ratio
 
         return ratio
+
+    def _get_disk_allocation_ratios(self, columns, spec_obj):
+        return columns.map(
+            lambda host_state: self._get_disk_allocation_ratio(host_state,
+                                                               spec_obj))
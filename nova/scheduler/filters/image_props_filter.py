@@ -41,6 +41,16 @@ class ImagePropertiesFilter(filters.BaseHostFilter):
     # a request
     run_filter_once_per_request = True
 
+    def get_cache_key(self, spec_obj):
+        image_props = spec_obj.image.properties if spec_obj.image else {}
+        return (image_props.get('hw_architecture'),
+                image_props.get('img_hv_type'),
+                image_props.get('hw_vm_mode'),
+                image_props.get('img_hv_requested_version'))
+
+    def get_host_cache_key(self, host_state):
+        return host_state.updated
+
     def _instance_supported(self, host_state, image_props,
                             hypervisor_version):
         img_arch = image_props.get('hw_architecture')
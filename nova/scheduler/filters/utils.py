@@ -46,6 +46,25 @@ def aggregate_metadata_get_by_host(host_state, key=None):
     return metadata
 
 
+def extra_specs_cache_key(flavor):
+    """Returns a hashable key of the extra specs of a flavor."""
+    if not flavor.obj_attr_is_set('extra_specs') or not flavor.extra_specs:
+        return ()
+    return tuple(sorted(flavor.extra_specs.items()))
+
+
+def image_props_cache_key(image_props):
+    """Returns a hashable key of the image properties which are set."""
+    if isinstance(image_props, dict):
+        items = image_props.items()
+    else:
+        items = ((name, getattr(image_props, name))
+                 for name in image_props.obj_fields
+                 if image_props.obj_attr_is_set(name))
+    return tuple(sorted((name, str(value)) for name, value in items
+                        if value))
+
+
 def validate_num_values(vals, default=None, cast_to=int, based_on=min):
     """Returns a correctly casted value based on a set of values.
 
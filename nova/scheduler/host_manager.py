@@ -38,6 +38,7 @@ from nova.i18n import _LI, _LW
 from nova import objects
 from nova.pci import stats as pci_stats
 from nova.scheduler import filters
+from nova.scheduler import timings
 from nova.scheduler import weights
 from nova import utils
 from nova.virt import hardware
@@ -143,6 +144,8 @@ class HostState(object):
 
         # List of aggregates the host belongs to
         self.aggregates = []
+        # HostManager.aggregates_generation when the aggregates were set
+        self.aggregates_generation = 0
 
         # Instances on this host
         self.instances = {}
@@ -338,17 +341,34 @@ class HostManager(object):
         weigher_classes = self.weight_handler.get_matching_classes(
                 CONF.scheduler_weight_classes)
         self.weighers = [cls() for cls in weigher_classes]
+        self.timings = None
+        if CONF.scheduler_timings_log_interval > 0:
+            self.timings = timings.SchedulerTimings()
+        self.filter_handler.timings = self.timings
+        self.weight_handler.timings = self.timings
         # Dict of aggregates keyed by their ID
         self.aggs_by_id = {}
         # Dict of set of aggregate IDs keyed by the name of the host belonging
         # to those aggregates
         self.host_aggregates_map = collections.defaultdict(set)
+        # Incremented on each update of the aggregates, the host states are
+        # stamped with it so that the cached filter results of hosts whose
+        # aggregates have changed are not reused.
+        self.aggregates_generation = 0
         self._init_aggregates()
         self.tracks_instance_changes = CONF.scheduler_tracks_instance_changes
         # Dict of instances and status, keyed by host
         self._instance_info = {}
         if self.tracks_instance_changes:
             self._init_instance_info()
+        self.incremental_host_refresh = CONF.scheduler_incremental_host_refresh
+        # Dict of the live ComputeNode objects, keyed by their ID, kept between
+        # two calls of get_all_host_states() for incremental refreshes
+        self._compute_nodes = {}
+        # Most recent change timestamp seen amongst the compute nodes
+        self._compute_nodes_changed_since = None
+        self._last_full_refresh = None
+        self.host_refresh_stats = collections.Counter()
 
     def _load_filters(self):
         return CONF.scheduler_default_filters
@@ -368,6 +388,8 @@ class HostManager(object):
                 self._update_aggregate(agg)
         else:
             self._update_aggregate(aggregates)
+        self.aggregates_generation += 1
+        self.filter_handler.clear_cached_results()
 
     def _update_aggregate(self, aggregate):
         self.aggs_by_id[aggregate.id] = aggregate
@@ -388,6 +410,8 @@ class HostManager(object):
         for host in aggregate.hosts:
             if aggregate.id in self.host_aggregates_map[host]:
                 self.host_aggregates_map[host].remove(aggregate.id)
+        self.aggregates_generation += 1
+        self.filter_handler.clear_cached_results()
 
     def _init_instance_info(self):
         """Creates the initial view of instances for all hosts.
@@ -538,10 +562,22 @@ class HostManager(object):
         return self.filter_handler.get_filtered_objects(filters,
                 hosts, spec_obj, index)
 
-    def get_weighed_hosts(self, hosts, spec_obj):
-        """Weigh the hosts."""
+    def get_weighed_hosts(self, hosts, spec_obj, limit=None):
+        """Weigh the hosts.
+
+        If limit is set, only the limit most-weighed hosts are returned.
+        """
         return self.weight_handler.get_weighed_objects(self.weighers,
-                hosts, spec_obj)
+                hosts, spec_obj, limit=limit)
+
+    def get_weight_bounds(self):
+        """Return the normalization bounds used by the last weighing."""
+        return self.weight_handler.get_weight_bounds(self.weighers)
+
+    def weigh_host(self, host, spec_obj, bounds):
+        """Weigh a single host with the given normalization bounds."""
+        return self.weight_handler.weigh_object(self.weighers, host,
+                spec_obj, bounds)
 
     def get_all_host_states(self, context):
         """Returns a list of HostStates that represents all the hosts
@@ -549,11 +585,18 @@ class HostManager(object):
         in HostState are pre-populated and adjusted based on data in the db.
         """
 
+        start_time = time.time()
         service_refs = {service.host: service
                         for service in objects.ServiceList.get_by_binary(
                             context, 'nova-compute', include_disabled=True)}
         # Get resource usage across the available compute nodes:
-        compute_nodes = objects.ComputeNodeList.get_all(context)
+        if self.incremental_host_refresh:
+            compute_nodes, changed_ids = self._get_changed_compute_nodes(
+                context)
+        else:
+            compute_nodes = objects.ComputeNodeList.get_all(context)
+            changed_ids = None
+        db_time = time.time() - start_time
         seen_nodes = set()
         for compute in compute_nodes:
             service = service_refs.get(compute.host)
@@ -567,16 +610,22 @@ class HostManager(object):
             node = compute.hypervisor_hostname
             state_key = (host, node)
             host_state = self.host_state_map.get(state_key)
+            changed_compute = compute
             if not host_state:
                 host_state = self.host_state_cls(host, node, compute=compute)
                 self.host_state_map[state_key] = host_state
+            elif changed_ids is not None and compute.id not in changed_ids:
+                # The compute node record did not change since the host state
+                # was last updated from it, so there is nothing to refresh.
+                changed_compute = None
             # We force to update the aggregates info each time a new request
             # comes in, because some changes on the aggregates could have been
             # happening after setting this field for the first time
-            host_state.update(compute,
+            host_state.update(changed_compute,
                               dict(service),
                               self._get_aggregates_info(host),
                               self._get_instance_info(context, compute))
+            host_state.aggregates_generation = self.aggregates_generation
 
             seen_nodes.add(state_key)
 
@@ -588,8 +637,61 @@ class HostManager(object):
                          "from scheduler"), {'host': host, 'node': node})
             del self.host_state_map[state_key]
 
+        if self.timings is not None:
+            num_nodes = len(self.host_state_map)
+            self.timings.record('host_states', 'database', db_time,
+                                hosts_out=num_nodes)
+            self.timings.record('host_states', 'total',
+                                time.time() - start_time, hosts_out=num_nodes)
         return six.itervalues(self.host_state_map)
 
+    def _get_changed_compute_nodes(self, context):
+        """Refreshes the cached compute nodes and returns all of them.
+
+        Only the compute nodes which changed since the previous call are
+        fetched from the database, unless a full refresh is due.
+
+        :returns: a tuple of the list of all the live compute nodes and the set
+                  of IDs of the compute nodes which have been fetched
+        """
+        now = timeutils.utcnow()
+        full_refresh_interval = CONF.scheduler_host_full_refresh_interval
+        if (self._compute_nodes_changed_since is None or
+                self._last_full_refresh is None or
+                timeutils.delta_seconds(self._last_full_refresh,
+                                        now) >= full_refresh_interval):
+            compute_nodes = objects.ComputeNodeList.get_all(context)
+            self._compute_nodes = {}
+            self._last_full_refresh = now
+            self.host_refresh_stats['full_refreshes'] += 1
+        else:
+            compute_nodes = objects.ComputeNodeList.get_all_changed_since(
+                context, self._compute_nodes_changed_since)
+            self.host_refresh_stats['incremental_refreshes'] += 1
+
+        changed_ids = set()
+        for compute in compute_nodes:
+            changed_ids.add(compute.id)
+            for field in ('created_at', 'updated_at', 'deleted_at'):
+                changed_at = getattr(compute, field)
+                if changed_at and (self._compute_nodes_changed_since is None
+                        or changed_at > self._compute_nodes_changed_since):
+                    self._compute_nodes_changed_since = changed_at
+            if compute.deleted:
+                self._compute_nodes.pop(compute.id, None)
+                self.host_refresh_stats['nodes_deleted'] += 1
+            else:
+                self._compute_nodes[compute.id] = compute
+
+        fetched = len(changed_ids)
+        reused = len(self._compute_nodes) - len(
+            changed_ids.intersection(self._compute_nodes))
+        self.host_refresh_stats['nodes_fetched'] += fetched
+        self.host_refresh_stats['nodes_reused'] += reused
+        LOG.debug("Refreshed compute nodes: %(fetched)d fetched, %(reused)d "
+                  "reused", {'fetched': fetched, 'reused': reused})
+        return list(self._compute_nodes.values()), changed_ids
+
     def _get_aggregates_info(self, host):
         return [self.aggs_by_id[agg_id] for agg_id in
                 self.host_aggregates_map[host]]
@@ -19,6 +19,8 @@
 Scheduler Service
 """
 
+import time
+
 from oslo_log import log as logging
 import oslo_messaging as messaging
 from oslo_serialization import jsonutils
@@ -28,7 +30,7 @@ from stevedore import driver
 
 import nova.conf
 from nova import exception
-from nova.i18n import _, _LW
+from nova.i18n import _, _LI, _LW
 from nova import manager
 from nova import objects
 from nova import quota
@@ -85,6 +87,17 @@ class SchedulerManager(manager.Manager):
     def _run_periodic_tasks(self, context):
         self.driver.run_periodic_tasks(context)
 
+    @periodic_task.periodic_task(spacing=CONF.scheduler_timings_log_interval)
+    def _log_timings(self, context):
+        timings = getattr(self.driver.host_manager, 'timings', None)
+        if timings is None:
+            return
+        elapsed = time.time() - timings.started_at
+        LOG.info(_LI("Scheduler timings over the last %d seconds:"), elapsed)
+        for line in timings.report():
+            LOG.info(line)
+        timings.reset()
+
     @messaging.expected_exceptions(exception.NoValidHost)
     def select_destinations(self, ctxt,
                             request_spec=None, filter_properties=None,
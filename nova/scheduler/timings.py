@@ -0,0 +1,103 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Timing statistics of the scheduler filters, weighers and host state loading
+"""
+
+import bisect
+import collections
+import time
+
+import six
+
+# Upper bounds of the histogram buckets, in milliseconds. The last bucket
+# holds everything above the last bound.
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class TimingHistogram(object):
+    """Histogram of the wall time spent in a filter, weigher or query."""
+
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.hosts_in = 0
+        self.hosts_out = 0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def record(self, elapsed, hosts_in=0, hosts_out=0):
+        self.calls += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.hosts_in += hosts_in
+        self.hosts_out += hosts_out
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS,
+                                        elapsed * 1000.0)] += 1
+
+    def percentile(self, percent):
+        """Return an upper bound of the given percentile, in milliseconds.
+
+        This is the upper bound of the bucket holding the percentile, or the
+        longest recorded time if the percentile is in the last bucket.
+        """
+        if not self.calls:
+            return 0.0
+        rank = self.calls * percent / 100.0
+        count = 0
+        for bound, bucket_count in zip(BUCKET_BOUNDS_MS, self.buckets):
+            count += bucket_count
+            if count >= rank:
+                return float(min(bound, self.max_time * 1000.0))
+        return self.max_time * 1000.0
+
+
+class SchedulerTimings(object):
+    """Timing histograms of the scheduler, keyed by kind and name.
+
+    The kind is one of 'filter', 'weigher' or 'host_states', and the name is
+    the filter or weigher class name, or the part of get_all_host_states()
+    which is timed.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.histograms = collections.defaultdict(TimingHistogram)
+        self.started_at = time.time()
+
+    def record(self, kind, name, elapsed, hosts_in=0, hosts_out=0):
+        self.histograms[(kind, name)].record(elapsed, hosts_in, hosts_out)
+
+    def report(self):
+        """Return a line per histogram, the most time consuming first."""
+        lines = []
+        histograms = sorted(six.iteritems(self.histograms),
+                            key=lambda item: item[1].total_time,
+                            reverse=True)
+        for (kind, name), histogram in histograms:
+            lines.append(
+                "%(kind)s %(name)s: calls=%(calls)d total=%(total).3fs "
+                "avg=%(avg).2fms p50<=%(p50).2fms p99<=%(p99).2fms "
+                "max=%(max).2fms hosts_in=%(hosts_in)d "
+                "hosts_out=%(hosts_out)d" %
+                {'kind': kind, 'name': name, 'calls': histogram.calls,
+                 'total': histogram.total_time,
+                 'avg': histogram.total_time * 1000.0 / histogram.calls,
+                 'p50': histogram.percentile(50),
+                 'p99': histogram.percentile(99),
+                 'max': histogram.max_time * 1000.0,
+                 'hosts_in': histogram.hosts_in,
+                 'hosts_out': histogram.hosts_out})
+        return lines
@@ -17,8 +17,11 @@
 Scheduler host weights
 """
 
+import nova.conf
 from nova import weights
 
+CONF = nova.conf.CONF
+
 
 class WeighedHost(weights.WeighedObject):
     def to_dict(self):
@@ -41,6 +44,7 @@ class HostWeightHandler(weights.BaseWeightHandler):
 
     def __init__(self):
         super(HostWeightHandler, self).__init__(BaseHostWeigher)
+        self.use_vectorized_weighers = CONF.scheduler_use_vectorized_weighers
 
 
 def all_weighers():
@@ -52,6 +52,21 @@ class _SoftAffinityWeigherBase(weights.BaseHostWeigher):
 
         return len(member_on_host)
 
+    def _count_members_on_hosts(self, weighed_obj_list, request_spec):
+        """Count the group members on each host, looking up the group once."""
+        group = request_spec.instance_group
+        if not group or self.policy_name not in group.policies:
+            return [0] * len(weighed_obj_list)
+
+        members = set(group.members)
+        return [len(members.intersection(obj.obj.instances))
+                for obj in weighed_obj_list]
+
+    def weigh_objects(self, weighed_obj_list, request_spec):
+        weights = self._count_members_on_hosts(weighed_obj_list, request_spec)
+        self._record_bounds(weights)
+        return weights
+
 
 class ServerGroupSoftAffinityWeigher(_SoftAffinityWeigherBase):
     policy_name = 'soft-affinity'
@@ -88,3 +103,9 @@ class ServerGroupSoftAntiAffinityWeigher(_SoftAffinityWeigherBase):
         weight = super(ServerGroupSoftAntiAffinityWeigher, self)._weigh_object(
             host_state, request_spec)
         return -1 * weight
+
+    def weigh_objects(self, weighed_obj_list, request_spec):
+        weights = [-1 * weight for weight in self._count_members_on_hosts(
+            weighed_obj_list, request_spec)]
+        self._record_bounds(weights)
+        return weights
@@ -36,3 +36,8 @@ class DiskWeigher(weights.BaseHostWeigher):
     def _weigh_object(self, host_state, weight_properties):
         """Higher weights win.  We want spreading to be the default."""
         return host_state.free_disk_mb
+
+    def weigh_objects(self, weighed_obj_list, weight_properties):
+        weights = [obj.obj.free_disk_mb for obj in weighed_obj_list]
+        self._record_bounds(weights)
+        return weights
@@ -39,3 +39,8 @@ class IoOpsWeigher(weights.BaseHostWeigher):
         to be the default.
         """
         return host_state.num_io_ops
+
+    def weigh_objects(self, weighed_obj_list, weight_properties):
+        weights = [obj.obj.num_io_ops for obj in weighed_obj_list]
+        self._record_bounds(weights)
+        return weights
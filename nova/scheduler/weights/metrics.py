@@ -50,6 +50,20 @@ class MetricsWeigher(weights.BaseHostWeigher):
         return CONF.metrics.weight_multiplier
 
     def _weigh_object(self, host_state, weight_properties):
+        return self._weigh_metrics(host_state, CONF.metrics.required,
+                                   self.weight_multiplier())
+
+    def weigh_objects(self, weighed_obj_list, weight_properties):
+        # NOTE: Read the options once for all the hosts rather than once per
+        # host.
+        required = CONF.metrics.required
+        weight_multiplier = self.weight_multiplier()
+        weights = [self._weigh_metrics(obj.obj, required, weight_multiplier)
+                   for obj in weighed_obj_list]
+        self._record_bounds(weights)
+        return weights
+
+    def _weigh_metrics(self, host_state, required, weight_multiplier):
         value = 0.0
 
         # NOTE(sbauza): Keying a dict of Metrics per metric name given that we
@@ -59,7 +73,7 @@ class MetricsWeigher(weights.BaseHostWeigher):
             try:
                 value += metrics_dict[name].value * ratio
             except KeyError:
-                if CONF.metrics.required:
+                if required:
                     raise exception.ComputeHostMetricNotFound(
                             host=host_state.host,
                             node=host_state.nodename,
@@ -69,7 +83,7 @@ class MetricsWeigher(weights.BaseHostWeigher):
                     # factor, i.e. set the value to make this obj would be
                     # at the end of the ordered weighed obj list
                     # Do nothing if ratio or weight_multiplier is 0.
-                    if ratio * self.weight_multiplier() != 0:
+                    if ratio * weight_multiplier != 0:
                         return CONF.metrics.weight_of_unavailable
 
         return value
@@ -36,8 +36,20 @@ servicegroup_driver_opt = cfg.StrOpt('servicegroup_driver',
                                      choices=sorted(
                                         _driver_name_class_mapping.keys()))
 
+heartbeat_batch_interval_opt = cfg.IntOpt('heartbeat_batch_interval',
+    default=0,
+    min=0,
+    help='Seconds during which nova-conductor collects the state reports '
+         'of the services using the db servicegroup driver, before writing '
+         'them to the database in a single update. When set on the services '
+         'which report their state through nova-conductor, they send their '
+         'report count instead of saving their service record. 0 writes each '
+         'report as soon as it is received. This should stay well below '
+         'service_down_time.')
+
 CONF = cfg.CONF
 CONF.register_opt(servicegroup_driver_opt)
+CONF.register_opt(heartbeat_batch_interval_opt)
 
 # NOTE(geekinutah): By default drivers wait 5 seconds before reporting
 INITIAL_REPORTING_DELAY = 5
@@ -86,3 +98,13 @@ class API(object):
             return False
 
         return self._driver.is_up(member)
+
+    def get_up_services(self, members):
+        """Return the given members which are up.
+
+        This checks all the members at once, e.g. with a single request to
+        memcached, and should be preferred to calling service_is_up() for each
+        member of a list.
+        """
+        return self._driver.get_up_services(
+            [member for member in members if not member.get('forced_down')])
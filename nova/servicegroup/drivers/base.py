@@ -27,3 +27,7 @@ class Driver(object):
     def is_up(self, member):
         """Check whether the given member is up."""
         raise NotImplementedError()
+
+    def get_up_services(self, members):
+        """Return the given members which are up."""
+        return [member for member in members if self.is_up(member)]
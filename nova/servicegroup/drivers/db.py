@@ -19,9 +19,11 @@ import oslo_messaging as messaging
 from oslo_utils import timeutils
 import six
 
+from nova import context as nova_context
 from nova.i18n import _, _LI, _LW, _LE
 from nova.servicegroup import api
 from nova.servicegroup.drivers import base
+from nova.servicegroup import heartbeats
 
 
 CONF = cfg.CONF
@@ -58,6 +60,15 @@ class DbDriver(base.Driver):
         """Moved from nova.utils
         Check whether a service is up based on last heartbeat.
         """
+        return self._is_up(service_ref, timeutils.utcnow())
+
+    def get_up_services(self, service_refs):
+        """Check the last heartbeat of services against the same time."""
+        now = timeutils.utcnow()
+        return [service_ref for service_ref in service_refs
+                if self._is_up(service_ref, now)]
+
+    def _is_up(self, service_ref, now):
         # Keep checking 'updated_at' if 'last_seen_up' isn't set.
         # Should be able to use only 'last_seen_up' in the M release
         last_heartbeat = (service_ref.get('last_seen_up') or
@@ -71,8 +82,13 @@ class DbDriver(base.Driver):
             # Objects have proper UTC timezones, but the timeutils comparison
             # below does not (and will fail)
             last_heartbeat = last_heartbeat.replace(tzinfo=None)
+        # NOTE: In nova-conductor, the last report of the service may not
+        # have been written to the database yet.
+        last_report = heartbeats.get_last_seen(service_ref.get('id'))
+        if last_report is not None and last_report > last_heartbeat:
+            last_heartbeat = last_report
         # Timestamps in DB are UTC.
-        elapsed = timeutils.delta_seconds(last_heartbeat, timeutils.utcnow())
+        elapsed = timeutils.delta_seconds(last_heartbeat, now)
         is_up = abs(elapsed) <= self.service_down_time
         if not is_up:
             LOG.debug('Seems service %(binary)s on host %(host)s is down. '
@@ -87,7 +103,11 @@ class DbDriver(base.Driver):
 
         try:
             service.service_ref.report_count += 1
-            service.service_ref.save()
+            if CONF.heartbeat_batch_interval:
+                service.conductor_api.service_report_state(
+                    nova_context.get_admin_context(), service.service_ref)
+            else:
+                service.service_ref.save()
 
             # TODO(termie): make this pattern be more elegant.
             if getattr(service, 'model_disconnected', False):
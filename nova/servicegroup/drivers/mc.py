@@ -57,17 +57,35 @@ class MemcachedDriver(base.Driver):
             service.tg.add_timer(report_interval, self._report_state,
                                  api.INITIAL_REPORTING_DELAY, service)
 
+    @staticmethod
+    def _get_key(service_ref):
+        return str("{topic!s}:{host!s}".format(**service_ref))
+
     def is_up(self, service_ref):
         """Moved from nova.utils
         Check whether a service is up based on last heartbeat.
         """
-        key = "{topic!s}:{host!s}".format(**service_ref)
-        is_up = self.mc.get(str(key)) is not None
+        key = self._get_key(service_ref)
+        is_up = self.mc.get(key) is not None
         if not is_up:
             LOG.debug('Seems service {0!s} is down'.format(key))
 
         return is_up
 
+    def get_up_services(self, service_refs):
+        """Check whether services are up with a single memcached request."""
+        if not service_refs:
+            return []
+        keys = [self._get_key(service_ref) for service_ref in service_refs]
+        heartbeats = self.mc.get_multi(keys)
+        down = [key for key, heartbeat in zip(keys, heartbeats)
+                if heartbeat is None]
+        if down:
+            LOG.debug('Seems services %s are down', ', '.join(down))
+        return [service_ref
+                for service_ref, heartbeat in zip(service_refs, heartbeats)
+                if heartbeat is not None]
+
     def _report_state(self, service):
         """Update the state of this service in the datastore."""
         try:
@@ -0,0 +1,84 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Buffering of the state reports of the services using the db driver."""
+
+import collections
+
+from oslo_utils import excutils
+from oslo_utils import timeutils
+
+from nova import db
+
+
+class HeartbeatBuffer(object):
+    """Collects the state reports of services until they are flushed.
+
+    nova-conductor adds the reports it receives from the services and writes
+    them to the database with a single update per flush, each with the time
+    at which it was received. That time is kept after the flush, so that
+    is_up() can take the reports which were not written yet into account.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._last_seen = {}
+        self.stats = collections.Counter()
+
+    def add(self, service_id, report_count):
+        now = timeutils.utcnow()
+        self._pending[service_id] = (report_count, now)
+        self._last_seen[service_id] = now
+        self.stats['reports'] += 1
+
+    def last_seen(self, service_id):
+        return self._last_seen.get(service_id)
+
+    def flush(self, context):
+        """Write the pending reports and return their number."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            db.service_report_states(context, pending)
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                # Keep the reports for the next flush, unless the service
+                # reported again in the meantime.
+                for service_id, report in pending.items():
+                    self._pending.setdefault(service_id, report)
+        self.stats['writes'] += 1
+        self.stats['flushed'] += len(pending)
+        return len(pending)
+
+
+_HEARTBEATS = None
+
+
+def get_heartbeat_buffer():
+    global _HEARTBEATS
+    if _HEARTBEATS is None:
+        _HEARTBEATS = HeartbeatBuffer()
+    return _HEARTBEATS
+
+
+def get_last_seen(service_id):
+    """Return the time of the last report buffered for a service, if any."""
+    if _HEARTBEATS is None:
+        return None
+    return _HEARTBEATS.last_seen(service_id)
+
+
+def reset_state():
+    global _HEARTBEATS
+    _HEARTBEATS = None
@@ -46,6 +46,11 @@ def fake_service_get_by_compute_host(cls, context, host):
             return service
 
 
+@classmethod
+def fake_service_get_all(cls, context, disabled=None, set_zones=False):
+    return objects.ServiceList(objects=test_hypervisors.TEST_SERVICES)
+
+
 class ExtendedHypervisorsTestV21(test.NoDBTestCase):
     DETAIL_HYPERS_DICTS = copy.deepcopy(test_hypervisors.TEST_HYPERS)
     del DETAIL_HYPERS_DICTS[0]['service_id']
@@ -65,6 +70,8 @@ class ExtendedHypervisorsTestV21(test.NoDBTestCase):
         self.controller = hypervisors_v21.HypervisorsController()
         self.controller.servicegroup_api.service_is_up = mock.MagicMock(
             return_value=True)
+        self.controller.servicegroup_api.get_up_services = mock.MagicMock(
+            side_effect=lambda services: services)
 
     def _get_request(self):
         return fakes.HTTPRequest.blank('/v2/fake/os-hypervisors/detail',
@@ -80,6 +87,8 @@ class ExtendedHypervisorsTestV21(test.NoDBTestCase):
                        fake_compute_node_get)
         self.stubs.Set(objects.Service, 'get_by_compute_host',
                        fake_service_get_by_compute_host)
+        self.stubs.Set(objects.ServiceList, 'get_all',
+                       fake_service_get_all)
 
     def test_view_hypervisor_detail_noservers(self):
         result = self.controller._view_hypervisor(
@@ -125,6 +125,11 @@ def fake_service_get_by_compute_host(context, host):
             return service
 
 
+def fake_service_get_all(context, filters=None, set_zones=False):
+    return [service for service in TEST_SERVICES
+            if service.binary == filters['binary']]
+
+
 def fake_compute_node_statistics(context):
     result = dict(
         count=0,
@@ -193,6 +198,8 @@ class HypervisorsTestV21(test.NoDBTestCase):
         self.controller = hypervisors_v21.HypervisorsController()
         self.controller.servicegroup_api.service_is_up = mock.MagicMock(
             return_value=True)
+        self.controller.servicegroup_api.get_up_services = mock.MagicMock(
+            side_effect=lambda services: services)
 
     def setUp(self):
         super(HypervisorsTestV21, self).setUp()
@@ -202,6 +209,8 @@ class HypervisorsTestV21(test.NoDBTestCase):
                        fake_compute_node_get_all)
         self.stubs.Set(self.controller.host_api, 'service_get_by_compute_host',
                        fake_service_get_by_compute_host)
+        self.stubs.Set(self.controller.host_api, 'service_get_all',
+                       fake_service_get_all)
         self.stubs.Set(self.controller.host_api,
                        'compute_node_search_by_hypervisor',
                        fake_compute_node_search_by_hypervisor)
@@ -241,6 +250,33 @@ class HypervisorsTestV21(test.NoDBTestCase):
 
         self.assertEqual(result, dict(hypervisors=self.INDEX_HYPER_DICTS))
 
+    def test_index_services_listed_once(self):
+        req = self._get_request(True)
+        service_get_all = self.controller.host_api.service_get_all
+        with test.nested(
+            mock.patch.object(self.controller.host_api, 'service_get_all',
+                              side_effect=service_get_all),
+            mock.patch.object(self.controller.host_api,
+                              'service_get_by_compute_host')
+        ) as (mock_get_all, mock_get_by_host):
+            result = self.controller.index(req)
+
+        self.assertEqual(self.INDEX_HYPER_DICTS, result['hypervisors'])
+        mock_get_all.assert_called_once_with(
+            req.environ['nova.context'], filters={'binary': 'nova-compute'})
+        self.assertFalse(mock_get_by_host.called)
+
+    def test_index_service_down(self):
+        get_up_services = self.controller.servicegroup_api.get_up_services
+        get_up_services.side_effect = lambda services: services[1:]
+        req = self._get_request(True)
+        result = self.controller.index(req)
+
+        self.assertEqual(['down', 'up'],
+                         [hyp['state'] for hyp in result['hypervisors']])
+        self.assertEqual(1, get_up_services.call_count)
+        self.assertFalse(self.controller.servicegroup_api.service_is_up.called)
+
     def test_index_non_admin(self):
         req = self._get_request(False)
         self.assertRaises(exception.PolicyNotAuthorized,
@@ -464,6 +500,14 @@ class HypervisorsTestV2(HypervisorsTestV21):
         self.ext_mgr.extensions = {}
         self.controller = hypervisors_v2.HypervisorsController(self.ext_mgr)
 
+    def test_index_service_down(self):
+        # Override test in HypervisorsTestV21
+        pass
+
+    def test_index_services_listed_once(self):
+        # Override test in HypervisorsTestV21
+        pass
+
     def test_index_non_admin_back_compatible_db(self):
         self.policy.set_rules(self.rule)
         req = self._get_request(False)
@@ -543,6 +587,11 @@ class CellHypervisorsTestV21(HypervisorsTestV21):
             if service.host == host:
                 return service
 
+    @classmethod
+    def fake_service_get_all(cls, context, filters=None, set_zones=False):
+        return [service for service in cls.TEST_SERVICES
+                if service.binary == filters['binary']]
+
     @classmethod
     def fake_instance_get_all_by_host(cls, context, host):
         results = []
@@ -561,6 +610,8 @@ class CellHypervisorsTestV21(HypervisorsTestV21):
                        self.fake_compute_node_get_all)
         self.stubs.Set(self.controller.host_api, 'service_get_by_compute_host',
                        self.fake_service_get_by_compute_host)
+        self.stubs.Set(self.controller.host_api, 'service_get_all',
+                       self.fake_service_get_all)
         self.stubs.Set(self.controller.host_api,
                        'compute_node_search_by_hypervisor',
                        self.fake_compute_node_search_by_hypervisor)
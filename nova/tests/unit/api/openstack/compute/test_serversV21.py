@@ -1042,6 +1042,38 @@ class ServersControllerTest(ControllerTest):
             marker=mock.ANY, want_objects=mock.ANY,
             sort_keys=mock.ANY, sort_dirs=mock.ANY)
 
+    def _test_get_servers_detail_extensions_expected_attrs(self, version,
+                                                           expected_attrs):
+        loaded_extensions = {'os-extended-server-attributes': None,
+                             'os-security-groups': None}
+        req = fakes.HTTPRequest.blank('/fake/servers/detail',
+                                      use_admin_context=True,
+                                      version=version)
+        with test.nested(
+            mock.patch.object(self.controller.extension_info,
+                              'get_extensions',
+                              return_value=loaded_extensions),
+            mock.patch.object(servers.openstack_driver,
+                              'is_neutron_security_groups',
+                              return_value=False),
+            mock.patch.object(compute_api.API, 'get_all',
+                              return_value=objects.InstanceList(objects=[]))
+        ) as (mock_get_extensions, mock_is_neutron, mock_get_all):
+            self.controller.detail(req)
+        self.assertEqual(expected_attrs,
+                         mock_get_all.call_args[1]['expected_attrs'])
+
+    def test_get_servers_detail_extensions_expected_attrs(self):
+        self._test_get_servers_detail_extensions_expected_attrs(
+            '2.16', ['flavor', 'info_cache', 'metadata', 'pci_devices',
+                     'security_groups', 'services'])
+
+    def test_get_servers_detail_extensions_expected_attrs_no_host_status(
+            self):
+        self._test_get_servers_detail_extensions_expected_attrs(
+            '2.15', ['flavor', 'info_cache', 'metadata', 'pci_devices',
+                     'security_groups'])
+
     def test_get_servers_allows_name(self):
         server_uuid = str(uuid.uuid4())
 
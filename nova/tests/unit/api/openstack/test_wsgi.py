@@ -215,6 +215,13 @@ class JSONDictSerializerTest(test.NoDBTestCase):
         result = result.replace('\n', '').replace(' ', '')
         self.assertEqual(result, expected_json)
 
+    def test_json_serialize_iter(self):
+        input_dict = dict(servers=[dict(a=1), dict(b=[2, 3])],
+                          servers_links=[], count=2)
+        serializer = wsgi.JSONDictSerializer()
+        result = b''.join(serializer.serialize_iter(input_dict))
+        self.assertEqual(input_dict, jsonutils.loads(result))
+
 
 class JSONDeserializerTest(test.NoDBTestCase):
     def test_json(self):
@@ -1058,6 +1065,21 @@ class ResponseObjectTest(test.NoDBTestCase):
         hdrs['hEADER'] = 'bar'
         self.assertEqual(robj['hEADER'], 'foo')
 
+    def test_serialize_not_streamed(self):
+        self.flags(streaming_response_threshold=2, group='wsgi')
+        robj = wsgi.ResponseObject({'servers': [{'id': 1}]})
+        response = robj.serialize(None, 'application/json')
+        self.assertEqual(b'{"servers": [{"id": 1}]}', response.body)
+        self.assertEqual(b'24', response.headers['Content-Length'])
+
+    def test_serialize_streamed(self):
+        self.flags(streaming_response_threshold=2, group='wsgi')
+        body = {'servers': [{'id': 1}, {'id': 2}]}
+        robj = wsgi.ResponseObject(body)
+        response = robj.serialize(None, 'application/json')
+        self.assertNotIn('Content-Length', response.headers)
+        self.assertEqual(body, jsonutils.loads(b''.join(response.app_iter)))
+
 
 class ValidBodyTest(test.NoDBTestCase):
 
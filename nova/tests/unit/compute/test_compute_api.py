@@ -46,6 +46,7 @@ from nova.objects import fields as fields_obj
 from nova.objects import quotas as quotas_obj
 from nova import policy
 from nova import quota
+from nova import servicegroup
 from nova import test
 from nova.tests.unit import fake_block_device
 from nova.tests.unit import fake_instance
@@ -3533,6 +3534,33 @@ class _ComputeAPIUnitTestMixIn(object):
             self.assertEqual(expect_statuses[instance.uuid],
                              host_statuses[instance.uuid])
 
+    @mock.patch.object(servicegroup.API, 'service_is_up')
+    @mock.patch.object(servicegroup.API, 'get_up_services')
+    def test_host_statuses_bulk(self, mock_get_up, mock_is_up):
+        services = [objects.Service(id=i, host='host%d' % i, disabled=False,
+                                    forced_down=False, binary='nova-compute')
+                    for i in range(3)]
+        instances = [
+            objects.Instance(uuid=getattr(uuids, 'instance_%d' % i),
+                             host=service.host,
+                             services=self._obj_to_list_obj(
+                                 objects.ServiceList(self.context), service))
+            for i, service in enumerate(services)]
+        mock_get_up.return_value = services[1:]
+
+        host_statuses = self.compute_api.get_instances_host_statuses(
+                        instances)
+
+        self.assertEqual({uuids.instance_0: fields_obj.HostStatus.UNKNOWN,
+                          uuids.instance_1: fields_obj.HostStatus.UP,
+                          uuids.instance_2: fields_obj.HostStatus.UP},
+                         host_statuses)
+        self.assertEqual(1, mock_get_up.call_count)
+        self.assertEqual(['host0', 'host1', 'host2'],
+                         sorted(service.host for service in
+                                mock_get_up.call_args[0][0]))
+        self.assertFalse(mock_is_up.called)
+
     @mock.patch.object(objects.Migration, 'get_by_id_and_instance')
     @mock.patch.object(objects.InstanceAction, 'action_start')
     def test_live_migrate_force_complete_succeeded(
@@ -37,6 +37,7 @@ from nova.compute import task_states
 from nova.compute import utils as compute_utils
 from nova.compute import vm_states
 from nova.conductor import api as conductor_api
+from nova.conductor import batch as conductor_batch
 from nova import context
 from nova import db
 from nova import exception
@@ -409,6 +410,22 @@ class ComputeManagerUnitTestCase(test.NoDBTestCase):
         self.flags(max_concurrent_builds=0)
         self._test_max_concurrent_builds()
 
+    @mock.patch.object(manager.LOG, 'exception')
+    @mock.patch.object(conductor_batch.ObjectActionBatch, 'flush')
+    @mock.patch('nova.compute.manager.ComputeManager.'
+                '_do_build_and_run_instance')
+    def test_build_and_run_instance_flush_error(self, mock_dbari, mock_flush,
+                                                mock_log):
+        mock_flush.side_effect = [test.TestingException, None]
+        instance = objects.Instance(uuid=str(uuid.uuid4()))
+        self.compute.build_and_run_instance(self.context, instance,
+                                            mock.sentinel.image,
+                                            mock.sentinel.request_spec, {})
+        self.assertTrue(mock_dbari.called)
+        self.assertTrue(mock_log.called)
+        self.assertEqual(2, mock_flush.call_count)
+        self.assertIsNone(self.context.object_action_batch)
+
     def test_max_concurrent_builds_semaphore_limited(self):
         self.flags(max_concurrent_builds=123)
         self.assertEqual(123,
@@ -1397,6 +1414,96 @@ class ComputeManagerUnitTestCase(test.NoDBTestCase):
         self.mox.ReplayAll()
         self.compute._instance_usage_audit(self.context)
 
+    @mock.patch.object(objects.Instance, 'get_by_uuid')
+    def test_heal_instance_info_cache_batch(self, mock_get_by_uuid):
+        self.flags(heal_instance_info_cache_batch_size=2,
+                   heal_instance_info_cache_min_age=60)
+        now = timeutils.utcnow()
+        instances = []
+        for instance_uuid, age in ((uuids.fresh, 0), (uuids.stale, 5),
+                                   (uuids.other, 10)):
+            updated_at = now - datetime.timedelta(minutes=age)
+            instances.append(objects.Instance(
+                uuid=instance_uuid, host=self.compute.host, task_state=None,
+                info_cache=objects.InstanceInfoCache(
+                    updated_at=updated_at, created_at=updated_at)))
+        mock_get_by_uuid.side_effect = instances
+        self.compute._instance_uuids_to_heal = [uuids.fresh, uuids.stale,
+                                                uuids.other, uuids.last]
+        with test.nested(
+            mock.patch.object(self.compute.network_api,
+                              'prefetch_instances_nw_info',
+                              return_value=None),
+            mock.patch.object(self.compute.network_api,
+                              'get_instance_nw_info')
+        ) as (mock_prefetch, mock_get_nw_info):
+            self.compute._heal_instance_info_cache(self.context)
+        # The fresh instance is skipped
+        mock_prefetch.assert_called_once_with(self.context, instances[1:])
+        self.assertEqual([mock.call(self.context, instances[1]),
+                          mock.call(self.context, instances[2])],
+                         mock_get_nw_info.call_args_list)
+        self.assertEqual([uuids.last], self.compute._instance_uuids_to_heal)
+
+    @mock.patch.object(objects.InstanceList, 'get_by_host')
+    def test_heal_instance_info_cache_rebuild_skips_fresh(self,
+                                                          mock_get_by_host):
+        self.flags(heal_instance_info_cache_batch_size=2,
+                   heal_instance_info_cache_min_age=60)
+        now = timeutils.utcnow()
+        instances = []
+        for instance_uuid, age in ((uuids.fresh, 0), (uuids.stale, 5),
+                                   (uuids.other, 10), (uuids.last, 0)):
+            updated_at = now - datetime.timedelta(minutes=age)
+            instances.append(objects.Instance(
+                uuid=instance_uuid, host=self.compute.host,
+                vm_state=vm_states.ACTIVE, task_state=None,
+                info_cache=objects.InstanceInfoCache(
+                    updated_at=updated_at, created_at=updated_at)))
+        mock_get_by_host.return_value = instances
+        with test.nested(
+            mock.patch.object(self.compute.network_api,
+                              'prefetch_instances_nw_info',
+                              return_value=None),
+            mock.patch.object(self.compute.network_api,
+                              'get_instance_nw_info')
+        ) as (mock_prefetch, mock_get_nw_info):
+            self.compute._heal_instance_info_cache(self.context)
+        mock_get_by_host.assert_called_once_with(
+            self.context, self.compute.host, expected_attrs=['info_cache'],
+            use_slave=True)
+        # The fresh instance is skipped, the last one is checked once it is
+        # taken from the list.
+        mock_prefetch.assert_called_once_with(self.context, instances[1:3])
+        self.assertEqual([uuids.last], self.compute._instance_uuids_to_heal)
+
+    @mock.patch.object(objects.InstanceList, 'get_by_host')
+    def test_heal_instance_info_cache_batch_prefetch(self, mock_get_by_host):
+        self.flags(heal_instance_info_cache_batch_size=2)
+        instances = [objects.Instance(uuid=uuids.first,
+                                      vm_state=vm_states.ACTIVE,
+                                      task_state=None),
+                     objects.Instance(uuid=uuids.second,
+                                      vm_state=vm_states.ACTIVE,
+                                      task_state=None)]
+        mock_get_by_host.return_value = instances
+        with test.nested(
+            mock.patch.object(self.compute.network_api,
+                              'prefetch_instances_nw_info',
+                              return_value=mock.sentinel.prefetched),
+            mock.patch.object(self.compute.network_api,
+                              'get_instance_nw_info',
+                              side_effect=[exception.InstanceNotFound(
+                                  instance_id=uuids.first), None])
+        ) as (mock_prefetch, mock_get_nw_info):
+            self.compute._heal_instance_info_cache(self.context)
+        mock_prefetch.assert_called_once_with(self.context, instances)
+        mock_get_nw_info.assert_has_calls([
+            mock.call(self.context, instances[0],
+                      prefetched=mock.sentinel.prefetched),
+            mock.call(self.context, instances[1],
+                      prefetched=mock.sentinel.prefetched)])
+
     @mock.patch.object(objects.InstanceList, 'get_by_host')
     def test_sync_power_states(self, mock_get):
         instance = mock.Mock()
@@ -1409,6 +1516,70 @@ class ComputeManagerUnitTestCase(test.NoDBTestCase):
                                         use_slave=True)
             mock_spawn.assert_called_once_with(mock.ANY, instance)
 
+    @mock.patch.object(objects.InstanceList, 'get_by_host')
+    def test_sync_power_states_bulk(self, mock_get):
+        running = objects.Instance(uuid=uuids.running,
+                                   vm_state=vm_states.ACTIVE,
+                                   power_state=power_state.RUNNING,
+                                   task_state=None)
+        shutdown = objects.Instance(uuid=uuids.shutdown,
+                                    vm_state=vm_states.ACTIVE,
+                                    power_state=power_state.RUNNING,
+                                    task_state=None)
+        stopped = objects.Instance(uuid=uuids.stopped,
+                                   vm_state=vm_states.STOPPED,
+                                   power_state=power_state.SHUTDOWN,
+                                   task_state=None)
+        unknown = objects.Instance(uuid=uuids.unknown,
+                                   vm_state=vm_states.ACTIVE,
+                                   power_state=power_state.RUNNING,
+                                   task_state=None)
+        mock_get.return_value = [running, shutdown, stopped, unknown]
+        vm_power_states = {uuids.running: power_state.RUNNING,
+                           uuids.shutdown: power_state.SHUTDOWN,
+                           uuids.stopped: power_state.SHUTDOWN}
+        with test.nested(
+            mock.patch.object(self.compute.driver, 'get_power_states',
+                              return_value=vm_power_states),
+            mock.patch.object(self.compute.driver, 'get_num_instances'),
+            mock.patch.object(self.compute._sync_power_pool, 'spawn_n')
+        ) as (mock_get_power_states, mock_get_num_instances, mock_spawn):
+            self.compute._sync_power_states(mock.sentinel.context)
+        mock_get_power_states.assert_called_once_with()
+        # The number of instances is taken from the bulk power states
+        self.assertFalse(mock_get_num_instances.called)
+        self.assertEqual(
+            [mock.call(mock.ANY, shutdown), mock.call(mock.ANY, unknown)],
+            mock_spawn.call_args_list)
+
+    def test_power_state_in_sync(self):
+        def _in_sync(vm_state, db_power_state, vm_power_state,
+                     task_state=None):
+            instance = objects.Instance(vm_state=vm_state,
+                                        power_state=db_power_state,
+                                        task_state=task_state)
+            return self.compute._power_state_in_sync(instance, vm_power_state)
+
+        self.assertTrue(_in_sync(vm_states.ACTIVE, power_state.RUNNING,
+                                 power_state.RUNNING))
+        self.assertFalse(_in_sync(vm_states.ACTIVE, power_state.RUNNING,
+                                  power_state.RUNNING,
+                                  task_state=task_states.POWERING_OFF))
+        self.assertFalse(_in_sync(vm_states.ACTIVE, power_state.RUNNING,
+                                  power_state.PAUSED))
+        self.assertFalse(_in_sync(vm_states.ACTIVE, power_state.SHUTDOWN,
+                                  power_state.SHUTDOWN))
+        self.assertTrue(_in_sync(vm_states.STOPPED, power_state.SHUTDOWN,
+                                 power_state.SHUTDOWN))
+        self.assertFalse(_in_sync(vm_states.STOPPED, power_state.RUNNING,
+                                  power_state.RUNNING))
+        self.assertFalse(_in_sync(vm_states.PAUSED, power_state.CRASHED,
+                                  power_state.CRASHED))
+        self.assertFalse(_in_sync(vm_states.SOFT_DELETED, power_state.RUNNING,
+                                  power_state.RUNNING))
+        self.assertTrue(_in_sync(vm_states.ERROR, power_state.RUNNING,
+                                 power_state.RUNNING))
+
     def _get_sync_instance(self, power_state, vm_state, task_state=None,
                            shutdown_terminate=False):
         instance = objects.Instance()
@@ -1518,6 +1689,35 @@ class ComputeManagerUnitTestCase(test.NoDBTestCase):
                                                           power_state.NOSTATE,
                                                           use_slave=True)
 
+    @mock.patch('nova.compute.manager.ComputeManager.'
+                '_sync_instance_power_state')
+    @mock.patch.object(objects.InstanceList, 'get_by_host')
+    def test_sync_power_states_bulk_rechecks_under_lock(
+            self, mock_get, mock_sync_power_state):
+        # The instance was started after the bulk query, the sync must use
+        # the power state read under the instance lock.
+        instance = objects.Instance(uuid=uuids.instance,
+                                    vm_state=vm_states.ACTIVE,
+                                    power_state=power_state.RUNNING,
+                                    task_state=None)
+        mock_get.return_value = [instance]
+        with test.nested(
+            mock.patch.object(self.compute.driver, 'get_power_states',
+                              return_value={
+                                  uuids.instance: power_state.SHUTDOWN}),
+            mock.patch.object(self.compute.driver, 'get_info',
+                              return_value=hardware.InstanceInfo(
+                                  state=power_state.RUNNING)),
+            mock.patch.object(self.compute._sync_power_pool, 'spawn_n',
+                              side_effect=lambda f, *args: f(*args))
+        ) as (mock_get_power_states, mock_get_info, mock_spawn):
+            self.compute._sync_power_states(mock.sentinel.context)
+        mock_get_info.assert_called_once_with(instance)
+        mock_sync_power_state.assert_called_once_with(mock.sentinel.context,
+                                                      instance,
+                                                      power_state.RUNNING,
+                                                      use_slave=True)
+
     def test_run_pending_deletes(self):
         self.flags(instance_delete_interval=10)
 
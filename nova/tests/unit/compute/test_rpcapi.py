@@ -69,6 +69,17 @@ class ComputeRpcAPITestCase(test.NoDBTestCase):
         self.assertRaises(exception.ServiceTooOld,
                           compute_rpcapi.ComputeAPI)
 
+    @mock.patch('nova.objects.base.NovaObjectSerializer')
+    def test_compact_object_primitives(self, mock_serializer):
+        self.flags(compact_object_primitives=True)
+        self.flags(compute='mitaka', group='upgrade_levels')
+        compute_rpcapi.ComputeAPI()
+        self.assertFalse(mock_serializer.return_value.compact)
+
+        self.flags(compute=None, group='upgrade_levels')
+        compute_rpcapi.ComputeAPI()
+        self.assertTrue(mock_serializer.return_value.compact)
+
     @mock.patch('nova.objects.Service.get_minimum_version')
     def test_auto_pin_kilo(self, mock_get_min):
         mock_get_min.return_value = 0
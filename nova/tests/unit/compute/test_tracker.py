@@ -1105,7 +1105,7 @@ class TestUpdateComputeNode(BaseTestCase):
         self.assertFalse(service_mock.called)
 
         # The above call to _update() will populate the
-        # RT.old_resources collection with the resources. Here, we check that
+        # RT.saved_fields collection with the resources. Here, we check that
         # if we call _update() again with the same resources, that
         # the scheduler client won't be called again to update those
         # (unchanged) resources for the compute node
@@ -1154,6 +1154,46 @@ class TestUpdateComputeNode(BaseTestCase):
         urs_mock = self.sched_client_mock.update_resource_stats
         urs_mock.assert_called_once_with(self.rt.compute_node)
 
+    def test_update_changed_fields_only(self):
+        self._setup_rt()
+        compute = copy.deepcopy(_COMPUTE_NODE_FIXTURES[0])
+        compute.pci_device_pools = objects.PciDevicePoolList()
+        self.rt.compute_node = compute
+        self.rt._update(mock.sentinel.ctx)
+        fields_written = self.rt.save_stats['fields_written']
+        self.assertIn('pci_device_pools', self.rt.saved_fields)
+
+        def fake_update_resource_stats(compute_node):
+            self.assertEqual(set(['memory_mb_used', 'free_ram_mb']),
+                             compute_node.obj_what_changed())
+
+        urs_mock = self.sched_client_mock.update_resource_stats
+        urs_mock.reset_mock()
+        urs_mock.side_effect = fake_update_resource_stats
+        compute.obj_reset_changes(recursive=True)
+        compute.memory_mb_used += 128
+        compute.free_ram_mb -= 128
+        # Fields set again to the same value or content are not saved
+        compute.vcpus = compute.vcpus
+        compute.stats = {}
+        compute.pci_device_pools = objects.PciDevicePoolList()
+        self.rt._update(mock.sentinel.ctx)
+
+        urs_mock.assert_called_once_with(compute)
+        self.assertEqual(2, self.rt.save_stats['saves'])
+        self.assertEqual(fields_written + 2,
+                         self.rt.save_stats['fields_written'])
+        self.assertEqual(compute.memory_mb_used,
+                         self.rt.saved_fields['memory_mb_used'])
+
+        urs_mock.reset_mock()
+        compute.obj_reset_changes(recursive=True)
+        compute.pci_device_pools = objects.PciDevicePoolList()
+        self.rt._update(mock.sentinel.ctx)
+        self.assertFalse(urs_mock.called)
+        self.assertEqual(1, self.rt.save_stats['saves_skipped'])
+        self.assertFalse(compute.obj_what_changed())
+
 
 class TestInstanceClaim(BaseTestCase):
 
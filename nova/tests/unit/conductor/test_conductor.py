@@ -16,11 +16,13 @@
 """Tests for the conductor service."""
 
 import copy
+import datetime
 import uuid
 
 import mock
 from mox3 import mox
 import oslo_messaging as messaging
+from oslo_utils import fixture as utils_fixture
 from oslo_utils import timeutils
 import six
 
@@ -30,6 +32,7 @@ from nova.compute import task_states
 from nova.compute import vm_states
 from nova import conductor
 from nova.conductor import api as conductor_api
+from nova.conductor import batch as conductor_batch
 from nova.conductor import manager as conductor_manager
 from nova.conductor import rpcapi as conductor_rpcapi
 from nova.conductor.tasks import live_migrate
@@ -44,6 +47,7 @@ from nova.objects import fields
 from nova import rpc
 from nova.scheduler import client as scheduler_client
 from nova.scheduler import utils as scheduler_utils
+from nova.servicegroup import heartbeats as servicegroup_heartbeats
 from nova import test
 from nova.tests import fixtures
 from nova.tests.unit import cast_as_call
@@ -192,6 +196,95 @@ class ConductorTestCase(_BaseTestCase, test.TestCase):
         result = self.conductor.provider_fw_rule_get_all(self.context)
         self.assertEqual([], result)
 
+    def test_object_action_batch(self):
+        @obj_base.NovaObjectRegistry.register
+        class TestObject(obj_base.NovaObject):
+            fields = {'count': fields.IntegerField()}
+
+            def incr(self):
+                self.count += 1
+                self.obj_reset_changes()
+                return self.count
+
+        obj1 = TestObject(count=1)
+        obj2 = TestObject(count=5)
+        results = self.conductor.object_action_batch(
+            self.context, [(obj1, 'incr', [], {}), (obj2, 'incr', [], {})])
+        self.assertEqual([2, 6], [result for updates, result in results])
+        self.assertEqual([2, 6],
+                         [updates['count'] for updates, result in results])
+
+    def test_object_action_batch_on_raise(self):
+        @obj_base.NovaObjectRegistry.register
+        class TestObject(obj_base.NovaObject):
+            def foo(self):
+                raise Exception('test')
+
+        self.assertRaises(messaging.ExpectedException,
+                          self.conductor.object_action_batch, self.context,
+                          [(TestObject(), 'foo', [], {})])
+
+    @mock.patch.object(db, 'service_report_states')
+    def test_service_report_state(self, mock_report):
+        now = timeutils.utcnow()
+        self.useFixture(utils_fixture.TimeFixture(now))
+        self.conductor.service_report_state(self.context, 1, 10)
+        mock_report.assert_called_once_with(self.context, {1: (10, now)})
+
+    @mock.patch.object(db, 'service_report_states')
+    def test_service_report_state_batched(self, mock_report):
+        self.flags(heartbeat_batch_interval=2)
+        self.addCleanup(servicegroup_heartbeats.reset_state)
+        now = timeutils.utcnow()
+        time_fixture = self.useFixture(utils_fixture.TimeFixture(now))
+        self.conductor.service_report_state(self.context, 1, 10)
+        time_fixture.advance_time_seconds(1)
+        self.conductor.service_report_state(self.context, 2, 20)
+        self.assertFalse(mock_report.called)
+        self.conductor._flush_service_heartbeats(self.context)
+        # Each report is written with the time it was received at.
+        mock_report.assert_called_once_with(
+            self.context,
+            {1: (10, now), 2: (20, now + datetime.timedelta(seconds=1))})
+
+    def test_flush_service_heartbeats_task(self):
+        manager_cls = conductor_manager.ConductorManager
+        # The periodic tasks are added to the class
+        self.stub_out('nova.conductor.manager.ConductorManager.'
+                      '_periodic_tasks', list(manager_cls._periodic_tasks))
+        self.stub_out('nova.conductor.manager.ConductorManager.'
+                      '_periodic_spacing',
+                      dict(manager_cls._periodic_spacing))
+        self.assertNotIn('_flush_service_heartbeats',
+                         self.conductor._periodic_spacing)
+
+        self.flags(heartbeat_batch_interval=2)
+        conductor = manager_cls()
+        manager_cls()
+        self.assertEqual(
+            2, conductor._periodic_spacing['_flush_service_heartbeats'])
+        tasks = [task for name, task in conductor._periodic_tasks
+                 if name == '_flush_service_heartbeats']
+        self.assertEqual(1, len(tasks))
+        with mock.patch.object(conductor,
+                               '_flush_service_heartbeats') as mock_flush:
+            tasks[0](conductor, self.context)
+        mock_flush.assert_called_once_with(self.context)
+
+    @mock.patch.object(db, 'service_report_states')
+    def test_flush_service_heartbeats_error(self, mock_report):
+        self.flags(heartbeat_batch_interval=2)
+        self.addCleanup(servicegroup_heartbeats.reset_state)
+        now = timeutils.utcnow()
+        self.useFixture(utils_fixture.TimeFixture(now))
+        mock_report.side_effect = test.TestingException
+        self.conductor.service_report_state(self.context, 1, 10)
+        # Fails without stopping the periodic task
+        self.conductor._flush_service_heartbeats(self.context)
+        mock_report.side_effect = None
+        self.conductor._flush_service_heartbeats(self.context)
+        mock_report.assert_called_with(self.context, {1: (10, now)})
+
 
 class ConductorRPCAPITestCase(_BaseTestCase, test.TestCase):
     """Conductor RPC API Tests."""
@@ -203,6 +296,152 @@ class ConductorRPCAPITestCase(_BaseTestCase, test.TestCase):
         self.conductor = conductor_rpcapi.ConductorAPI()
 
 
+class ObjectActionBatchTestCase(test.NoDBTestCase):
+    def setUp(self):
+        super(ObjectActionBatchTestCase, self).setUp()
+        self.flags(batch_object_saves=True, group='conductor')
+        self.context = context.RequestContext('fake', 'fake')
+        self.conductor = conductor_rpcapi.ConductorAPI()
+        self.useFixture(fixtures.IndirectionAPIFixture(self.conductor))
+        client = mock.patch.object(self.conductor, 'client').start()
+        self.addCleanup(mock.patch.stopall)
+        client.can_send_version.return_value = True
+        self.call = client.prepare.return_value.call
+
+    def _migration(self):
+        migration = objects.Migration(context=self.context, id=1,
+                                      status='migrating',
+                                      source_compute=None)
+        migration.obj_reset_changes()
+        return migration
+
+    def test_save_queued(self):
+        migration = self._migration()
+        self.call.return_value = [({'source_compute': 'host1'}, None)]
+
+        with conductor_batch.object_action_batch(self.context) as batch:
+            migration.status = 'finished'
+            migration.save()
+            self.assertFalse(self.call.called)
+            self.assertEqual(set(), migration.obj_what_changed())
+            migration.status = 'confirmed'
+
+        self.assertIsNone(self.context.object_action_batch)
+        self.call.assert_called_once_with(self.context, 'object_action_batch',
+                                          actions=mock.ANY)
+        actions = self.call.call_args[1]['actions']
+        self.assertEqual(1, len(actions))
+        clone, objmethod, args, kwargs = actions[0]
+        self.assertEqual(('save', (), {}), (objmethod, args, kwargs))
+        self.assertEqual('finished', clone.status)
+        self.assertEqual(set(['status']), clone.obj_what_changed())
+        # The updates are applied, but not over the later changes
+        self.assertEqual('host1', migration.source_compute)
+        self.assertEqual('confirmed', migration.status)
+        self.assertEqual(set(['status']), migration.obj_what_changed())
+        self.assertEqual((1, 1), (batch.calls, batch.actions))
+
+    def test_flushed_before_call(self):
+        migration = self._migration()
+        self.call.side_effect = [[({}, None)], self._migration()]
+
+        with conductor_batch.object_action_batch(self.context) as batch:
+            migration.status = 'finished'
+            migration.save()
+            objects.Migration.get_by_id(self.context, 1)
+            self.assertEqual(['object_action_batch',
+                              'object_class_action_versions'],
+                             [call[0][1] for call in
+                              self.call.call_args_list])
+
+        self.assertEqual(2, self.call.call_count)
+        self.assertEqual((2, 2), (batch.calls, batch.actions))
+
+    def test_flushed_before_compute_task(self):
+        migration = self._migration()
+        self.call.return_value = [({}, None)]
+        compute_task_api = conductor_rpcapi.ComputeTaskAPI()
+        client = mock.patch.object(compute_task_api, 'client').start()
+        client.can_send_version.return_value = True
+        cast = client.prepare.return_value.cast
+
+        def _cast(context, method, **kwargs):
+            self.call.assert_called_once_with(
+                self.context, 'object_action_batch', actions=mock.ANY)
+
+        cast.side_effect = _cast
+
+        with conductor_batch.object_action_batch(self.context) as batch:
+            migration.status = 'finished'
+            migration.save()
+            compute_task_api.unshelve_instance(self.context,
+                                               mock.sentinel.instance)
+            cast.assert_called_once_with(
+                self.context, 'unshelve_instance',
+                instance=mock.sentinel.instance, request_spec=None)
+
+        self.assertEqual(1, self.call.call_count)
+        self.assertEqual((2, 1), (batch.calls, batch.actions))
+
+    def test_flush_error(self):
+        migration = self._migration()
+        self.call.side_effect = test.TestingException
+
+        def _save():
+            with conductor_batch.object_action_batch(self.context):
+                migration.status = 'finished'
+                migration.save()
+
+        self.assertRaises(test.TestingException, _save)
+        self.assertIsNone(self.context.object_action_batch)
+        self.assertEqual(set(['status']), migration.obj_what_changed())
+
+    def test_flushed_on_error(self):
+        migration = self._migration()
+        self.call.return_value = [({}, None)]
+
+        def _save():
+            with conductor_batch.object_action_batch(self.context):
+                migration.status = 'finished'
+                migration.save()
+                raise test.TestingException()
+
+        self.assertRaises(test.TestingException, _save)
+        self.assertEqual(1, self.call.call_count)
+
+    def test_not_deferrable(self):
+        service = objects.Service(context=self.context, id=1)
+        service.obj_reset_changes()
+        self.call.return_value = ({}, None)
+
+        with conductor_batch.object_action_batch(self.context) as batch:
+            service.disabled = True
+            service.save()
+            self.call.assert_called_once_with(
+                self.context, 'object_action', objinst=service,
+                objmethod='save', args=(), kwargs={})
+
+        self.assertEqual((1, 1), (batch.calls, batch.actions))
+
+    def test_disabled(self):
+        self.flags(batch_object_saves=False, group='conductor')
+        migration = self._migration()
+        self.call.return_value = ({}, None)
+
+        with conductor_batch.object_action_batch(self.context) as batch:
+            migration.status = 'finished'
+            migration.save()
+            self.assertEqual(1, self.call.call_count)
+
+        self.assertEqual((1, 1), (batch.calls, batch.actions))
+
+    def test_nested(self):
+        with conductor_batch.object_action_batch(self.context) as batch:
+            with conductor_batch.object_action_batch(self.context) as inner:
+                self.assertIs(batch, inner)
+            self.assertIs(batch, self.context.object_action_batch)
+
+
 class ConductorAPITestCase(_BaseTestCase, test.TestCase):
     """Conductor API Tests."""
     def setUp(self):
@@ -243,6 +482,26 @@ class ConductorAPITestCase(_BaseTestCase, test.TestCase):
                                               mock_objinst,
                                               mock.sentinel.obj_versions)
 
+    @mock.patch.object(objects.Service, 'save')
+    @mock.patch.object(db, 'service_report_states')
+    def test_service_report_state(self, mock_report, mock_save):
+        service_ref = objects.Service(id=1, report_count=10)
+        self.conductor.service_report_state(self.context, service_ref)
+        mock_report.assert_called_once_with(self.context, {1: 10})
+        self.assertFalse(mock_save.called)
+        self.assertNotIn('report_count', service_ref.obj_what_changed())
+
+    @mock.patch.object(objects.Service, 'save')
+    @mock.patch.object(db, 'service_report_states')
+    def test_service_report_state_old_conductor(self, mock_report,
+                                                mock_save):
+        self.flags(conductor='liberty', group='upgrade_levels')
+        self.conductor = conductor_api.API()
+        service_ref = objects.Service(id=1, report_count=10)
+        self.conductor.service_report_state(self.context, service_ref)
+        mock_save.assert_called_once_with()
+        self.assertFalse(mock_report.called)
+
 
 class ConductorLocalAPITestCase(ConductorAPITestCase):
     """Conductor LocalAPI Tests."""
@@ -255,6 +514,18 @@ class ConductorLocalAPITestCase(ConductorAPITestCase):
         # Override test in ConductorAPITestCase
         pass
 
+    @mock.patch.object(objects.Service, 'save')
+    @mock.patch.object(db, 'service_report_states')
+    def test_service_report_state(self, mock_report, mock_save):
+        service_ref = objects.Service(id=1, report_count=10)
+        self.conductor.service_report_state(self.context, service_ref)
+        mock_save.assert_called_once_with()
+        self.assertFalse(mock_report.called)
+
+    def test_service_report_state_old_conductor(self):
+        # Override test in ConductorAPITestCase
+        pass
+
 
 class ConductorImportTest(test.NoDBTestCase):
     def test_import_conductor_local(self):
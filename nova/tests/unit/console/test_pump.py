@@ -0,0 +1,100 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for the copy of the console traffic."""
+
+import ctypes
+import errno
+import socket
+
+import mock
+import testtools
+
+from nova.console import pump
+from nova import test
+
+
+class PumpTestCase(test.NoDBTestCase):
+
+    def setUp(self):
+        super(PumpTestCase, self).setUp()
+        self.flags(console_proxy_buffer_size=4096)
+        self.data = b''.join(('%05d' % i).encode() for i in range(2000))
+
+    def _pump(self):
+        source, source_peer = socket.socketpair()
+        dest, dest_peer = socket.socketpair()
+        self.addCleanup(source.close)
+        self.addCleanup(dest_peer.close)
+
+        source_peer.sendall(self.data)
+        source_peer.close()
+        self.assertTrue(pump.pump(source, dest))
+        dest.close()
+
+        received = []
+        while True:
+            chunk = dest_peer.recv(65536)
+            if not chunk:
+                break
+            received.append(chunk)
+        self.assertEqual(self.data, b''.join(received))
+
+    def test_pump(self):
+        self.assertFalse(pump.can_splice())
+        self._pump()
+
+    @testtools.skipUnless(pump._get_splice(), 'splice is not available')
+    def test_pump_splice(self):
+        self.flags(console_proxy_splice=True)
+        self.assertTrue(pump.can_splice())
+        self._pump()
+
+    @mock.patch.object(pump, '_get_splice')
+    def test_can_splice(self, mock_splice):
+        self.assertFalse(pump.can_splice())
+        self.flags(console_proxy_splice=True)
+        self.assertTrue(pump.can_splice())
+        mock_splice.return_value = False
+        self.assertFalse(pump.can_splice())
+
+    @mock.patch.object(pump, '_get_splice')
+    def test_pump_splice_error(self, mock_splice):
+        def fake_splice(*args):
+            ctypes.set_errno(errno.EBADF)
+            return -1
+
+        mock_splice.return_value = fake_splice
+        self.flags(console_proxy_splice=True)
+        source = mock.Mock()
+        source.fileno.return_value = 10
+        dest = mock.Mock()
+        dest.fileno.return_value = 11
+
+        self.assertTrue(pump.pump(source, dest))
+
+    def test_pump_send_error(self):
+        source = mock.Mock()
+        source.recv_into.return_value = 10
+        dest = mock.Mock()
+        dest.sendall.side_effect = socket.error
+
+        self.assertFalse(pump.pump(source, dest))
+        self.assertEqual(1, dest.sendall.call_count)
+
+    def test_pump_recv_error(self):
+        source = mock.Mock()
+        source.recv_into.side_effect = socket.error
+        dest = mock.Mock()
+
+        self.assertTrue(pump.pump(source, dest))
+        self.assertFalse(dest.sendall.called)
@@ -14,10 +14,12 @@
 
 """Tests for nova websocketproxy."""
 
+import time
 
 import mock
 
 from nova.console import websocketproxy
+from nova.consoleauth import token_cache
 from nova import exception
 from nova import test
 
@@ -162,6 +164,41 @@ class NovaProxyRequestHandlerBaseTestCase(test.NoDBTestCase):
                           self.wh.new_websocket_client)
         check_token.assert_called_with(mock.ANY, token="XXX")
 
+    @mock.patch('nova.consoleauth.rpcapi.ConsoleAuthAPI.check_token')
+    def test_new_websocket_client_token_cached(self, check_token):
+        self.flags(console_token_cache_ttl=60)
+        self.addCleanup(token_cache.reset_state)
+        check_token.return_value = {
+            'host': 'node1',
+            'port': '10000',
+            'console_type': 'novnc',
+            'access_url': 'https://example.net:6080',
+            'last_activity_at': time.time()
+        }
+        self.wh.socket.return_value = '<socket>'
+        self.wh.path = "http://127.0.0.1/?token=123-456-789"
+        self.wh.headers.getheader = self._fake_getheader
+
+        self.wh.new_websocket_client()
+        self.wh.new_websocket_client()
+
+        check_token.assert_called_once_with(mock.ANY, token="123-456-789")
+        self.assertEqual(2, self.wh.do_proxy.call_count)
+
+    @mock.patch('nova.consoleauth.rpcapi.ConsoleAuthAPI.check_token')
+    def test_new_websocket_client_token_invalid_cached(self, check_token):
+        self.flags(console_token_negative_cache_ttl=5)
+        self.addCleanup(token_cache.reset_state)
+        check_token.return_value = False
+
+        self.wh.path = "http://127.0.0.1/?token=XXX"
+        self.wh.headers.getheader = self._fake_getheader_bad_token
+
+        for i in range(2):
+            self.assertRaises(exception.InvalidToken,
+                              self.wh.new_websocket_client)
+        check_token.assert_called_once_with(mock.ANY, token="XXX")
+
     @mock.patch('nova.consoleauth.rpcapi.ConsoleAuthAPI.check_token')
     def test_new_websocket_client_internal_access_path(self, check_token):
         check_token.return_value = {
@@ -18,11 +18,14 @@ Tests for Consoleauth Code.
 
 """
 
+import time
+
 import mock
 from mox3 import mox
 from oslo_utils import timeutils
 
 from nova.consoleauth import manager
+from nova.consoleauth import token_cache
 from nova import context
 from nova import test
 
@@ -35,6 +38,7 @@ class ConsoleauthTestCase(test.NoDBTestCase):
         self.manager_api = self.manager = manager.ConsoleAuthManager()
         self.context = context.get_admin_context()
         self.instance_uuid = '00000000-0000-0000-0000-000000000000'
+        self.addCleanup(token_cache.reset_state)
 
     def test_reset(self):
         with mock.patch('nova.compute.rpcapi.ComputeAPI') as mock_rpc:
@@ -104,6 +108,21 @@ class ConsoleauthTestCase(test.NoDBTestCase):
             self.assertIsNone(
                 self.manager_api.check_token(self.context, token))
 
+    def test_delete_tokens_for_instance_revokes_cached(self):
+        self.flags(console_token_cache_ttl=60)
+        cache = token_cache.get_token_cache()
+        self.manager_api.authorize_console(self.context, u'token', 'novnc',
+                                           '127.0.0.1', '8080', 'host',
+                                           self.instance_uuid)
+        cache.set_valid(u'token', {'host': '127.0.0.1'}, time.time() + 60)
+        cache.set_valid(u'other', {'host': '127.0.0.1'}, time.time() + 60)
+
+        self.manager_api.delete_tokens_for_instance(self.context,
+                                                    self.instance_uuid)
+
+        self.assertIsNone(cache.get(u'token'))
+        self.assertIsNotNone(cache.get(u'other'))
+
     @mock.patch('nova.objects.instance.Instance.get_by_uuid')
     def test_wrong_token_has_port(self, mock_get):
         mock_get.return_value = None
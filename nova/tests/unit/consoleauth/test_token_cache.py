@@ -0,0 +1,73 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from nova.consoleauth import token_cache
+from nova import test
+
+
+@mock.patch('time.time')
+class ConsoleTokenCacheTestCase(test.NoDBTestCase):
+
+    def setUp(self):
+        super(ConsoleTokenCacheTestCase, self).setUp()
+        self.flags(console_token_cache_ttl=60,
+                   console_token_negative_cache_ttl=5)
+        self.cache = token_cache.ConsoleTokenCache()
+
+    def test_valid(self, mock_time):
+        mock_time.return_value = 1000
+        self.cache.set_valid('token', {'host': 'node1'}, 2000)
+
+        mock_time.return_value = 1059
+        self.assertEqual({'host': 'node1'},
+                         self.cache.get('token')['connect_info'])
+        mock_time.return_value = 1060
+        self.assertIsNone(self.cache.get('token'))
+
+    def test_valid_token_expires_first(self, mock_time):
+        mock_time.return_value = 1000
+        self.cache.set_valid('token', {'host': 'node1'}, 1010)
+
+        mock_time.return_value = 1009
+        self.assertIsNotNone(self.cache.get('token'))
+        mock_time.return_value = 1010
+        self.assertIsNone(self.cache.get('token'))
+
+    def test_invalid(self, mock_time):
+        mock_time.return_value = 1000
+        self.cache.set_invalid('token')
+
+        mock_time.return_value = 1004
+        self.assertIsNone(self.cache.get('token')['connect_info'])
+        mock_time.return_value = 1005
+        self.assertIsNone(self.cache.get('token'))
+
+    def test_disabled(self, mock_time):
+        mock_time.return_value = 1000
+        self.flags(console_token_cache_ttl=0,
+                   console_token_negative_cache_ttl=0)
+        self.cache.set_valid('token', {'host': 'node1'}, 2000)
+        self.cache.set_invalid('other')
+        self.assertIsNone(self.cache.get('token'))
+        self.assertIsNone(self.cache.get('other'))
+
+    def test_delete(self, mock_time):
+        mock_time.return_value = 1000
+        self.cache.set_valid('token1', {'host': 'node1'}, 2000)
+        self.cache.set_valid('token2', {'host': 'node1'}, 2000)
+
+        self.cache.delete(['token1'])
+
+        self.assertIsNone(self.cache.get('token1'))
+        self.assertIsNotNone(self.cache.get('token2'))
@@ -3351,6 +3351,23 @@ class ServiceTestCase(test.TestCase, ModelsObjectComparatorMixin):
         for key, value in new_values.items():
             self.assertEqual(value, updated_service[key])
 
+    def test_service_report_states(self):
+        service1 = self._create_service({})
+        service2 = self._create_service({'host': 'fake_host2'})
+        service3 = self._create_service({'host': 'fake_host3'})
+        now = timeutils.utcnow().replace(microsecond=0)
+        earlier = now - datetime.timedelta(seconds=5)
+        self.assertEqual(2, db.service_report_states(
+            self.ctxt, {service1['id']: (4, now),
+                        service2['id']: (7, earlier)}))
+        for service, report_count, last_seen_up in (
+                (service1, 4, now), (service2, 7, earlier),
+                (service3, 3, None)):
+            updated_service = db.service_get(self.ctxt, service['id'])
+            self.assertEqual(report_count, updated_service['report_count'])
+            self.assertEqual(last_seen_up, updated_service['last_seen_up'])
+        self.assertEqual(0, db.service_report_states(self.ctxt, {}))
+
     def test_service_update_not_found_exception(self):
         self.assertRaises(exception.ServiceNotFound,
                           db.service_update, self.ctxt, 100500, {})
@@ -7728,6 +7745,32 @@ class ComputeNodeTestCase(test.TestCase, ModelsObjectComparatorMixin):
         nodes = db.compute_node_get_all(self.ctxt)
         self.assertEqual(len(nodes), 0)
 
+    def test_compute_node_get_all_changed_since(self):
+        before = timeutils.utcnow() - datetime.timedelta(minutes=1)
+        nodes = db.compute_node_get_all_changed_since(self.ctxt, before)
+        self.assertEqual([self.item['id']], [n['id'] for n in nodes])
+
+        after = timeutils.utcnow() + datetime.timedelta(minutes=1)
+        nodes = db.compute_node_get_all_changed_since(self.ctxt, after)
+        self.assertEqual([], nodes)
+
+    def test_compute_node_get_all_changed_since_updated(self):
+        since = timeutils.utcnow() + datetime.timedelta(minutes=1)
+        self.useFixture(utils_fixture.TimeFixture(
+            since + datetime.timedelta(minutes=1)))
+        db.compute_node_update(self.ctxt, self.item['id'], {'vcpus_used': 1})
+        nodes = db.compute_node_get_all_changed_since(self.ctxt, since)
+        self.assertEqual(1, len(nodes))
+        self.assertEqual(1, nodes[0]['vcpus_used'])
+
+    def test_compute_node_get_all_changed_since_deleted(self):
+        since = timeutils.utcnow() - datetime.timedelta(minutes=1)
+        db.compute_node_delete(self.ctxt, self.item['id'])
+        nodes = db.compute_node_get_all_changed_since(self.ctxt, since)
+        self.assertEqual(1, len(nodes))
+        self.assertEqual(self.item['id'], nodes[0]['id'])
+        self.assertTrue(nodes[0]['deleted'])
+
     def test_compute_node_search_by_hypervisor(self):
         nodes_created = []
         new_service = copy.copy(self.service_dict)
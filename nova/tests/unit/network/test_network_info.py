@@ -14,7 +14,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
+
 from oslo_config import cfg
+import testtools
 
 from nova import exception
 from nova.network import model
@@ -522,6 +525,68 @@ class NetworkInfoTests(test.NoDBTestCase):
                  fake_network_cache_model.new_fixed_ip(
                         {'address': '10.10.0.3'})] * 4, ninfo.fixed_ips())
 
+    def _lazy_model(self):
+        ninfo = model.NetworkInfo([fake_network_cache_model.new_vif(),
+                fake_network_cache_model.new_vif(
+                        {'address': 'bb:bb:bb:bb:bb:bb'})])
+        return ninfo, model.LazyNetworkInfo(ninfo.json())
+
+    def test_lazy_model_not_hydrated(self):
+        ninfo, lazy = self._lazy_model()
+        self.assertEqual(2, len(lazy))
+        self.assertEqual(ninfo.fixed_ips(), lazy.fixed_ips())
+        self.assertEqual(ninfo.floating_ips(), lazy.floating_ips())
+        self.assertEqual(ninfo.json(), lazy.json())
+        # None of the above built the VIFs
+        self.assertEqual(0, list.__len__(lazy))
+
+    def test_lazy_model_json_unchanged(self):
+        json = model.NetworkInfo([fake_network_cache_model.new_vif()]).json()
+        self.assertIs(json, model.LazyNetworkInfo(json).json())
+
+    def test_lazy_model_hydrated(self):
+        ninfo, lazy = self._lazy_model()
+        self.assertEqual(ninfo, lazy)
+        self.assertEqual(ninfo, model.LazyNetworkInfo(ninfo.json()))
+        self.assertEqual(2, list.__len__(lazy))
+        self.assertIsInstance(lazy[0], model.VIF)
+        self.assertEqual('bb:bb:bb:bb:bb:bb', lazy[1]['address'])
+
+    def test_lazy_model_mutated(self):
+        ninfo, lazy = self._lazy_model()
+        lazy.append(fake_network_cache_model.new_vif(
+            {'address': 'cc:cc:cc:cc:cc:cc'}))
+        self.assertEqual(3, len(lazy))
+        self.assertEqual(['aa:aa:aa:aa:aa:aa', 'bb:bb:bb:bb:bb:bb',
+                          'cc:cc:cc:cc:cc:cc'],
+                         [vif['address'] for vif in lazy])
+        self.assertEqual(ninfo.fixed_ips() + lazy[2].fixed_ips(),
+                         lazy.fixed_ips())
+
+    def test_lazy_model_copy(self):
+        ninfo, lazy = self._lazy_model()
+        copied = copy.deepcopy(lazy)
+        self.assertIs(model.NetworkInfo, type(copied))
+        self.assertEqual(ninfo, copied)
+
+    @testtools.skipUnless(hasattr(list, 'clear'), 'list.clear is py3 only')
+    def test_lazy_model_clear(self):
+        ninfo, lazy = self._lazy_model()
+        lazy.clear()
+        self.assertEqual(0, len(lazy))
+        self.assertEqual([], list(lazy))
+        self.assertEqual([], lazy.fixed_ips())
+
+    @testtools.skipUnless(hasattr(list, 'copy'), 'list.copy is py3 only')
+    def test_lazy_model_list_copy(self):
+        ninfo, lazy = self._lazy_model()
+        copied = lazy.copy()
+        self.assertEqual(list(ninfo), copied)
+        self.assertIsInstance(copied[0], model.VIF)
+
+    def test_lazy_model_invalid_json(self):
+        self.assertRaises(ValueError, model.LazyNetworkInfo, 'foo')
+
     def _setup_injected_network_scenario(self, should_inject=True,
                                         use_ipv4=True, use_ipv6=False,
                                         gateway=True, dns=True,
@@ -46,6 +46,7 @@ from nova.pci import whitelist as pci_whitelist
 from nova import policy
 from nova import test
 from nova.tests.unit import fake_instance
+from nova.tests import uuidsentinel as uuids
 
 CONF = cfg.CONF
 
@@ -2454,7 +2455,7 @@ class TestNeutronv2(TestNeutronv2Base):
         fake_ips = [model.IP(x['ip_address']) for x in fake_port['fixed_ips']]
         api = neutronapi.API()
         self.mox.StubOutWithMock(api, '_get_subnets_from_port')
-        api._get_subnets_from_port(self.context, fake_port).AndReturn(
+        api._get_subnets_from_port(self.context, fake_port, None).AndReturn(
             [fake_subnet])
         self.mox.ReplayAll()
         neutronapi.get_client('fake')
@@ -2707,8 +2708,8 @@ class TestNeutronv2(TestNeutronv2Base):
                 self.moxed_client, '1.1.1.1', requested_port['id']).AndReturn(
                     [{'floating_ip_address': '10.0.0.1'}])
         for requested_port in requested_ports:
-            api._get_subnets_from_port(self.context, requested_port
-                ).AndReturn(fake_subnets)
+            api._get_subnets_from_port(self.context, requested_port,
+                                       None).AndReturn(fake_subnets)
 
         self.mox.StubOutWithMock(api, '_get_preexisting_port_ids')
         api._get_preexisting_port_ids(fake_inst).AndReturn(['port5'])
@@ -3033,6 +3034,185 @@ class TestNeutronv2WithMock(test.TestCase):
                                             update_cells=False)
         self.assertEqual(fake_result, result)
 
+    @mock.patch.object(neutronapi, 'get_client')
+    def test_prefetch_instances_nw_info(self, mock_get_client):
+        mocked_client = mock.Mock()
+        mock_get_client.return_value = mocked_client
+        instances = []
+        for instance_uuid in (uuids.instance_1, uuids.instance_2):
+            instance = fake_instance.fake_instance_obj(
+                self.context, uuid=instance_uuid, project_id='fake-project')
+            instance.info_cache = objects.InstanceInfoCache(
+                network_info=model.NetworkInfo([model.VIF(
+                    id='port-' + instance_uuid,
+                    network=model.Network(id='net-1'))]))
+            instances.append(instance)
+        ports = [{'id': 'port-' + inst.uuid,
+                  'device_id': inst.uuid,
+                  'tenant_id': 'fake-project',
+                  'network_id': 'net-1',
+                  'mac_address': 'fa:16:3e:00:00:0%d' % i,
+                  'admin_state_up': True,
+                  'status': 'ACTIVE',
+                  'fixed_ips': [{'ip_address': '10.0.0.%d' % i,
+                                 'subnet_id': 'subnet-1'}]}
+                 for i, inst in enumerate(instances)]
+        dhcp_port = {'network_id': 'net-1',
+                     'fixed_ips': [{'ip_address': '10.0.0.254',
+                                    'subnet_id': 'subnet-1'}]}
+        mocked_client.list_ports.side_effect = [{'ports': ports},
+                                                {'ports': [dhcp_port]}]
+        mocked_client.list_networks.return_value = {
+            'networks': [{'id': 'net-1', 'name': 'net', 'tenant_id': 'x'}]}
+        mocked_client.list_subnets.return_value = {
+            'subnets': [{'id': 'subnet-1', 'network_id': 'net-1',
+                         'cidr': '10.0.0.0/24', 'gateway_ip': '10.0.0.1'}]}
+        mocked_client.list_floatingips.return_value = {
+            'floatingips': [{'fixed_ip_address': '10.0.0.1',
+                             'port_id': 'port-' + instances[1].uuid,
+                             'floating_ip_address': '172.24.4.1'}]}
+
+        prefetched = self.api.prefetch_instances_nw_info(self.context,
+                                                         instances)
+
+        mock_get_client.assert_called_once_with(self.context, admin=True)
+        mocked_client.list_ports.assert_has_calls([
+            mock.call(device_id=[uuids.instance_1, uuids.instance_2]),
+            mock.call(network_id=['net-1'], device_owner='network:dhcp')])
+        mocked_client.list_networks.assert_called_once_with(id=['net-1'])
+        mocked_client.list_subnets.assert_called_once_with(id=['subnet-1'])
+        mocked_client.list_floatingips.assert_called_once_with(
+            port_id=[port['id'] for port in ports])
+        self.assertEqual([ports[1]], prefetched.get_ports(instances[1]))
+        self.assertEqual([], prefetched.get_networks(['net-2']))
+        self.assertEqual([dhcp_port], prefetched.get_dhcp_ports('net-1'))
+        self.assertEqual(
+            1, len(prefetched.get_floating_ips('10.0.0.1', ports[1]['id'])))
+        self.assertEqual(
+            [], prefetched.get_floating_ips('10.0.0.0', ports[0]['id']))
+
+        # Building the network info of an instance does not query neutron
+        mock_get_client.reset_mock()
+        mocked_client.reset_mock()
+        with mock.patch.object(self.api, '_get_preexisting_port_ids',
+                               return_value=[]):
+            nw_info = self.api._build_network_info_model(
+                self.context, instances[1], prefetched=prefetched)
+        self.assertFalse(mocked_client.method_calls)
+        self.assertEqual(1, len(nw_info))
+        self.assertEqual('10.0.0.254',
+                         nw_info[0]['network']['subnets'][0]['dhcp_server'])
+        self.assertEqual(['172.24.4.1'],
+                         [ip['address'] for ip in nw_info.floating_ips()])
+
+    @mock.patch.object(neutronapi, 'get_client')
+    def test_build_network_info_model_coalesced(self, mock_get_client):
+        self.flags(coalesce_port_queries=True, group='neutron')
+        self.addCleanup(neutronapi.reset_state)
+        mocked_client = mock.Mock()
+        mock_get_client.return_value = mocked_client
+        instance = fake_instance.fake_instance_obj(
+            self.context, uuid=uuids.instance, project_id='fake-project')
+        ports = [{'id': 'port-%d' % i,
+                  'device_id': uuids.instance,
+                  'tenant_id': 'fake-project',
+                  'network_id': 'net-%d' % i,
+                  'mac_address': 'fa:16:3e:00:00:0%d' % i,
+                  'admin_state_up': True,
+                  'status': 'ACTIVE',
+                  'fixed_ips': [{'ip_address': '10.0.%d.2' % i,
+                                 'subnet_id': 'subnet-%d' % i}]}
+                 for i in range(3)]
+        instance.info_cache = objects.InstanceInfoCache(
+            network_info=model.NetworkInfo([
+                model.VIF(id=port['id'],
+                          network=model.Network(id=port['network_id']))
+                for port in ports]))
+        mocked_client.list_ports.side_effect = [{'ports': ports},
+                                                {'ports': []}]
+        mocked_client.list_networks.return_value = {'networks': [
+            {'id': port['network_id'], 'name': 'net', 'tenant_id': 'x'}
+            for port in ports]}
+        mocked_client.list_subnets.return_value = {'subnets': [
+            {'id': 'subnet-%d' % i, 'network_id': 'net-%d' % i,
+             'cidr': '10.0.%d.0/24' % i, 'gateway_ip': '10.0.%d.1' % i}
+            for i in range(3)]}
+        mocked_client.list_floatingips.return_value = {'floatingips': []}
+
+        with mock.patch.object(self.api, '_get_preexisting_port_ids',
+                               return_value=[]):
+            nw_info = self.api._build_network_info_model(self.context,
+                                                         instance)
+
+        self.assertEqual(3, len(nw_info))
+        self.assertEqual(2, mocked_client.list_ports.call_count)
+        self.assertEqual(1, mocked_client.list_networks.call_count)
+        mocked_client.list_subnets.assert_called_once_with(
+            id=['subnet-0', 'subnet-1', 'subnet-2'])
+        mocked_client.list_floatingips.assert_called_once_with(
+            port_id=['port-0', 'port-1', 'port-2'])
+        # 3 floating IP, 3 subnet and 3 DHCP port requests became 3
+        self.assertEqual(
+            6, neutronapi.get_response_cache().stats['requests_saved'])
+
+    def test_list_subnets_cached(self):
+        self.flags(subnet_cache_ttl=60, group='neutron')
+        self.addCleanup(neutronapi.reset_state)
+        mocked_client = mock.Mock()
+        subnet = {'id': 'subnet-1', 'network_id': 'net-1'}
+        dhcp_port = {'id': 'port-1', 'network_id': 'net-1'}
+        mocked_client.list_subnets.return_value = {'subnets': [subnet]}
+        mocked_client.list_ports.return_value = {'ports': [dhcp_port]}
+        for i in range(2):
+            self.assertEqual([subnet], self.api._list_subnets(
+                mocked_client, ['subnet-1']))
+            self.assertEqual([dhcp_port], self.api._list_dhcp_ports(
+                mocked_client, 'net-1'))
+        mocked_client.list_subnets.assert_called_once_with(id=['subnet-1'])
+        mocked_client.list_ports.assert_called_once_with(
+            network_id=['net-1'], device_owner='network:dhcp')
+        stats = neutronapi.get_response_cache().stats
+        self.assertEqual(2, stats['requests_saved'])
+        self.assertEqual(2, stats['hits'])
+
+    @mock.patch.object(neutronapi.time, 'time')
+    def test_response_cache_expires(self, mock_time):
+        mock_time.return_value = 100
+        cache = neutronapi.ResponseCache(10, 10)
+        cache.set('subnet', 'subnet-1', mock.sentinel.subnet)
+        self.assertEqual(mock.sentinel.subnet,
+                         cache.get('subnet', 'subnet-1'))
+        mock_time.return_value = 111
+        self.assertIsNone(cache.get('subnet', 'subnet-1'))
+        self.assertEqual({'hits': 1, 'misses': 1}, dict(cache.stats))
+        self.assertEqual(0, len(cache))
+
+    def test_response_cache_evicts_least_recently_used(self):
+        cache = neutronapi.ResponseCache(10, 2)
+        cache.set('subnet', 'subnet-1', mock.sentinel.subnet_1)
+        cache.set('subnet', 'subnet-2', mock.sentinel.subnet_2)
+        cache.get('subnet', 'subnet-1')
+        cache.set('subnet', 'subnet-3', mock.sentinel.subnet_3)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get('subnet', 'subnet-2'))
+        self.assertEqual(mock.sentinel.subnet_1,
+                         cache.get('subnet', 'subnet-1'))
+        self.assertEqual(mock.sentinel.subnet_3,
+                         cache.get('subnet', 'subnet-3'))
+        self.assertEqual(1, cache.stats['evictions'])
+
+    def test_get_response_cache_empty(self):
+        self.addCleanup(neutronapi.reset_state)
+        cache = neutronapi.get_response_cache()
+        self.assertEqual(0, len(cache))
+        cache.stats['requests_saved'] += 2
+        self.assertIsNone(cache.get('subnet', 'subnet-1'))
+        # The empty cache is kept, and its counters with it
+        self.assertIs(cache, neutronapi.get_response_cache())
+        neutronapi.get_response_cache().stats['requests_saved'] += 3
+        self.assertEqual({'requests_saved': 5, 'misses': 1},
+                         dict(neutronapi.get_response_cache().stats))
+
     def _test_validate_networks_fixed_ip_no_dup(self, nets, requested_networks,
                                                 ids, list_port_values):
 
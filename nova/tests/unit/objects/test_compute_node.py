@@ -381,6 +381,19 @@ class _TestComputeNodeObject(object):
                          subs=self.subs(),
                          comparators=self.comparators())
 
+    @mock.patch.object(db, 'compute_node_get_all_changed_since')
+    def test_get_all_changed_since(self, mock_get_changed):
+        mock_get_changed.return_value = [fake_compute_node]
+        computes = compute_node.ComputeNodeList.get_all_changed_since(
+            self.context, NOW)
+        self.assertEqual(1, len(computes))
+        self.compare_obj(computes[0], fake_compute_node,
+                         subs=self.subs(),
+                         comparators=self.comparators())
+        mock_get_changed.assert_called_once_with(self.context, mock.ANY)
+        self.assertEqual(NOW, timeutils.normalize_time(
+            mock_get_changed.call_args[0][1]))
+
     def test_get_by_hypervisor(self):
         self.mox.StubOutWithMock(db, 'compute_node_search_by_hypervisor')
         db.compute_node_search_by_hypervisor(self.context, 'hyper').AndReturn(
@@ -23,6 +23,7 @@ import pprint
 import fixtures
 import mock
 from oslo_log import log
+from oslo_serialization import jsonutils
 from oslo_utils import timeutils
 from oslo_utils import versionutils
 from oslo_versionedobjects import base as ovo_base
@@ -922,6 +923,43 @@ class TestObjectSerializer(_BaseTestCase):
         # .0 of the object.
         self.assertEqual('1.6', obj.VERSION)
 
+    def _compact_obj(self):
+        obj = MyObj(foo=1, bar='bar', rel_object=MyOwnedObject(baz=1),
+                    rel_objects=[MyOwnedObject(baz=2), MyOwnedObject(baz=3)])
+        obj.obj_reset_changes(['foo', 'rel_objects'], recursive=True)
+        return obj
+
+    def test_compact_primitive(self):
+        primitive = self._compact_obj().obj_to_primitive()
+        compact = base.compact_primitive(primitive)
+        table, root = compact[base.COMPACT_PRIMITIVE_KEY]
+        # The three MyOwnedObject share the same field names
+        self.assertEqual(
+            [['MyObj', '1.6', ['bar', 'foo', 'rel_object', 'rel_objects']],
+             ['MyOwnedObject', '1.0', ['baz']]], table)
+        self.assertEqual([0, 2], root['nova_object.ref'][2])
+        compact = jsonutils.loads(jsonutils.dumps(compact))
+        self.assertEqual(jsonutils.loads(jsonutils.dumps(primitive)),
+                         base.expand_primitive(compact))
+
+    def test_serialize_entity_compact(self):
+        ser = base.NovaObjectSerializer()
+        ser.compact = True
+        obj = self._compact_obj()
+        thing = {'obj': obj, 'other': 1}
+        primitive = ser.serialize_entity(self.context, thing)
+        self.assertIn(base.COMPACT_PRIMITIVE_KEY, primitive['obj'])
+        primitive = jsonutils.loads(jsonutils.dumps(primitive))
+
+        # Compact primitives are deserialized with compact unset
+        result = base.NovaObjectSerializer().deserialize_entity(
+            self.context, primitive)
+        self.assertEqual(1, result['other'])
+        self.assertTrue(base.obj_equal_prims(obj, result['obj']))
+        self.assertEqual(set(['bar', 'rel_object']),
+                         result['obj'].obj_what_changed())
+        self.assertEqual([2, 3], [o.baz for o in result['obj'].rel_objects])
+
     @mock.patch('oslo_versionedobjects.base.obj_tree_get_versions')
     def test_object_tree_backport(self, mock_get_versions):
         # Test the full client backport path all the way from the serializer
@@ -1108,7 +1146,7 @@ object_data = {
     'BuildRequest': '1.0-e4ca475cabb07f73d8176f661afe8c55',
     'CellMapping': '1.0-7f1a7e85a22bbb7559fc730ab658b9bd',
     'ComputeNode': '1.16-2436e5b836fa0306a3c4e6d9e5ddacec',
-    'ComputeNodeList': '1.14-3b6f4f5ade621c40e70cb116db237844',
+    'ComputeNodeList': '1.15-19ac1c605694c90126beee2dc731e04d',
     'DNSDomain': '1.0-7b0b2dab778454b6a7b6c66afe163a1a',
     'DNSDomainList': '1.0-4ee0d9efdfd681fed822da88376e04d2',
     'EC2Ids': '1.0-474ee1094c7ec16f8ce657595d8c49d9',
@@ -214,3 +214,16 @@ class TestImagePropsFilter(test.NoDBTestCase):
                         'hypervisor_version': hypervisor_version}
         host = fakes.FakeHostState('host1', 'node1', capabilities)
         self.assertTrue(self.filt_cls.host_passes(host, spec_obj))
+
+    def test_image_properties_filter_cache_key(self):
+        img_props = objects.ImageMeta(
+            properties=objects.ImageMetaProps(
+                hw_architecture=arch.X86_64,
+                img_hv_type=hv_type.KVM,
+                hw_cpu_cores=2))
+        spec_obj = objects.RequestSpec(image=img_props)
+        self.assertEqual((arch.X86_64, hv_type.KVM, None, None),
+                         self.filt_cls.get_cache_key(spec_obj))
+        spec_obj = objects.RequestSpec(image=None)
+        self.assertEqual((None, None, None, None),
+                         self.filt_cls.get_cache_key(spec_obj))
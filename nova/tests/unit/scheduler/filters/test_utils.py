@@ -114,3 +114,21 @@ class TestUtils(test.NoDBTestCase):
         host_state.instances = {inst1.uuid: inst1}
         self.assertFalse(utils.other_types_on_host(host_state, 1))
         self.assertTrue(utils.other_types_on_host(host_state, 2))
+
+    def test_extra_specs_cache_key(self):
+        self.assertEqual((), utils.extra_specs_cache_key(objects.Flavor()))
+        self.assertEqual((), utils.extra_specs_cache_key(
+            objects.Flavor(extra_specs={})))
+        self.assertEqual((('a', '1'), ('b', '2')), utils.extra_specs_cache_key(
+            objects.Flavor(extra_specs={'b': '2', 'a': '1'})))
+
+    def test_image_props_cache_key(self):
+        self.assertEqual((), utils.image_props_cache_key({}))
+        self.assertEqual((('a', '1'), ('b', 'x')),
+                         utils.image_props_cache_key({'b': 'x', 'a': 1,
+                                                      'c': None}))
+        image_props = objects.ImageMetaProps(hw_architecture='x86_64',
+                                             hw_cpu_cores=2)
+        self.assertEqual((('hw_architecture', 'x86_64'),
+                          ('hw_cpu_cores', '2')),
+                         utils.image_props_cache_key(image_props))
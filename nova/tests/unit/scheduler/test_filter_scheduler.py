@@ -21,9 +21,12 @@ import mock
 from nova import exception
 from nova import objects
 from nova.scheduler import filter_scheduler
+from nova.scheduler.filters import affinity_filter
+from nova.scheduler.filters import ram_filter
 from nova.scheduler import host_manager
 from nova.scheduler import utils as scheduler_utils
 from nova.scheduler import weights
+from nova.scheduler.weights import ram
 from nova import test  # noqa
 from nova.tests.unit.scheduler import fakes
 from nova.tests.unit.scheduler import test_scheduler
@@ -54,7 +57,8 @@ class FilterSchedulerTestCase(test_scheduler.SchedulerTestCase):
 
         self.next_weight = 1.0
 
-        def _fake_weigh_objects(_self, functions, hosts, options):
+        def _fake_weigh_objects(_self, functions, hosts, options,
+                                limit=None):
             self.next_weight += 2.0
             host_state = hosts[0]
             return [weights.WeighedHost(host_state, self.next_weight)]
@@ -201,7 +205,8 @@ class FilterSchedulerTestCase(test_scheduler.SchedulerTestCase):
         self.flags(scheduler_host_subset_size=1)
         self.next_weight = 50
 
-        def _fake_weigh_objects(_self, functions, hosts, options):
+        def _fake_weigh_objects(_self, functions, hosts, options,
+                                limit=None):
             this_weight = self.next_weight
             self.next_weight = 0
             host_state = hosts[0]
@@ -254,7 +259,8 @@ class FilterSchedulerTestCase(test_scheduler.SchedulerTestCase):
         selected_hosts = []
         selected_nodes = []
 
-        def _fake_weigh_objects(_self, functions, hosts, options):
+        def _fake_weigh_objects(_self, functions, hosts, options,
+                                limit=None):
             self.next_weight += 2.0
             host_state = hosts[0]
             selected_hosts.append(host_state.host)
@@ -331,3 +337,77 @@ class FilterSchedulerTestCase(test_scheduler.SchedulerTestCase):
                 # Make sure that the consumed hosts have chance to be reverted.
                 for host in consumed_hosts:
                     self.assertIsNone(host.obj.updated)
+
+    def _schedule_with_real_filters(self, num_instances, policies=None):
+        # NOTE: host2 and host3 have the same free RAM so that the ties have
+        # to be broken the same way in both modes.
+        host_values = [('host1', 3072), ('host2', 2048), ('host3', 2048),
+                       ('host4', 4096)]
+        hosts = [fakes.FakeHostState(host, 'node-' + host,
+                                     {'free_ram_mb': free_ram_mb,
+                                      'total_usable_ram_mb': 4096,
+                                      'ram_allocation_ratio': 1.0,
+                                      'free_disk_mb': 10240})
+                 for host, free_ram_mb in host_values]
+        instance_group = None
+        if policies:
+            instance_group = objects.InstanceGroup(policies=policies,
+                                                   hosts=[], members=[])
+        spec_obj = objects.RequestSpec(
+            num_instances=num_instances,
+            flavor=objects.Flavor(memory_mb=1024,
+                                  root_gb=1,
+                                  ephemeral_gb=0,
+                                  vcpus=1),
+            project_id=1,
+            instance_uuid='fake-uuid',
+            ignore_hosts=None,
+            force_hosts=None,
+            force_nodes=None,
+            pci_requests=None,
+            numa_topology=None,
+            instance_group=instance_group)
+
+        self.driver.host_manager.default_filters = [
+            ram_filter.RamFilter(),
+            affinity_filter.ServerGroupAffinityFilter(),
+            affinity_filter.ServerGroupAntiAffinityFilter()]
+        self.driver.host_manager.weighers = [ram.RAMWeigher()]
+        with mock.patch.object(self.driver, '_get_all_host_states',
+                               return_value=iter(hosts)):
+            selected_hosts = self.driver._schedule(self.context, spec_obj)
+        return [weighed_host.obj.host for weighed_host in selected_hosts]
+
+    def test_schedule_batch_placement(self):
+        expected = self._schedule_with_real_filters(8)
+        self.assertEqual(['host4', 'host1', 'host4', 'host1', 'host2',
+                          'host3', 'host4', 'host1'], expected)
+
+        self.flags(scheduler_batch_placement=True)
+        manager = self.driver.host_manager
+        with mock.patch.object(manager, 'get_filtered_hosts',
+                               wraps=manager.get_filtered_hosts
+                               ) as mock_filter:
+            self.assertEqual(expected, self._schedule_with_real_filters(8))
+        # Only the consumed host is filtered again.
+        self.assertEqual(8, mock_filter.call_count)
+        for call in mock_filter.call_args_list[1:]:
+            self.assertEqual(1, len(call[0][0]))
+
+    def test_schedule_batch_placement_not_enough_hosts(self):
+        self.flags(scheduler_batch_placement=True)
+        selected_hosts = self._schedule_with_real_filters(20)
+        self.assertEqual(11, len(selected_hosts))
+
+    def test_schedule_batch_placement_anti_affinity(self):
+        self.flags(scheduler_batch_placement=True)
+        selected_hosts = self._schedule_with_real_filters(
+            6, policies=['anti-affinity'])
+        self.assertEqual(['host4', 'host1', 'host2', 'host3'],
+                         selected_hosts)
+
+    def test_schedule_batch_placement_affinity(self):
+        self.flags(scheduler_batch_placement=True)
+        selected_hosts = self._schedule_with_real_filters(
+            6, policies=['affinity'])
+        self.assertEqual(['host4'] * 4, selected_hosts)
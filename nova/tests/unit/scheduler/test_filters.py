@@ -119,6 +119,38 @@ class FiltersTestCase(test.NoDBTestCase):
         filt2_mock.filter_all.assert_called_once_with(filter_objs_second,
                                                       spec_obj)
 
+    def test_get_filtered_objects_filter_context(self):
+        filter_objs_initial = ['initial', 'filter1', 'objects1']
+        filter_objs_last = ['last', 'filter2', 'objects2']
+        spec_obj = objects.RequestSpec()
+
+        def _fake_base_loader_init(*args, **kwargs):
+            pass
+
+        self.stub_out('nova.loadables.BaseLoader.__init__',
+                      _fake_base_loader_init)
+
+        filt1_mock = mock.Mock(Filter1)
+        filt1_mock.run_filter_for_index.return_value = True
+
+        filter_handler = filters.BaseFilterHandler(filters.BaseFilter)
+        with test.nested(
+            mock.patch.object(filter_handler, '_get_filter_context',
+                              return_value=mock.sentinel.filter_context),
+            mock.patch.object(filter_handler, '_filter_all',
+                              return_value=filter_objs_last)
+        ) as (mock_get_context, mock_filter_all):
+            result = filter_handler.get_filtered_objects([filt1_mock],
+                                                         filter_objs_initial,
+                                                         spec_obj)
+        self.assertEqual(filter_objs_last, result)
+        mock_get_context.assert_called_once_with(filter_objs_initial,
+                                                 spec_obj)
+        mock_filter_all.assert_called_once_with(
+            filt1_mock, filter_objs_initial, spec_obj,
+            mock.sentinel.filter_context)
+        self.assertFalse(filt1_mock.filter_all.called)
+
     def test_get_filtered_objects_for_index(self):
         """Test that we don't call a filter when its
         run_filter_for_index() method returns false
@@ -264,3 +296,25 @@ class FiltersTestCase(test.NoDBTestCase):
             cargs = mock_log.call_args[0][0]
             self.assertIn("with instance ID '{0!s}'".format(fake_uuid), cargs)
             self.assertIn(exp_output, cargs)
+
+    def test_get_filtered_objects_records_timings(self):
+        filter_objs_initial = ['initial', 'filter1', 'objects1']
+        filter_objs_second = ['second', 'filter2']
+        spec_obj = objects.RequestSpec()
+
+        def _fake_base_loader_init(*args, **kwargs):
+            pass
+
+        self.stub_out('nova.loadables.BaseLoader.__init__',
+                      _fake_base_loader_init)
+
+        filt1_mock = mock.Mock(Filter1)
+        filt1_mock.run_filter_for_index.return_value = True
+        filt1_mock.filter_all.return_value = filter_objs_second
+
+        filter_handler = filters.BaseFilterHandler(filters.BaseFilter)
+        filter_handler.timings = mock.Mock()
+        filter_handler.get_filtered_objects([filt1_mock],
+                                            filter_objs_initial, spec_obj)
+        filter_handler.timings.record.assert_called_once_with(
+            'filter', 'Filter1', mock.ANY, 3, 2)
@@ -14,11 +14,24 @@
 """
 Tests For Scheduler Host Filters.
 """
+import mock
+import testtools
+
+from nova import objects
 from nova.scheduler import filters
+from nova.scheduler.filters import aggregate_instance_extra_specs
 from nova.scheduler.filters import all_hosts_filter
+from nova.scheduler.filters import availability_zone_filter
+from nova.scheduler.filters import compute_capabilities_filter
 from nova.scheduler.filters import compute_filter
+from nova.scheduler.filters import core_filter
+from nova.scheduler.filters import disk_filter
+from nova.scheduler.filters import io_ops_filter
+from nova.scheduler.filters import num_instances_filter
+from nova.scheduler.filters import ram_filter
 from nova import test
 from nova.tests.unit.scheduler import fakes
+from nova.tests import uuidsentinel as uuids
 
 
 class HostFiltersTestCase(test.NoDBTestCase):
@@ -35,3 +48,188 @@ class HostFiltersTestCase(test.NoDBTestCase):
         filt_cls = all_hosts_filter.AllHostsFilter()
         host = fakes.FakeHostState('host1', 'node1', {})
         self.assertTrue(filt_cls.host_passes(host, {}))
+
+
+@testtools.skipIf(filters.numpy is None, 'numpy is not available')
+class VectorizedHostFiltersTestCase(test.NoDBTestCase):
+
+    def setUp(self):
+        super(VectorizedHostFiltersTestCase, self).setUp()
+        self.flags(max_io_ops_per_host=4, max_instances_per_host=10)
+        self.spec_obj = objects.RequestSpec(
+            instance_uuid=uuids.instance,
+            flavor=objects.Flavor(memory_mb=1024, vcpus=2, root_gb=10,
+                                  ephemeral_gb=0, swap=512))
+
+    def _get_hosts(self):
+        hosts = []
+        for i in range(12):
+            hosts.append(fakes.FakeHostState('host%d' % i, 'node%d' % i,
+                {'free_ram_mb': 512 * (i - 3),
+                 'total_usable_ram_mb': 256 * i,
+                 'ram_allocation_ratio': 1.0 + (i % 3) * 0.5,
+                 'free_disk_mb': 4096 * (i - 4),
+                 'total_usable_disk_gb': 4 * i,
+                 'disk_allocation_ratio': 1.0 + (i % 2),
+                 'vcpus_total': i % 5,
+                 'vcpus_used': i % 4,
+                 'cpu_allocation_ratio': 1.0 + (i % 4) * 0.5,
+                 'num_instances': i,
+                 'num_io_ops': i % 6}))
+        return hosts
+
+    def _filter(self, filter_objs, vectorized):
+        self.flags(scheduler_use_vectorized_filters=vectorized)
+        handler = filters.HostFilterHandler()
+        hosts = self._get_hosts()
+        result = handler.get_filtered_objects(filter_objs, hosts,
+                                              self.spec_obj)
+        return ([(host.host, host.limits) for host in result],
+                [host.limits for host in hosts])
+
+    def _test_filters(self, filter_objs):
+        expected = self._filter(filter_objs, False)
+        self.assertEqual(expected, self._filter(filter_objs, True))
+        self.assertNotEqual([], expected[0])
+
+    def test_ram_filter(self):
+        self._test_filters([ram_filter.RamFilter()])
+
+    def test_core_filter(self):
+        self._test_filters([core_filter.CoreFilter()])
+
+    def test_disk_filter(self):
+        self._test_filters([disk_filter.DiskFilter()])
+
+    def test_num_instances_filter(self):
+        self._test_filters([num_instances_filter.NumInstancesFilter()])
+
+    def test_io_ops_filter(self):
+        self._test_filters([io_ops_filter.IoOpsFilter()])
+
+    @mock.patch('nova.scheduler.filters.utils.aggregate_values_from_key')
+    def test_aggregate_filters(self, agg_mock):
+        agg_mock.return_value = set(['6'])
+        self._test_filters([ram_filter.AggregateRamFilter(),
+                            core_filter.AggregateCoreFilter(),
+                            disk_filter.AggregateDiskFilter(),
+                            num_instances_filter.AggregateNumInstancesFilter(),
+                            io_ops_filter.AggregateIoOpsFilter()])
+
+    def test_mixed_filters(self):
+        self._test_filters([io_ops_filter.IoOpsFilter(),
+                            all_hosts_filter.AllHostsFilter(),
+                            ram_filter.RamFilter(),
+                            disk_filter.DiskFilter()])
+
+    @mock.patch.object(ram_filter.RamFilter, 'host_passes')
+    def test_vectorized_filter_skips_host_passes(self, mock_host_passes):
+        self._filter([ram_filter.RamFilter()], True)
+        self.assertFalse(mock_host_passes.called)
+
+    @mock.patch.object(filters, 'numpy', None)
+    def test_numpy_not_available(self):
+        self.flags(scheduler_use_vectorized_filters=True)
+        handler = filters.HostFilterHandler()
+        self.assertFalse(handler.use_vectorized_filters)
+
+
+class HostFilterResultCacheTestCase(test.NoDBTestCase):
+
+    def setUp(self):
+        super(HostFilterResultCacheTestCase, self).setUp()
+        self.flags(scheduler_filter_cache_size=2)
+        self.handler = filters.HostFilterHandler()
+        self.hosts = [fakes.FakeHostState('host%d' % i, 'node%d' % i,
+                                          {'aggregates': [],
+                                           'updated': None})
+                      for i in range(3)]
+
+    def _filter(self, filter_objs, extra_specs=None, az=None):
+        spec_obj = objects.RequestSpec(
+            instance_uuid=uuids.instance,
+            availability_zone=az,
+            flavor=objects.Flavor(extra_specs=extra_specs or {}))
+        result = self.handler.get_filtered_objects(filter_objs, self.hosts,
+                                                   spec_obj)
+        return [host.host for host in result]
+
+    def test_cache_disabled_by_default(self):
+        self.flags(scheduler_filter_cache_size=0)
+        self.assertIsNone(filters.HostFilterHandler().result_cache)
+
+    def test_cached_results(self):
+        self.hosts[1].aggregates = [objects.Aggregate(
+            id=1, metadata={'availability_zone': 'az1'})]
+        filt_cls = availability_zone_filter.AvailabilityZoneFilter()
+        with mock.patch.object(filt_cls, 'host_passes',
+                               wraps=filt_cls.host_passes) as mock_passes:
+            self.assertEqual(['host1'], self._filter([filt_cls], az='az1'))
+            self.assertEqual(['host1'], self._filter([filt_cls], az='az1'))
+            self.assertEqual(3, mock_passes.call_count)
+            self.assertEqual(['host0', 'host2'],
+                             self._filter([filt_cls], az='nova'))
+            self.assertEqual(6, mock_passes.call_count)
+        self.assertEqual({'hits': 3, 'misses': 6},
+                         self.handler.result_cache.stats)
+
+    def test_clear_cached_results(self):
+        filt_cls = availability_zone_filter.AvailabilityZoneFilter()
+        self.assertEqual([], self._filter([filt_cls], az='az1'))
+        self.hosts[1].aggregates = [objects.Aggregate(
+            id=1, metadata={'availability_zone': 'az1'})]
+        self.assertEqual([], self._filter([filt_cls], az='az1'))
+        self.handler.clear_cached_results()
+        self.assertEqual(['host1'], self._filter([filt_cls], az='az1'))
+
+    def test_aggregates_generation(self):
+        filt_cls = availability_zone_filter.AvailabilityZoneFilter()
+        # Results computed from aggregates older than the cache clear, by a
+        # request in flight, are not reused once the hosts are refreshed.
+        self.handler.clear_cached_results()
+        self.assertEqual([], self._filter([filt_cls], az='az1'))
+        for host in self.hosts:
+            host.aggregates_generation = 1
+        self.hosts[1].aggregates = [objects.Aggregate(
+            id=1, metadata={'availability_zone': 'az1'})]
+        self.assertEqual(['host1'], self._filter([filt_cls], az='az1'))
+
+    def test_host_cache_key(self):
+        filt_cls = compute_capabilities_filter.ComputeCapabilitiesFilter()
+        for host in self.hosts:
+            host.free_ram_mb = 1024
+        extra_specs = {'capabilities:free_ram_mb': '>= 1024'}
+        self.assertEqual(['host0', 'host1', 'host2'],
+                         self._filter([filt_cls], extra_specs))
+        # The results of a host are evaluated again once it is updated.
+        self.hosts[2].free_ram_mb = 512
+        self.assertEqual(['host0', 'host1', 'host2'],
+                         self._filter([filt_cls], extra_specs))
+        self.hosts[2].updated = 'fake-time'
+        self.assertEqual(['host0', 'host1'],
+                         self._filter([filt_cls], extra_specs))
+
+    def test_least_recently_used_request_evicted(self):
+        filt_cls = (
+            aggregate_instance_extra_specs.AggregateInstanceExtraSpecsFilter())
+        with mock.patch.object(filt_cls, 'host_passes',
+                               return_value=True) as mock_passes:
+            self._filter([filt_cls], {'a': '1'})
+            self._filter([filt_cls], {'a': '2'})
+            self._filter([filt_cls], {'a': '1'})
+            self._filter([filt_cls], {'a': '3'})
+            self.assertEqual(9, mock_passes.call_count)
+            # {'a': '2'} was evicted, but not {'a': '1'}
+            self._filter([filt_cls], {'a': '1'})
+            self.assertEqual(9, mock_passes.call_count)
+            self._filter([filt_cls], {'a': '2'})
+            self.assertEqual(12, mock_passes.call_count)
+
+    def test_not_cacheable_filter(self):
+        filt_cls = all_hosts_filter.AllHostsFilter()
+        with mock.patch.object(filt_cls, 'host_passes',
+                               return_value=True) as mock_passes:
+            self._filter([filt_cls])
+            self._filter([filt_cls])
+        self.assertEqual(6, mock_passes.call_count)
+        self.assertEqual({}, self.handler.result_cache.stats)
@@ -19,6 +19,7 @@ Tests For HostManager
 import collections
 import datetime
 
+import iso8601
 import mock
 from oslo_serialization import jsonutils
 from oslo_utils import versionutils
@@ -176,6 +177,17 @@ class HostManagerTestCase(test.NoDBTestCase):
         self.assertEqual({'fake-host': set([])},
                          self.host_manager.host_aggregates_map)
 
+    @mock.patch.object(filters.HostFilterHandler, 'clear_cached_results')
+    def test_update_and_delete_aggregate_clear_filter_cache(self,
+                                                            mock_clear):
+        fake_agg = objects.Aggregate(id=1, hosts=['fake-host'])
+        self.host_manager.update_aggregates([fake_agg])
+        self.assertEqual(1, mock_clear.call_count)
+        self.assertEqual(1, self.host_manager.aggregates_generation)
+        self.host_manager.delete_aggregate(fake_agg)
+        self.assertEqual(2, mock_clear.call_count)
+        self.assertEqual(2, self.host_manager.aggregates_generation)
+
     def test_choose_host_filters_not_found(self):
         self.assertRaises(exception.SchedulerHostFilterNotFound,
                           self.host_manager._choose_host_filters,
@@ -502,6 +514,34 @@ class HostManagerTestCase(test.NoDBTestCase):
         self.assertEqual(host_states_map[('host4', 'node4')].free_disk_mb,
                          8388608)
 
+    @mock.patch.object(nova.objects.InstanceList, 'get_by_host')
+    @mock.patch.object(host_manager.HostState, '_update_from_compute_node')
+    @mock.patch.object(objects.ComputeNodeList, 'get_all')
+    @mock.patch.object(objects.ServiceList, 'get_by_binary')
+    def test_get_all_host_states_records_timings(self, svc_get_by_binary,
+                                                 cn_get_all, update_from_cn,
+                                                 mock_get_by_host):
+        svc_get_by_binary.return_value = [objects.Service(host='fake')]
+        cn_get_all.return_value = [
+            objects.ComputeNode(host='fake', hypervisor_hostname='fake')]
+        mock_get_by_host.return_value = objects.InstanceList()
+        self.host_manager.timings = mock.Mock()
+
+        self.host_manager.get_all_host_states('fake-context')
+        self.host_manager.timings.record.assert_has_calls([
+            mock.call('host_states', 'database', mock.ANY, hosts_out=1),
+            mock.call('host_states', 'total', mock.ANY, hosts_out=1)])
+
+    @mock.patch.object(host_manager.HostManager, '_init_instance_info')
+    @mock.patch.object(host_manager.HostManager, '_init_aggregates')
+    def test_init_timings(self, mock_init_agg, mock_init_info):
+        self.assertIsNone(self.host_manager.timings)
+        self.flags(scheduler_timings_log_interval=60)
+        manager = host_manager.HostManager()
+        self.assertIsNotNone(manager.timings)
+        self.assertIs(manager.timings, manager.filter_handler.timings)
+        self.assertIs(manager.timings, manager.weight_handler.timings)
+
     @mock.patch.object(nova.objects.InstanceList, 'get_by_host')
     @mock.patch.object(host_manager.HostState, '_update_from_compute_node')
     @mock.patch.object(objects.ComputeNodeList, 'get_all')
@@ -564,6 +604,109 @@ class HostManagerTestCase(test.NoDBTestCase):
         host_state = self.host_manager.host_state_map[('fake', 'fake')]
         self.assertEqual([], host_state.aggregates)
 
+    @staticmethod
+    def _fake_compute_node(id, host, updated_at, deleted=False):
+        return objects.ComputeNode(id=id, host=host, hypervisor_hostname=host,
+                                   created_at=None, updated_at=updated_at,
+                                   deleted_at=updated_at if deleted else None,
+                                   deleted=deleted)
+
+    @mock.patch.object(nova.objects.InstanceList, 'get_by_host')
+    @mock.patch.object(host_manager.HostState, '_update_from_compute_node')
+    @mock.patch.object(objects.ComputeNodeList, 'get_all_changed_since')
+    @mock.patch.object(objects.ComputeNodeList, 'get_all')
+    @mock.patch.object(objects.ServiceList, 'get_by_binary')
+    def test_get_all_host_states_incremental(self, svc_get_by_binary,
+                                             cn_get_all, cn_get_changed,
+                                             update_from_cn,
+                                             mock_get_by_host):
+        self.host_manager.incremental_host_refresh = True
+        svc_get_by_binary.return_value = [objects.Service(host='fake'),
+                                          objects.Service(host='other')]
+        t1 = datetime.datetime(2016, 1, 1, tzinfo=iso8601.iso8601.Utc())
+        t2 = t1 + datetime.timedelta(seconds=10)
+        fake = self._fake_compute_node(1, 'fake', t1)
+        other = self._fake_compute_node(2, 'other', t1)
+        cn_get_all.return_value = [fake, other]
+        mock_get_by_host.return_value = objects.InstanceList()
+
+        self.host_manager.get_all_host_states('fake-context')
+        self.assertEqual(2, len(self.host_manager.host_state_map))
+        self.assertEqual(2, update_from_cn.call_count)
+        self.assertFalse(cn_get_changed.called)
+
+        update_from_cn.reset_mock()
+        other_updated = self._fake_compute_node(2, 'other', t2)
+        cn_get_changed.return_value = [other_updated]
+
+        self.host_manager.get_all_host_states('fake-context')
+        cn_get_all.assert_called_once_with('fake-context')
+        cn_get_changed.assert_called_once_with('fake-context', t1)
+        update_from_cn.assert_called_once_with(other_updated)
+        self.assertEqual(2, len(self.host_manager.host_state_map))
+        self.assertEqual({'full_refreshes': 1,
+                          'incremental_refreshes': 1,
+                          'nodes_fetched': 3,
+                          'nodes_reused': 1},
+                         dict(self.host_manager.host_refresh_stats))
+
+        cn_get_changed.reset_mock()
+        cn_get_changed.return_value = []
+        self.host_manager.get_all_host_states('fake-context')
+        cn_get_changed.assert_called_once_with('fake-context', t2)
+
+    @mock.patch.object(nova.objects.InstanceList, 'get_by_host')
+    @mock.patch.object(host_manager.HostState, '_update_from_compute_node')
+    @mock.patch.object(objects.ComputeNodeList, 'get_all_changed_since')
+    @mock.patch.object(objects.ComputeNodeList, 'get_all')
+    @mock.patch.object(objects.ServiceList, 'get_by_binary')
+    def test_get_all_host_states_incremental_deleted(self, svc_get_by_binary,
+                                                     cn_get_all,
+                                                     cn_get_changed,
+                                                     update_from_cn,
+                                                     mock_get_by_host):
+        self.host_manager.incremental_host_refresh = True
+        svc_get_by_binary.return_value = [objects.Service(host='fake'),
+                                          objects.Service(host='other')]
+        t1 = datetime.datetime(2016, 1, 1, tzinfo=iso8601.iso8601.Utc())
+        t2 = t1 + datetime.timedelta(seconds=10)
+        cn_get_all.return_value = [self._fake_compute_node(1, 'fake', t1),
+                                   self._fake_compute_node(2, 'other', t1)]
+        mock_get_by_host.return_value = objects.InstanceList()
+        self.host_manager.get_all_host_states('fake-context')
+
+        cn_get_changed.return_value = [
+            self._fake_compute_node(2, 'other', t2, deleted=True)]
+        self.host_manager.get_all_host_states('fake-context')
+        self.assertEqual([('fake', 'fake')],
+                         list(self.host_manager.host_state_map.keys()))
+        self.assertEqual(1, self.host_manager.host_refresh_stats[
+            'nodes_deleted'])
+
+    @mock.patch.object(nova.objects.InstanceList, 'get_by_host')
+    @mock.patch.object(host_manager.HostState, '_update_from_compute_node')
+    @mock.patch.object(objects.ComputeNodeList, 'get_all_changed_since')
+    @mock.patch.object(objects.ComputeNodeList, 'get_all')
+    @mock.patch.object(objects.ServiceList, 'get_by_binary')
+    def test_get_all_host_states_incremental_full_refresh(self,
+                                                          svc_get_by_binary,
+                                                          cn_get_all,
+                                                          cn_get_changed,
+                                                          update_from_cn,
+                                                          mock_get_by_host):
+        self.flags(scheduler_host_full_refresh_interval=0)
+        self.host_manager.incremental_host_refresh = True
+        svc_get_by_binary.return_value = [objects.Service(host='fake')]
+        t1 = datetime.datetime(2016, 1, 1, tzinfo=iso8601.iso8601.Utc())
+        cn_get_all.return_value = [self._fake_compute_node(1, 'fake', t1)]
+        mock_get_by_host.return_value = objects.InstanceList()
+
+        self.host_manager.get_all_host_states('fake-context')
+        self.host_manager.get_all_host_states('fake-context')
+        self.assertEqual(2, cn_get_all.call_count)
+        self.assertFalse(cn_get_changed.called)
+        self.assertEqual(2, update_from_cn.call_count)
+
     @mock.patch('nova.objects.ServiceList.get_by_binary')
     @mock.patch('nova.objects.ComputeNodeList.get_all')
     @mock.patch('nova.objects.InstanceList.get_by_host')
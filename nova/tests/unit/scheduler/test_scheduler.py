@@ -28,6 +28,7 @@ from nova.scheduler import filter_scheduler
 from nova.scheduler import host_manager
 from nova.scheduler import ironic_host_manager
 from nova.scheduler import manager
+from nova.scheduler import timings
 from nova import servicegroup
 from nova import test
 from nova.tests.unit import fake_server_actions
@@ -133,6 +134,21 @@ class SchedulerManagerTestCase(test.NoDBTestCase):
                                              filter_properties='fake_props')
             select_destinations.assert_called_once_with(None, fake_spec)
 
+    @mock.patch('nova.scheduler.manager.LOG')
+    def test_log_timings(self, mock_log):
+        scheduler_timings = timings.SchedulerTimings()
+        scheduler_timings.record('filter', 'RamFilter', 0.002, 10, 5)
+        self.manager.driver.host_manager.timings = scheduler_timings
+        self.manager._log_timings(self.context)
+        self.assertEqual(2, mock_log.info.call_count)
+        self.assertEqual([], scheduler_timings.report())
+
+    @mock.patch('nova.scheduler.manager.LOG')
+    def test_log_timings_disabled(self, mock_log):
+        self.assertIsNone(self.manager.driver.host_manager.timings)
+        self.manager._log_timings(self.context)
+        self.assertFalse(mock_log.info.called)
+
     def test_update_aggregates(self):
         with mock.patch.object(self.manager.driver.host_manager,
                                'update_aggregates'
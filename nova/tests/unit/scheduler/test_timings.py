@@ -0,0 +1,72 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""
+Tests For Scheduler timings.
+"""
+
+from nova.scheduler import timings
+from nova import test
+
+
+class TimingHistogramTestCase(test.NoDBTestCase):
+
+    def test_record(self):
+        histogram = timings.TimingHistogram()
+        histogram.record(0.0005, 10, 8)
+        histogram.record(0.003, 8, 8)
+        histogram.record(7.5, 8, 0)
+        self.assertEqual(3, histogram.calls)
+        self.assertAlmostEqual(7.5035, histogram.total_time)
+        self.assertEqual(7.5, histogram.max_time)
+        self.assertEqual(26, histogram.hosts_in)
+        self.assertEqual(16, histogram.hosts_out)
+        self.assertEqual([1, 0, 1] + [0] * 9 + [1], histogram.buckets)
+
+    def test_percentile(self):
+        histogram = timings.TimingHistogram()
+        self.assertEqual(0.0, histogram.percentile(50))
+        for i in range(98):
+            histogram.record(0.015)
+        histogram.record(0.0004)
+        histogram.record(6.0)
+        self.assertEqual(20.0, histogram.percentile(50))
+        self.assertEqual(20.0, histogram.percentile(99))
+        self.assertEqual(6000.0, histogram.percentile(100))
+        self.assertEqual(1.0, histogram.percentile(1))
+
+    def test_percentile_capped_by_max_time(self):
+        histogram = timings.TimingHistogram()
+        histogram.record(0.012)
+        self.assertEqual(12.0, histogram.percentile(50))
+
+
+class SchedulerTimingsTestCase(test.NoDBTestCase):
+
+    def test_report(self):
+        scheduler_timings = timings.SchedulerTimings()
+        scheduler_timings.record('filter', 'RamFilter', 0.002, 10, 5)
+        scheduler_timings.record('filter', 'RamFilter', 0.004, 10, 6)
+        scheduler_timings.record('host_states', 'database', 0.5,
+                                 hosts_out=10)
+        self.assertEqual(
+            ['host_states database: calls=1 total=0.500s avg=500.00ms '
+             'p50<=500.00ms p99<=500.00ms max=500.00ms hosts_in=0 '
+             'hosts_out=10',
+             'filter RamFilter: calls=2 total=0.006s avg=3.00ms '
+             'p50<=2.00ms p99<=4.00ms max=4.00ms hosts_in=20 hosts_out=11'],
+            scheduler_timings.report())
+
+    def test_reset(self):
+        scheduler_timings = timings.SchedulerTimings()
+        scheduler_timings.record('weigher', 'RAMWeigher', 0.001, 3, 3)
+        scheduler_timings.reset()
+        self.assertEqual([], scheduler_timings.report())
@@ -59,3 +59,17 @@ class ServiceGroupApiTestCase(test.NoDBTestCase):
             driver = self.servicegroup_api._driver
             result = self.servicegroup_api.service_is_up(member)
             self.assertIs(result, False)
+
+    def test_get_up_services(self):
+        members = [{"host": "fake-host%d" % i,
+                    "topic": "compute",
+                    "forced_down": i == 1} for i in range(3)]
+        driver = self.servicegroup_api._driver
+        driver.get_up_services = mock.MagicMock(return_value=[members[2]])
+
+        result = self.servicegroup_api.get_up_services(members)
+
+        self.assertEqual([members[2]], result)
+        # Forced down services are not checked.
+        driver.get_up_services.assert_called_once_with([members[0],
+                                                        members[2]])
@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+
 import mock
 from oslo_db import exception as db_exception
 import oslo_messaging as messaging
@@ -20,6 +22,7 @@ from oslo_utils import timeutils
 
 from nova import objects
 from nova import servicegroup
+from nova.servicegroup import heartbeats
 from nova import test
 
 
@@ -65,6 +68,47 @@ class DBServiceGroupTestCase(test.NoDBTestCase):
         result = self.servicegroup_api.service_is_up(service)
         self.assertFalse(result)
 
+    def test_get_up_services(self):
+        now = timeutils.utcnow()
+        services = [objects.Service(
+            id=i,
+            host='fake-host%d' % i,
+            topic='compute',
+            binary='nova-compute',
+            created_at=now,
+            updated_at=now,
+            last_seen_up=now - datetime.timedelta(seconds=i * self.down_time),
+            forced_down=False) for i in range(3)]
+        self.useFixture(utils_fixture.TimeFixture(now))
+
+        self.assertEqual(services[:2],
+                         self.servicegroup_api.get_up_services(services))
+        self.assertEqual([], self.servicegroup_api.get_up_services([]))
+
+    def test_is_up_pending_report(self):
+        now = timeutils.utcnow()
+        service = objects.Service(
+            id=1,
+            host='fake-host',
+            topic='compute',
+            binary='nova-compute',
+            created_at=now,
+            updated_at=now,
+            last_seen_up=now,
+            forced_down=False,
+        )
+        time_fixture = self.useFixture(utils_fixture.TimeFixture(now))
+        self.addCleanup(heartbeats.reset_state)
+
+        time_fixture.advance_time_seconds(self.down_time)
+        heartbeats.get_heartbeat_buffer().add(1, 2)
+        time_fixture.advance_time_seconds(self.down_time)
+        # The database says down, the report not written yet says up.
+        self.assertTrue(self.servicegroup_api.service_is_up(service))
+
+        time_fixture.advance_time_seconds(1)
+        self.assertFalse(self.servicegroup_api.service_is_up(service))
+
     def test_join(self):
         service = mock.MagicMock(report_interval=1)
 
@@ -84,6 +128,21 @@ class DBServiceGroupTestCase(test.NoDBTestCase):
         self.assertEqual(11, service_ref.report_count)
         self.assertFalse(service.model_disconnected)
 
+    @mock.patch.object(objects.Service, 'save')
+    def test_report_state_batched(self, upd_mock):
+        self.flags(heartbeat_batch_interval=2)
+        service_ref = objects.Service(host='fake-host', topic='compute',
+                                      report_count=10)
+        service = mock.MagicMock(model_disconnected=False,
+                                 service_ref=service_ref)
+        fn = self.servicegroup_api._driver._report_state
+        fn(service)
+        service.conductor_api.service_report_state.assert_called_once_with(
+            mock.ANY, service_ref)
+        self.assertFalse(upd_mock.called)
+        self.assertEqual(11, service_ref.report_count)
+        self.assertFalse(service.model_disconnected)
+
     @mock.patch.object(objects.Service, 'save')
     def _test_report_state_error(self, exc_cls, upd_mock):
         upd_mock.side_effect = exc_cls("service save failed")
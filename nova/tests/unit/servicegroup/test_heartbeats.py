@@ -0,0 +1,83 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+from oslo_utils import fixture as utils_fixture
+from oslo_utils import timeutils
+
+from nova import context
+from nova import db
+from nova.servicegroup import heartbeats
+from nova import test
+
+
+class HeartbeatBufferTestCase(test.NoDBTestCase):
+
+    def setUp(self):
+        super(HeartbeatBufferTestCase, self).setUp()
+        self.context = context.get_admin_context()
+        self.heartbeats = heartbeats.HeartbeatBuffer()
+        self.now = timeutils.utcnow()
+        self.time_fixture = self.useFixture(
+            utils_fixture.TimeFixture(self.now))
+
+    @mock.patch.object(db, 'service_report_states')
+    def test_flush(self, mock_report):
+        self.heartbeats.add(1, 10)
+        self.heartbeats.add(2, 20)
+        self.time_fixture.advance_time_seconds(1)
+        later = timeutils.utcnow()
+        self.heartbeats.add(1, 11)
+        self.assertEqual(2, self.heartbeats.flush(self.context))
+        mock_report.assert_called_once_with(
+            self.context, {1: (11, later), 2: (20, self.now)})
+        self.assertEqual(0, self.heartbeats.flush(self.context))
+        self.assertEqual(1, mock_report.call_count)
+        self.assertEqual(3, self.heartbeats.stats['reports'])
+        self.assertEqual(1, self.heartbeats.stats['writes'])
+        self.assertEqual(2, self.heartbeats.stats['flushed'])
+
+    @mock.patch.object(db, 'service_report_states')
+    def test_flush_error(self, mock_report):
+        mock_report.side_effect = [test.TestingException, None]
+        self.heartbeats.add(1, 10)
+        self.heartbeats.add(2, 20)
+        self.assertRaises(test.TestingException, self.heartbeats.flush,
+                          self.context)
+        self.time_fixture.advance_time_seconds(1)
+        later = timeutils.utcnow()
+        self.heartbeats.add(2, 21)
+        self.assertEqual(2, self.heartbeats.flush(self.context))
+        mock_report.assert_called_with(
+            self.context, {1: (10, self.now), 2: (21, later)})
+
+    def test_last_seen(self):
+        self.assertIsNone(self.heartbeats.last_seen(1))
+        self.heartbeats.add(1, 10)
+        self.assertEqual(self.now, self.heartbeats.last_seen(1))
+
+
+class HeartbeatStateTestCase(test.NoDBTestCase):
+
+    def setUp(self):
+        super(HeartbeatStateTestCase, self).setUp()
+        self.addCleanup(heartbeats.reset_state)
+
+    def test_get_heartbeat_buffer(self):
+        buf = heartbeats.get_heartbeat_buffer()
+        self.assertIs(buf, heartbeats.get_heartbeat_buffer())
+        heartbeats.reset_state()
+        self.assertIsNot(buf, heartbeats.get_heartbeat_buffer())
+
+    def test_get_last_seen_without_buffer(self):
+        self.assertIsNone(heartbeats.get_last_seen(1))
@@ -46,6 +46,18 @@ class MemcachedServiceGroupTestCase(test.NoDBTestCase):
         self.assertTrue(self.servicegroup_api.service_is_up(service_ref))
         self.mc_client.get.assert_called_once_with('compute:fake-host')
 
+    def test_get_up_services(self):
+        service_refs = [{'host': 'fake-host%d' % i, 'topic': 'compute'}
+                        for i in range(3)]
+        self.mc_client.get_multi.return_value = [True, None, True]
+
+        self.assertEqual([service_refs[0], service_refs[2]],
+                         self.servicegroup_api.get_up_services(service_refs))
+        self.mc_client.get_multi.assert_called_once_with(
+            ['compute:fake-host0', 'compute:fake-host1',
+             'compute:fake-host2'])
+        self.assertFalse(self.mc_client.get.called)
+
     def test_join(self):
         service = mock.MagicMock(report_interval=1)
 
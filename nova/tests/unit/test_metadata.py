@@ -1068,6 +1068,38 @@ class MetadataHandlerTestCase(test.TestCase):
         self._metadata_handler_with_remote_address(hnd)
         self.assertEqual(2, get_by_uuid.call_count)
 
+    @mock.patch.object(base, 'get_metadata_by_address')
+    def test_metadata_handler_with_local_cache(self, get_by_address):
+        get_by_address.return_value = self.mdinst
+        self.flags(metadata_cache_expiration=15, metadata_cache_local_size=10)
+        hnd = handler.MetadataRequestHandler()
+        with mock.patch.object(hnd._cache, 'get',
+                               return_value=None) as mock_cache_get:
+            with mock.patch.object(self.mdinst, 'lookup',
+                                   wraps=self.mdinst.lookup) as mock_lookup:
+                self._metadata_handler_with_remote_address(hnd)
+                self._metadata_handler_with_remote_address(hnd)
+        self.assertEqual(1, get_by_address.call_count)
+        self.assertEqual(1, mock_cache_get.call_count)
+        self.assertEqual(1, mock_lookup.call_count)
+        self.assertEqual(2, hnd._local_cache.stats['hits'])
+        self.assertEqual(2, hnd._local_cache.stats['misses'])
+
+    @mock.patch.object(handler.time, 'time')
+    def test_local_metadata_cache(self, mock_time):
+        mock_time.return_value = 100
+        cache = handler.LocalMetadataCache(2, 15)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(1, cache.get('a'))
+        # 'b' is the least recently used entry
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(3, cache.get('c'))
+        mock_time.return_value = 116
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual({'hits': 2, 'misses': 2}, dict(cache.stats))
+
     @mock.patch.object(neutronapi, 'get_client', return_value=mock.Mock())
     def test_metadata_lb_proxy(self, mock_get_client):
 
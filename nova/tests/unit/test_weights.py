@@ -17,8 +17,11 @@ Tests For weights.
 """
 
 import mock
+import testtools
 
 from nova.scheduler import weights as scheduler_weights
+from nova.scheduler.weights import disk
+from nova.scheduler.weights import io_ops
 from nova.scheduler.weights import ram
 from nova import test
 from nova.tests.unit.scheduler import fakes
@@ -72,3 +75,100 @@ class TestWeigher(test.NoDBTestCase):
         self.assertEqual(1, len(weighed_host))
         self.assertEqual('host1', weighed_host[0].obj.host)
         self.assertFalse(mock_weigh.called)
+
+    def test_record_bounds(self):
+        class FakeWeigher(weights.BaseWeigher):
+            def _weigh_object(self, *args, **kwargs):
+                pass
+
+        weigher = FakeWeigher()
+        weigher._record_bounds([])
+        self.assertIsNone(weigher.minval)
+        self.assertIsNone(weigher.maxval)
+        weigher._record_bounds([3, 1, 2])
+        self.assertEqual(1, weigher.minval)
+        self.assertEqual(3, weigher.maxval)
+        weigher._record_bounds([0, 2])
+        self.assertEqual(0, weigher.minval)
+        self.assertEqual(3, weigher.maxval)
+
+
+class TestWeightHandler(test.NoDBTestCase):
+    def _get_all_hosts(self):
+        # NOTE: host2 and host3 have the same resources so that their order
+        # has to be kept stable.
+        host_values = [
+            ('host1', 'node1', {'free_ram_mb': 512, 'free_disk_mb': 2048,
+                                'num_io_ops': 2}),
+            ('host2', 'node2', {'free_ram_mb': 1024, 'free_disk_mb': 512,
+                                'num_io_ops': 0}),
+            ('host3', 'node3', {'free_ram_mb': 1024, 'free_disk_mb': 512,
+                                'num_io_ops': 0}),
+            ('host4', 'node4', {'free_ram_mb': 4096, 'free_disk_mb': 1024,
+                                'num_io_ops': 1}),
+            ('host5', 'node5', {'free_ram_mb': 256, 'free_disk_mb': 4096,
+                                'num_io_ops': 4}),
+        ]
+        return [fakes.FakeHostState(host, node, values)
+                for host, node, values in host_values]
+
+    def _get_weighed_hosts(self, limit=None, vectorized=False):
+        weight_handler = scheduler_weights.HostWeightHandler()
+        weight_handler.use_vectorized_weighers = vectorized
+        weighers = [ram.RAMWeigher(), disk.DiskWeigher(),
+                    io_ops.IoOpsWeigher()]
+        weighed_hosts = weight_handler.get_weighed_objects(
+            weighers, self._get_all_hosts(), {}, limit=limit)
+        return [(h.obj.host, h.weight) for h in weighed_hosts]
+
+    def test_get_weighed_objects_limit(self):
+        all_hosts = self._get_weighed_hosts()
+        self.assertEqual(5, len(all_hosts))
+        for limit in range(1, 7):
+            self.assertEqual(all_hosts[:limit],
+                             self._get_weighed_hosts(limit=limit))
+
+    def test_get_weighed_objects_vectorized_without_numpy(self):
+        with mock.patch.object(weights, 'numpy', None):
+            self.assertEqual(self._get_weighed_hosts(),
+                             self._get_weighed_hosts(vectorized=True))
+
+    @testtools.skipIf(weights.numpy is None, 'numpy is not installed')
+    def test_get_weighed_objects_vectorized(self):
+        all_hosts = self._get_weighed_hosts()
+        for limit in (None, 1, 2, 3, 5, 6):
+            vectorized_hosts = self._get_weighed_hosts(limit=limit,
+                                                       vectorized=True)
+            expected = all_hosts[:limit] if limit else all_hosts
+            self.assertEqual([host for host, weight in expected],
+                             [host for host, weight in vectorized_hosts])
+            for (_, expected_weight), (_, weight) in zip(expected,
+                                                         vectorized_hosts):
+                self.assertAlmostEqual(expected_weight, weight)
+                self.assertIsInstance(weight, float)
+
+    def test_weigh_object(self):
+        weight_handler = scheduler_weights.HostWeightHandler()
+        weighers = [ram.RAMWeigher(), disk.DiskWeigher()]
+        hosts = self._get_all_hosts()
+        weight_handler.get_weighed_objects(weighers, hosts, {})
+        bounds = weight_handler.get_weight_bounds(weighers)
+        self.assertEqual([(0, 4096), (0, 4096)], bounds)
+
+        hosts[3].free_ram_mb = 2048
+        weighed_host = weight_handler.weigh_object(weighers, hosts[3], {},
+                                                   bounds)
+        self.assertEqual('host4', weighed_host.obj.host)
+        self.assertEqual(0.75, weighed_host.weight)
+        # The bounds of the weighers are not narrowed down.
+        self.assertEqual(bounds, weight_handler.get_weight_bounds(weighers))
+
+    def test_get_weighed_objects_records_timings(self):
+        weight_handler = scheduler_weights.HostWeightHandler()
+        weight_handler.timings = mock.Mock()
+        weighers = [ram.RAMWeigher(), disk.DiskWeigher()]
+        weight_handler.get_weighed_objects(weighers, self._get_all_hosts(),
+                                           {})
+        weight_handler.timings.record.assert_has_calls([
+            mock.call('weigher', 'RAMWeigher', mock.ANY, 5, 5),
+            mock.call('weigher', 'DiskWeigher', mock.ANY, 5, 5)])
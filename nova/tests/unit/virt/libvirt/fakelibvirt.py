@@ -144,6 +144,14 @@ VIR_DOMAIN_BLOCK_REBASE_RELATIVE = 8
 VIR_CONNECT_LIST_DOMAINS_ACTIVE = 1
 VIR_CONNECT_LIST_DOMAINS_INACTIVE = 2
 
+# virDomainStatsTypes
+VIR_DOMAIN_STATS_STATE = 1
+VIR_DOMAIN_STATS_CPU_TOTAL = 2
+VIR_DOMAIN_STATS_BALLOON = 4
+VIR_DOMAIN_STATS_VCPU = 8
+VIR_DOMAIN_STATS_INTERFACE = 16
+VIR_DOMAIN_STATS_BLOCK = 32
+
 # secret type
 VIR_SECRET_USAGE_TYPE_NONE = 0
 VIR_SECRET_USAGE_TYPE_VOLUME = 1
@@ -5359,6 +5359,33 @@ class LibvirtConnTestCase(test.NoDBTestCase):
         self.assertEqual(uuids[3], vm4.UUIDString())
         mock_list.assert_called_with(only_guests=True, only_running=False)
 
+    @mock.patch.object(host.Host, "get_domain_inventory")
+    def test_get_inventory(self, mock_inventory):
+        vm1 = FakeVirtDomain(id=3, name="instance00000001")
+        vm2 = FakeVirtDomain(id=-1, name="instance00000002")
+        mock_inventory.return_value = [
+            (vm1, {'state': fakelibvirt.VIR_DOMAIN_RUNNING, 'vcpus': 2,
+                   'memory_kb': 2 * units.Mi}),
+            (vm2, {'state': fakelibvirt.VIR_DOMAIN_SHUTOFF, 'vcpus': 1,
+                   'memory_kb': units.Mi})]
+        drvr = libvirt_driver.LibvirtDriver(fake.FakeVirtAPI(), False)
+        expected = {
+            vm1.UUIDString(): {'uuid': vm1.UUIDString(),
+                               'name': 'instance00000001',
+                               'power_state': power_state.RUNNING,
+                               'vcpus': 2, 'memory_mb': 2048},
+            vm2.UUIDString(): {'uuid': vm2.UUIDString(),
+                               'name': 'instance00000002',
+                               'power_state': power_state.SHUTDOWN,
+                               'vcpus': 0, 'memory_mb': 0}}
+        self.assertEqual(expected, drvr.get_inventory())
+        mock_inventory.assert_called_once_with()
+
+        self.assertEqual({vm1.UUIDString(): power_state.RUNNING,
+                          vm2.UUIDString(): power_state.SHUTDOWN},
+                         drvr.get_power_states())
+        self.assertEqual(2, mock_inventory.call_count)
+
     @mock.patch('nova.virt.libvirt.host.Host.get_online_cpus')
     def test_get_host_vcpus(self, get_online_cpus):
         drvr = libvirt_driver.LibvirtDriver(fake.FakeVirtAPI(), False)
@@ -10919,6 +10946,42 @@ class LibvirtConnTestCase(test.NoDBTestCase):
         drvr = libvirt_driver.LibvirtDriver(fake.FakeVirtAPI(), False)
         self.assertEqual(0, drvr._get_disk_over_committed_size_total())
 
+    @mock.patch.object(host.Host, "list_instance_domains")
+    @mock.patch.object(objects.BlockDeviceMappingList, "bdms_by_instance_uuid")
+    @mock.patch.object(objects.InstanceList, "get_by_filters")
+    def test_disk_over_committed_size_total_incremental(self, mock_get,
+                                                        mock_bdms, mock_list):
+        self.flags(incremental_disk_over_commit=True, group='libvirt')
+        domains = [mock.MagicMock(), mock.MagicMock()]
+        for i, dom in enumerate(domains):
+            dom.ID.return_value = i + 1
+            dom.UUIDString.return_value = 'uuid%d' % i
+            dom.name.return_value = 'instance%d' % i
+            dom.XMLDesc.return_value = '<domain/>'
+        mock_list.return_value = domains
+        mock_get.return_value = []
+        fake_disks = [{'type': 'raw', 'path': '/somepath/disk',
+                       'virt_disk_size': '0',
+                       'backing_file': '/somepath/disk',
+                       'disk_size': '10737418240',
+                       'over_committed_disk_size': '1024'}]
+
+        drvr = libvirt_driver.LibvirtDriver(fake.FakeVirtAPI(), False)
+        with mock.patch.object(drvr, "_get_instance_disk_info",
+                               return_value=fake_disks) as mock_info:
+            self.assertEqual(2048, drvr._get_disk_over_committed_size_total())
+            self.assertEqual(2048, drvr._get_disk_over_committed_size_total())
+            self.assertEqual(2, mock_info.call_count)
+            mock_get.assert_called_once_with(mock.ANY, {'uuid': ['uuid0',
+                                                                 'uuid1']},
+                                             use_slave=True)
+
+            drvr._disk_over_commit.invalidate('uuid1')
+            self.assertEqual(2048, drvr._get_disk_over_committed_size_total())
+            self.assertEqual(3, mock_info.call_count)
+            mock_get.assert_called_with(mock.ANY, {'uuid': ['uuid1']},
+                                        use_slave=True)
+
     def test_cpu_info(self):
         drvr = libvirt_driver.LibvirtDriver(fake.FakeVirtAPI(), True)
 
@@ -12086,6 +12149,20 @@ class LibvirtConnTestCase(test.NoDBTestCase):
         self.assertEqual(0, drvr._get_vcpu_used())
         mock_list.assert_called_with(only_guests=True, only_running=True)
 
+    def test_vcpu_used_inventory(self):
+        inventory = [
+            (FakeVirtDomain(id=1), {'state': fakelibvirt.VIR_DOMAIN_RUNNING,
+                                    'vcpus': 5, 'memory_kb': units.Mi}),
+            (FakeVirtDomain(id=2), {'state': fakelibvirt.VIR_DOMAIN_PAUSED,
+                                    'vcpus': 2, 'memory_kb': units.Mi}),
+            (FakeVirtDomain(id=-1), {'state': fakelibvirt.VIR_DOMAIN_SHUTOFF,
+                                     'vcpus': 4, 'memory_kb': units.Mi})]
+
+        drvr = libvirt_driver.LibvirtDriver(fake.FakeVirtAPI(), False)
+        with mock.patch.object(host.Host, "list_guests") as mock_list:
+            self.assertEqual(7, drvr._get_vcpu_used(inventory))
+            self.assertFalse(mock_list.called)
+
     def test_get_instance_capabilities(self):
         drvr = libvirt_driver.LibvirtDriver(fake.FakeVirtAPI(), True)
 
@@ -13731,13 +13808,13 @@ class HostStateTestCase(test.NoDBTestCase):
         def _get_vcpu_total(self):
             return 1
 
-        def _get_vcpu_used(self):
+        def _get_vcpu_used(self, inventory=None):
             return 0
 
         def _get_cpu_info(self):
             return HostStateTestCase.cpu_info
 
-        def _get_disk_over_committed_size_total(self):
+        def _get_disk_over_committed_size_total(self, instance_domains=None):
             return 0
 
         def _get_local_gb_info(self):
@@ -606,6 +606,60 @@ class HostTestCase(test.NoDBTestCase):
         self.assertEqual(doms[2].name(), vm2.name())
         mock_list.assert_called_with(True)
 
+    @mock.patch.object(fakelibvirt.virConnect, "getAllDomainStats",
+                       create=True)
+    def test_get_domain_inventory_fast(self, mock_stats):
+        vm0 = FakeVirtDomain(id=0, name="Domain-0")  # Xen dom-0
+        vm1 = FakeVirtDomain(id=3, name="instance00000001")
+        vm2 = FakeVirtDomain(name="instance00000002")
+        mock_stats.return_value = [
+            (vm0, {'state.state': fakelibvirt.VIR_DOMAIN_RUNNING}),
+            (vm1, {'state.state': fakelibvirt.VIR_DOMAIN_RUNNING,
+                   'vcpu.current': 2, 'balloon.current': 1048576}),
+            (vm2, {'state.state': fakelibvirt.VIR_DOMAIN_SHUTOFF})]
+
+        self.assertEqual(
+            [(vm1, {'state': fakelibvirt.VIR_DOMAIN_RUNNING, 'vcpus': 2,
+                    'memory_kb': 1048576}),
+             (vm2, {'state': fakelibvirt.VIR_DOMAIN_SHUTOFF, 'vcpus': 0,
+                    'memory_kb': 0})],
+            self.host.get_domain_inventory())
+        self.assertEqual(3, len(self.host.get_domain_inventory(
+            only_guests=False)))
+        mock_stats.assert_called_with(
+            fakelibvirt.VIR_DOMAIN_STATS_STATE |
+            fakelibvirt.VIR_DOMAIN_STATS_VCPU |
+            fakelibvirt.VIR_DOMAIN_STATS_BALLOON, 0)
+
+    @mock.patch.object(libvirt_guest.Guest, "_get_domain_info")
+    @mock.patch.object(host.Host, "list_instance_domains")
+    @mock.patch.object(host.Host, "_get_domain_inventory_fast")
+    def test_get_domain_inventory_fallback(self, mock_fast, mock_list,
+                                           mock_info):
+        vm1 = FakeVirtDomain(id=3, name="instance00000001")
+        vm2 = FakeVirtDomain(id=17, name="instance00000002")
+        mock_fast.side_effect = AttributeError
+        mock_list.return_value = [vm1, vm2]
+        mock_info.side_effect = [
+            [fakelibvirt.VIR_DOMAIN_RUNNING, 2097152, 1048576, 2, 0],
+            fakelibvirt.libvirtError("fake-error"),
+            [fakelibvirt.VIR_DOMAIN_PAUSED, 2097152, 2097152, 4, 0],
+            [fakelibvirt.VIR_DOMAIN_RUNNING, 4194304, 4194304, 1, 0]]
+
+        self.assertEqual(
+            [(vm1, {'state': fakelibvirt.VIR_DOMAIN_RUNNING, 'vcpus': 2,
+                    'memory_kb': 1048576})],
+            self.host.get_domain_inventory())
+        self.assertEqual(
+            [(vm1, {'state': fakelibvirt.VIR_DOMAIN_PAUSED, 'vcpus': 4,
+                    'memory_kb': 2097152}),
+             (vm2, {'state': fakelibvirt.VIR_DOMAIN_RUNNING, 'vcpus': 1,
+                    'memory_kb': 4194304})],
+            self.host.get_domain_inventory())
+        # The bulk stats are not tried again once they failed
+        mock_fast.assert_called_once_with()
+        mock_list.assert_called_with(only_running=False, only_guests=False)
+
     @mock.patch.object(host.Host, "list_instance_domains")
     def test_list_guests(self, mock_list_domains):
         dom0 = mock.Mock(spec=fakelibvirt.virDomain)
@@ -26,6 +26,7 @@ from oslo_log import formatters
 from oslo_log import log as logging
 from oslo_serialization import jsonutils
 from oslo_utils import importutils
+from oslo_utils import units
 from six.moves import cStringIO
 
 from nova import conductor
@@ -551,6 +552,32 @@ class ImageCacheManagerTestCase(test.NoDBTestCase):
             self.assertEqual(image_cache_manager.corrupt_base_files,
                              [fname])
 
+    @mock.patch.object(libvirt_utils, 'update_mtime')
+    def test_age_and_verify_cached_images_checksum_pool(self, mock_mtime):
+        self.flags(checksum_base_images=True, checksum_workers=2,
+                   group='libvirt')
+
+        with self._make_base_file() as fname:
+            image_cache_manager = imagecache.ImageCacheManager()
+            image_cache_manager.used_images = {'123': (1, 0, ['banana-42']),
+                                               '456': (0, 0, [])}
+            base_dir = os.path.dirname(fname)
+            with test.nested(
+                    mock.patch.object(image_cache_manager, '_find_base_file',
+                                      return_value=[(fname, False, False)]),
+                    mock.patch.object(image_cache_manager,
+                                      '_list_backing_images',
+                                      return_value=[]),
+                    mock.patch.object(image_cache_manager, '_verify_checksum',
+                                      side_effect=[False, True])
+            ) as (mock_find, mock_backing, mock_verify):
+                image_cache_manager._age_and_verify_cached_images(
+                    None, [], base_dir)
+
+            self.assertEqual(2, mock_verify.call_count)
+            self.assertEqual([fname], image_cache_manager.corrupt_base_files)
+            self.assertIsNone(image_cache_manager._checksum_pool)
+
     @mock.patch.object(libvirt_utils, 'update_mtime')
     @mock.patch.object(lockutils, 'external_lock')
     def test_verify_base_images(self, mock_lock, mock_mtime):
@@ -1004,3 +1031,66 @@ class VerifyChecksumTestCase(test.NoDBTestCase):
             # Checksum requests for a file with no checksum now have the
             # side effect of creating the checksum
             self.assertTrue(os.path.exists(info_fname))
+
+    def test_verify_checksum_reused(self):
+        self.flags(checksum_interval_seconds=0,
+                   reuse_base_image_checksums=True, group='libvirt')
+        with utils.tempdir() as tmpdir:
+            image_cache_manager, fname = self._check_body(tmpdir, "csum valid")
+            self.assertTrue(image_cache_manager._verify_checksum(self.img,
+                                                                 fname))
+            self.assertTrue(image_cache_manager._verify_checksum(self.img,
+                                                                 fname))
+            self.assertEqual(1, image_cache_manager.stats['images_hashed'])
+            self.assertEqual(1, image_cache_manager.stats['checksums_reused'])
+
+            with open(fname, 'a') as f:
+                f.write('banana')
+            self.assertFalse(image_cache_manager._verify_checksum(self.img,
+                                                                  fname))
+            self.assertEqual(2, image_cache_manager.stats['images_hashed'])
+
+    def test_verify_checksum_not_reused(self):
+        self.flags(checksum_interval_seconds=0, group='libvirt')
+        with utils.tempdir() as tmpdir:
+            image_cache_manager, fname = self._check_body(tmpdir, "csum valid")
+            for i in range(2):
+                self.assertTrue(image_cache_manager._verify_checksum(self.img,
+                                                                     fname))
+            self.assertEqual(2, image_cache_manager.stats['images_hashed'])
+            self.assertEqual({}, image_cache_manager.checksums)
+
+    def test_update_mtime_keeps_checksum(self):
+        self.flags(reuse_base_image_checksums=True, group='libvirt')
+        with utils.tempdir() as tmpdir:
+            image_cache_manager, fname = self._check_body(tmpdir, "csum valid")
+            checksum = image_cache_manager._hash_base_file(fname)
+
+            def update_mtime(path):
+                os.utime(path, (0, 1000))
+
+            with mock.patch.object(libvirt_utils, 'update_mtime',
+                                   side_effect=update_mtime):
+                image_cache_manager._update_mtime(fname)
+
+            self.assertEqual(checksum,
+                             image_cache_manager._hash_base_file(fname))
+            self.assertEqual(1, image_cache_manager.stats['images_hashed'])
+            self.assertEqual(1, image_cache_manager.stats['checksums_reused'])
+
+
+class ReadRateLimiterTestCase(test.NoDBTestCase):
+
+    @mock.patch.object(time, 'sleep')
+    @mock.patch.object(time, 'time', side_effect=[100, 101, 101.5])
+    def test_consume(self, mock_time, mock_sleep):
+        limiter = imagecache._ReadRateLimiter(2 * units.Mi)
+        limiter.consume(units.Mi)
+        limiter.consume(4 * units.Mi)
+        mock_sleep.assert_called_once_with(1.0)
+
+    @mock.patch.object(time, 'sleep')
+    def test_consume_unlimited(self, mock_sleep):
+        limiter = imagecache._ReadRateLimiter(0)
+        limiter.consume(units.Gi)
+        self.assertFalse(mock_sleep.called)
@@ -0,0 +1,117 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+
+import fixtures
+import mock
+
+from nova import test
+from nova.virt.disk import api as disk
+from nova.virt.libvirt import overcommit
+
+
+class FakeDomain(object):
+    def __init__(self, uuid, domain_id=1):
+        self.uuid = uuid
+        self.domain_id = domain_id
+
+    def ID(self):
+        return self.domain_id
+
+    def UUIDString(self):
+        return self.uuid
+
+
+class DiskOverCommitTrackerTestCase(test.NoDBTestCase):
+
+    def setUp(self):
+        super(DiskOverCommitTrackerTestCase, self).setUp()
+        self.tmpdir = self.useFixture(fixtures.TempDir()).path
+        self.path = os.path.join(self.tmpdir, 'disk')
+        with open(self.path, 'wb') as f:
+            f.write(b'\0' * 1000)
+        self.tracker = overcommit.DiskOverCommitTracker()
+        self.dom = FakeDomain('uuid1')
+        self.disk_infos = [
+            {'type': 'qcow2', 'path': self.path, 'virt_disk_size': 10000,
+             'disk_size': 1000, 'over_committed_disk_size': 9000},
+            {'type': 'raw', 'path': '/dev/fake', 'virt_disk_size': 5000,
+             'disk_size': 5000, 'over_committed_disk_size': 0}]
+
+    def _update(self, domains):
+        total, stale = self.tracker.update(domains)
+        return total, [dom.UUIDString() for dom in stale]
+
+    @mock.patch.object(disk, 'get_disk_size')
+    def test_update(self, mock_size):
+        self.assertEqual((0, ['uuid1']), self._update([self.dom]))
+        self.tracker.set_disks(self.dom, self.disk_infos)
+
+        self.assertEqual((9000, []), self._update([self.dom]))
+        with open(self.path, 'ab') as f:
+            f.write(b'\0' * 1000)
+        os.utime(self.path, (0, 0))
+        mock_size.return_value = 20000
+        self.assertEqual((18000, []), self._update([self.dom]))
+        self.assertEqual((18000, []), self._update([self.dom]))
+        mock_size.assert_called_once_with(self.path)
+        self.assertEqual({'passes': 4, 'stale': 1, 'cached': 3,
+                          'inspected': 1}, self.tracker.stats)
+
+    @mock.patch.object(disk, 'get_disk_size')
+    def test_update_size_changed(self, mock_size):
+        # NOTE: A whole second mtime, which is restored exactly below on any
+        # filesystem.
+        os.utime(self.path, (1000, 1000))
+        self.tracker.set_disks(self.dom, self.disk_infos)
+        with open(self.path, 'ab') as f:
+            f.write(b'\0' * 500)
+        os.utime(self.path, (1000, 1000))
+        mock_size.return_value = 20000
+
+        # The virtual size is kept, only the allocated size is read again.
+        self.assertEqual((8500, []), self._update([self.dom]))
+        self.assertFalse(mock_size.called)
+
+    def test_update_restarted(self):
+        self.tracker.set_disks(self.dom, self.disk_infos)
+        self.assertEqual((0, ['uuid1']),
+                         self._update([FakeDomain('uuid1', domain_id=2)]))
+
+    def test_update_removed(self):
+        self.tracker.set_disks(self.dom, self.disk_infos)
+        self.assertEqual((0, []), self._update([]))
+        self.assertEqual((0, ['uuid1']), self._update([self.dom]))
+
+    def test_update_disk_removed(self):
+        self.tracker.set_disks(self.dom, self.disk_infos)
+        os.unlink(self.path)
+        self.assertEqual((0, ['uuid1']), self._update([self.dom]))
+
+    def test_invalidate(self):
+        other = FakeDomain('uuid2')
+        self.tracker.set_disks(self.dom, self.disk_infos)
+        self.tracker.set_disks(other, self.disk_infos)
+        self.tracker.invalidate('uuid1')
+        self.tracker.invalidate('uuid3')
+        self.assertEqual((9000, ['uuid1']), self._update([self.dom, other]))
+
+    def test_set_disks_not_regular(self):
+        self.disk_infos[0]['path'] = self.tmpdir
+        self.tracker.set_disks(self.dom, self.disk_infos)
+        self.assertEqual((0, ['uuid1']), self._update([self.dom]))
+
+    def test_set_disks_missing(self):
+        self.disk_infos[0]['path'] = os.path.join(self.tmpdir, 'missing')
+        self.tracker.set_disks(self.dom, self.disk_infos)
+        self.assertEqual((0, ['uuid1']), self._update([self.dom]))
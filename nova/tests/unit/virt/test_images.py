@@ -13,9 +13,12 @@
 #    under the License.
 
 import os
+import struct
 
+import fixtures
 import mock
 from oslo_concurrency import processutils
+from oslo_utils import units
 
 from nova import exception
 from nova import test
@@ -66,3 +69,118 @@ class QemuTestCase(test.NoDBTestCase):
                                'Image href123 is unacceptable.*',
                                images.fetch_to_raw,
                                None, 'href123', '/no/path', None, None)
+
+
+class ImageInfoCacheTestCase(test.NoDBTestCase):
+    def setUp(self):
+        super(ImageInfoCacheTestCase, self).setUp()
+        self.flags(native_image_info=True)
+        self.addCleanup(images.reset_state)
+        self.tmpdir = self.useFixture(fixtures.TempDir()).path
+        self.path = os.path.join(self.tmpdir, 'disk')
+        self.stats = images.get_image_info_cache().stats
+
+    def _write_qcow2(self, backing_file=b'', version=3, crypt_method=0,
+                     nb_snapshots=0, incompatible_features=0):
+        header = struct.pack('>4sIQIIQIIQQIIQQ', images.QCOW_MAGIC, version,
+                             512 if backing_file else 0, len(backing_file),
+                             16, 20 * units.Gi, crypt_method, 0, 0, 0, 0,
+                             nb_snapshots, 0, incompatible_features)
+        with open(self.path, 'wb') as f:
+            f.write(header.ljust(512, b'\0') + backing_file)
+
+    def _write(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    @mock.patch.object(utils, 'execute')
+    def test_qcow2(self, mock_execute):
+        self._write_qcow2(b'/var/lib/nova/instances/_base/image')
+        info = images.qemu_img_info(self.path)
+        self.assertEqual(self.path, info.image)
+        self.assertEqual('qcow2', info.file_format)
+        self.assertEqual(20 * units.Gi, info.virtual_size)
+        self.assertEqual(64 * units.Ki, info.cluster_size)
+        self.assertEqual('/var/lib/nova/instances/_base/image',
+                         info.backing_file)
+        self.assertEqual(os.stat(self.path).st_blocks * 512, info.disk_size)
+        self.assertFalse(mock_execute.called)
+        self.assertEqual(1, self.stats['parsed'])
+
+    @mock.patch.object(utils, 'execute')
+    def test_qcow2_relative_backing_file(self, mock_execute):
+        self._write_qcow2(b'base', version=2)
+        info = images.qemu_img_info(self.path)
+        self.assertEqual(os.path.join(self.tmpdir, 'base'), info.backing_file)
+        self.assertFalse(mock_execute.called)
+
+    @mock.patch.object(utils, 'execute')
+    def test_raw(self, mock_execute):
+        self._write(b'\0' * 1024)
+        info = images.qemu_img_info(self.path)
+        self.assertEqual('raw', info.file_format)
+        self.assertEqual(1024, info.virtual_size)
+        self.assertIsNone(info.cluster_size)
+        self.assertIsNone(info.backing_file)
+
+        self._write_qcow2()
+        info = images.qemu_img_info(self.path, format='raw')
+        self.assertEqual('raw', info.file_format)
+        self.assertFalse(mock_execute.called)
+
+    @mock.patch.object(utils, 'execute')
+    def test_cached(self, mock_execute):
+        self._write_qcow2()
+        images.qemu_img_info(self.path)
+        images.qemu_img_info(self.path)
+        self.assertEqual(1, self.stats['parsed'])
+        self.assertEqual(1, self.stats['cached'])
+
+        self._write_qcow2(b'base')
+        info = images.qemu_img_info(self.path)
+        self.assertEqual(2, self.stats['parsed'])
+        self.assertEqual(os.path.join(self.tmpdir, 'base'), info.backing_file)
+        self.assertFalse(mock_execute.called)
+
+    def _test_forked(self, format=None):
+        with mock.patch.object(utils, 'execute',
+                               return_value=('image: disk\n', '')) as m:
+            images.qemu_img_info(self.path, format=format)
+        self.assertEqual(1, m.call_count)
+        self.assertEqual(1, self.stats['forked'])
+
+    def test_qcow2_encrypted(self):
+        self._write_qcow2(crypt_method=1)
+        self._test_forked()
+
+    def test_qcow2_snapshots(self):
+        self._write_qcow2(nb_snapshots=1)
+        self._test_forked()
+
+    def test_qcow2_incompatible_features(self):
+        self._write_qcow2(incompatible_features=4)
+        self._test_forked()
+
+    def test_qcow2_truncated(self):
+        # A v3 header cut before the end of its feature bits
+        self._write_qcow2()
+        with open(self.path, 'rb') as f:
+            header = f.read(76)
+        self._write(header)
+        self._test_forked()
+
+    def test_other_format(self):
+        self._write(b'KDMV' + b'\0' * 1020)
+        self._test_forked()
+
+    def test_other_format_requested(self):
+        self._write(b'\0' * 1024)
+        self._test_forked(format='qcow2')
+
+    def test_disabled(self):
+        self.flags(native_image_info=False)
+        self._write_qcow2()
+        with mock.patch.object(utils, 'execute',
+                               return_value=('image: disk\n', '')) as m:
+            images.qemu_img_info(self.path)
+        self.assertEqual(1, m.call_count)
@@ -24,6 +24,7 @@ import sys
 
 from oslo_log import log as logging
 from oslo_utils import importutils
+import six
 
 import nova.conf
 from nova.i18n import _, _LE, _LI
@@ -165,6 +166,31 @@ class ComputeDriver(object):
         # TODO(Vek): Need to pass context in for access to auth_token
         raise NotImplementedError()
 
+    def get_inventory(self):
+        """Return the power state and usage of all the instances on the host.
+
+        This is an optional method that lets the driver enumerate the
+        instances of the hypervisor and their state with a single query.
+
+        :returns: dict of instance uuid to dict with keys 'uuid', 'name',
+                  'power_state', 'vcpus' and 'memory_mb'; the vcpus and
+                  memory are 0 for the instances which are not running
+        """
+        raise NotImplementedError()
+
+    def get_power_states(self):
+        """Return the power state of all the instances on the host.
+
+        This is an optional method that lets the power state sync of the
+        compute manager query the hypervisor once per pass, instead of calling
+        get_info() for each instance. It uses get_inventory() by default.
+
+        :returns: dict of instance uuid to nova.compute.power_state value;
+                  instances missing from it are queried with get_info()
+        """
+        return {uuid: info['power_state']
+                for uuid, info in six.iteritems(self.get_inventory())}
+
     def get_num_instances(self):
         """Return the total number of virtual machines.
 
@@ -327,6 +327,10 @@ class FakeDriver(driver.ComputeDriver):
                                      num_cpu=2,
                                      cpu_time_ns=0)
 
+    def get_power_states(self):
+        return {uuid: instance.state
+                for uuid, instance in self.instances.items()}
+
     def get_diagnostics(self, instance):
         return {'cpu0_time': 17300000000,
                 'memory': 524288,
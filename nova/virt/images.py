@@ -19,7 +19,10 @@
 Handling of VM disk images.
 """
 
+import collections
 import os
+import stat
+import struct
 
 from oslo_concurrency import processutils
 from oslo_log import log as logging
@@ -37,9 +40,169 @@ LOG = logging.getLogger(__name__)
 CONF = nova.conf.CONF
 IMAGE_API = image.API()
 
+QCOW_MAGIC = b'QFI\xfb'
+# NOTE: qemu-img also runs for the images starting with the magic of the
+# other formats it detects, see _probe_other_format().
+_OTHER_FORMAT_MAGICS = (
+    (0, b'QFI\xfd'),                    # qed
+    (0, b'KDMV'),                        # vmdk
+    (0, b'COWD'),                        # vmdk
+    (0, b'# Disk DescriptorFile'),       # vmdk
+    (0, b'conectix'),                    # vpc
+    (0, b'vhdxfile'),                    # vhdx
+    (0, b'LUKS\xba\xbe'),                # luks
+    (0, b'Bochs Virtual HD Image'),      # bochs
+    (0, b'WithoutFreeSpace'),            # parallels
+    (0, b'WithouFreSpacExt'),            # parallels
+    (0, b'#!/bin/sh\n#V2.0 Format\n'),   # cloop
+    (64, b'\x7f\x10\xda\xbe'),            # vdi
+)
+_PROBE_SIZE = 4096
+# The header fields up to the snapshots offset, see docs/interop/qcow2.txt
+# in qemu.
+_QCOW2_HEADER = struct.Struct('>4sIQIIQIIQQIIQ')
+_QCOW2_INCOMPAT_DIRTY = 1
+_QCOW2_MAX_BACKING_FILE = 1023
+
+
+def _probe_other_format(path, header):
+    if path.endswith('.dmg') or b'createType=' in header:
+        return True
+    return any(header[offset:offset + len(magic)] == magic
+               for offset, magic in _OTHER_FORMAT_MAGICS)
+
+
+def _read_qcow2_header(path, f, header):
+    if len(header) < _QCOW2_HEADER.size:
+        return None
+    (magic, version, backing_file_offset, backing_file_size, cluster_bits,
+     size, crypt_method, _l1_size, _l1_table_offset,
+     _refcount_table_offset, _refcount_table_clusters, nb_snapshots,
+     _snapshots_offset) = _QCOW2_HEADER.unpack_from(header)
+    if version not in (2, 3) or crypt_method or nb_snapshots:
+        return None
+    if version == 3:
+        # NOTE: A v3 header is followed by the feature bits, a file too
+        # short to have them is left to qemu-img.
+        if len(header) < _QCOW2_HEADER.size + 8:
+            return None
+        incompatible_features = struct.unpack_from('>Q', header,
+                                                   _QCOW2_HEADER.size)[0]
+        if incompatible_features & ~_QCOW2_INCOMPAT_DIRTY:
+            return None
+
+    backing_file = None
+    if backing_file_offset:
+        if backing_file_size > _QCOW2_MAX_BACKING_FILE:
+            return None
+        f.seek(backing_file_offset)
+        name = f.read(backing_file_size)
+        if len(name) != backing_file_size:
+            return None
+        backing_file = name.decode('utf-8')
+        # NOTE: Like qemu-img, give the path of a relative backing file from
+        # the directory of the image.
+        if not os.path.isabs(backing_file):
+            backing_file = os.path.join(os.path.dirname(path), backing_file)
+    return {'file_format': 'qcow2',
+            'virtual_size': size,
+            'cluster_size': 1 << cluster_bits,
+            'backing_file': backing_file}
+
+
+def _read_image_header(path, format, size):
+    with open(path, 'rb') as f:
+        header = f.read(_PROBE_SIZE)
+        if format in (None, 'qcow2') and header[:4] == QCOW_MAGIC:
+            return _read_qcow2_header(path, f, header)
+    if format == 'raw' or (format is None and
+                           not _probe_other_format(path, header)):
+        return {'file_format': 'raw',
+                'virtual_size': size,
+                'cluster_size': None,
+                'backing_file': None}
+    return None
+
+
+class ImageInfoCache(object):
+    """Reads the information of the qcow2 and raw images from their headers.
+
+    The information is kept for each path and format, and used while the
+    inode, change and modification times and size of the file are unchanged.
+    The disk size is taken from the file on every call.
+
+    stats counts the calls answered from the headers ('parsed') and from the
+    cache ('cached'), which did not run qemu-img, and the calls which did
+    ('forked').
+    """
+
+    max_entries = 4096
+
+    def __init__(self):
+        self._entries = collections.OrderedDict()
+        self.stats = collections.Counter()
+
+    def get_info(self, path, format=None):
+        """Return the QemuImgInfo of an image, or None if qemu-img is needed.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+
+        key = (path, format)
+        signature = (st.st_ino, st.st_ctime, st.st_mtime, st.st_size)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            self.stats['cached'] += 1
+            details = entry[1]
+        else:
+            try:
+                details = _read_image_header(path, format, st.st_size)
+            except (IOError, OSError, UnicodeDecodeError):
+                details = None
+            if details is None:
+                self._entries.pop(key, None)
+                return None
+            self.stats['parsed'] += 1
+            self._entries.pop(key, None)
+            self._entries[key] = (signature, details)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        info = imageutils.QemuImgInfo()
+        info.image = path
+        info.file_format = details['file_format']
+        info.virtual_size = details['virtual_size']
+        info.cluster_size = details['cluster_size']
+        info.backing_file = details['backing_file']
+        info.disk_size = st.st_blocks * 512
+        return info
+
+
+_IMAGE_INFO_CACHE = None
+
+
+def get_image_info_cache():
+    global _IMAGE_INFO_CACHE
+    if _IMAGE_INFO_CACHE is None:
+        _IMAGE_INFO_CACHE = ImageInfoCache()
+    return _IMAGE_INFO_CACHE
+
+
+def reset_state():
+    global _IMAGE_INFO_CACHE
+    _IMAGE_INFO_CACHE = None
+
 
 def qemu_img_info(path, format=None):
-    """Return an object containing the parsed output from qemu-img info."""
+    """Return an object containing the parsed output from qemu-img info.
+
+    With [DEFAULT]native_image_info set, the qcow2 and raw images are read
+    by ImageInfoCache instead of running qemu-img.
+    """
     # TODO(mikal): this code should not be referring to a libvirt specific
     # flag.
     # NOTE(sirp): The config option import must go here to avoid an import
@@ -49,6 +212,13 @@ def qemu_img_info(path, format=None):
     if not os.path.exists(path) and CONF.libvirt.images_type != 'rbd':
         raise exception.DiskNotFound(location=path)
 
+    if CONF.native_image_info:
+        cache = get_image_info_cache()
+        info = cache.get_info(path, format)
+        if info is not None:
+            return info
+        cache.stats['forked'] += 1
+
     try:
         cmd = ('env', 'LC_ALL=C', 'LANG=C', 'qemu-img', 'info', path)
         if format is not None:
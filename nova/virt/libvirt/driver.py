@@ -102,6 +102,7 @@ from nova.virt.libvirt import host
 from nova.virt.libvirt import imagebackend
 from nova.virt.libvirt import imagecache
 from nova.virt.libvirt import instancejobtracker
+from nova.virt.libvirt import overcommit
 from nova.virt.libvirt.storage import dmcrypt
 from nova.virt.libvirt.storage import lvm
 from nova.virt.libvirt.storage import rbd_utils
@@ -307,7 +308,18 @@ libvirt_opts = [
                default=1,
                help='In a realtime host context vCPUs for guest will run in '
                'that scheduling priority. Priority depends on the host '
-               'kernel (usually 1-99)')
+               'kernel (usually 1-99)'),
+    cfg.BoolOpt('incremental_disk_over_commit',
+                default=False,
+                help='Keep the disk information of the running domains '
+                     'between the periodic updates of the host resources, '
+                     'instead of reading the XML of every domain, the '
+                     'instances and block device mappings of every domain '
+                     'from the database and the header of every qcow2 disk '
+                     'on each update. Only the qcow2 disks whose file was '
+                     'modified are inspected again, the domains are read '
+                     'again when they are restarted or when nova spawns, '
+                     'resizes, snapshots, rescues or deletes them.'),
     ]
 
 CONF = nova.conf.CONF
@@ -533,6 +545,7 @@ class LibvirtDriver(driver.ComputeDriver):
 
         self._disk_cachemode = None
         self.image_cache_manager = imagecache.ImageCacheManager()
+        self._disk_over_commit = overcommit.DiskOverCommitTracker()
         self.image_backend = imagebackend.Backend(CONF.use_cow_images)
 
         self.disk_cachemodes = {}
@@ -866,6 +879,22 @@ class LibvirtDriver(driver.ComputeDriver):
 
         return uuids
 
+    def get_inventory(self):
+        inventory = {}
+        for dom, info in self._host.get_domain_inventory():
+            # NOTE: Inactive domains have an ID of -1, they use no vcpus or
+            # memory on the host.
+            active = dom.ID() != -1
+            instance_uuid = dom.UUIDString()
+            inventory[instance_uuid] = {
+                'uuid': instance_uuid,
+                'name': dom.name(),
+                'power_state': libvirt_guest.LIBVIRT_POWER_STATE[
+                    info['state']],
+                'vcpus': info['vcpus'] if active else 0,
+                'memory_mb': info['memory_kb'] // units.Ki if active else 0}
+        return inventory
+
     def plug_vifs(self, instance, network_info):
         """Plug VIFs into networks."""
         for vif in network_info:
@@ -1039,6 +1068,7 @@ class LibvirtDriver(driver.ComputeDriver):
 
     def cleanup(self, context, instance, network_info, block_device_info=None,
                 destroy_disks=True, migrate_data=None, destroy_vifs=True):
+        self._disk_over_commit.invalidate(instance.uuid)
         if destroy_vifs:
             self._unplug_vifs(instance, network_info, True)
 
@@ -1578,6 +1608,7 @@ class LibvirtDriver(driver.ComputeDriver):
 
         This command only works with qemu 0.14+
         """
+        self._disk_over_commit.invalidate(instance.uuid)
         try:
             guest = self._host.get_guest(instance)
 
@@ -2684,6 +2715,7 @@ class LibvirtDriver(driver.ComputeDriver):
         data recovery.
 
         """
+        self._disk_over_commit.invalidate(instance.uuid)
         instance_dir = libvirt_utils.get_instance_path(instance)
         unrescue_xml = self._get_existing_domain_xml(instance, network_info)
         unrescue_xml_path = os.path.join(instance_dir, 'unrescue.xml')
@@ -2718,6 +2750,7 @@ class LibvirtDriver(driver.ComputeDriver):
     def unrescue(self, instance, network_info):
         """Reboot the VM which is being rescued back into primary images.
         """
+        self._disk_over_commit.invalidate(instance.uuid)
         instance_dir = libvirt_utils.get_instance_path(instance)
         unrescue_xml_path = os.path.join(instance_dir, 'unrescue.xml')
         xml_path = os.path.join(instance_dir, 'libvirt.xml')
@@ -2763,6 +2796,7 @@ class LibvirtDriver(driver.ComputeDriver):
         self._create_domain_and_network(context, xml, instance, network_info,
                                         disk_info,
                                         block_device_info=block_device_info)
+        self._disk_over_commit.invalidate(instance.uuid)
         LOG.debug("Instance is running", instance=instance)
 
         def _wait_for_boot():
@@ -4989,9 +5023,12 @@ class LibvirtDriver(driver.ComputeDriver):
 
         return info
 
-    def _get_vcpu_used(self):
+    def _get_vcpu_used(self, inventory=None):
         """Get vcpu usage number of physical computer.
 
+        :param inventory: The domains and their stats as returned by
+                          Host.get_domain_inventory(), the running guests
+                          are queried one by one if not given
         :returns: The total number of vcpu(s) that are currently being used.
 
         """
@@ -5000,6 +5037,12 @@ class LibvirtDriver(driver.ComputeDriver):
         if CONF.libvirt.virt_type == 'lxc':
             return total + 1
 
+        if inventory is not None:
+            for dom, info in inventory:
+                if dom.ID() != -1:
+                    total += info['vcpus']
+            return total
+
         for guest in self._host.list_guests():
             try:
                 vcpus = guest.get_vcpus_info()
@@ -5341,6 +5384,11 @@ class LibvirtDriver(driver.ComputeDriver):
         disk_info_dict = self._get_local_gb_info()
         data = {}
 
+        # NOTE: List the domains and their stats once, the vcpu usage and the
+        # disk over-commit below are both taken from this inventory.
+        inventory = self._host.get_domain_inventory()
+        running_domains = [dom for dom, info in inventory if dom.ID() != -1]
+
         # NOTE(dprince): calling capabilities before getVersion works around
         # an initialization issue with some versions of Libvirt (1.0.5.5).
         # See: https://bugzilla.redhat.com/show_bug.cgi?id=1000116
@@ -5350,7 +5398,7 @@ class LibvirtDriver(driver.ComputeDriver):
         data["vcpus"] = self._get_vcpu_total()
         data["memory_mb"] = self._host.get_memory_mb_total()
         data["local_gb"] = disk_info_dict['total']
-        data["vcpus_used"] = self._get_vcpu_used()
+        data["vcpus_used"] = self._get_vcpu_used(inventory)
         data["memory_mb_used"] = self._host.get_memory_mb_used()
         data["local_gb_used"] = disk_info_dict['used']
         data["hypervisor_type"] = self._host.get_driver_type()
@@ -5368,7 +5416,8 @@ class LibvirtDriver(driver.ComputeDriver):
         data["cpu_info"] = jsonutils.dumps(self._get_cpu_info())
 
         disk_free_gb = disk_info_dict['free']
-        disk_over_committed = self._get_disk_over_committed_size_total()
+        disk_over_committed = self._get_disk_over_committed_size_total(
+            running_domains)
         available_least = disk_free_gb * units.Gi - disk_over_committed
         data['disk_available_least'] = available_least / units.Gi
 
@@ -6870,6 +6919,7 @@ class LibvirtDriver(driver.ComputeDriver):
         :param network_info: instance network information
         :param block_migration: if true, post operation of block_migration.
         """
+        self._disk_over_commit.invalidate(instance.uuid)
         # Define migrated instance, otherwise, suspend/destroy does not work.
         # In case of block migration, destination does not have
         # libvirt.xml
@@ -6983,11 +7033,21 @@ class LibvirtDriver(driver.ComputeDriver):
                 self._get_instance_disk_info(instance.name, xml,
                                              block_device_info))
 
-    def _get_disk_over_committed_size_total(self):
-        """Return total over committed disk size for all instances."""
+    def _get_disk_over_committed_size_total(self, instance_domains=None):
+        """Return total over committed disk size for all instances.
+
+        :param instance_domains: The running domains, listed if not given
+        """
         # Disk size that all instance uses : virtual_size - disk_size
         disk_over_committed_size = 0
-        instance_domains = self._host.list_instance_domains()
+        if instance_domains is None:
+            instance_domains = self._host.list_instance_domains()
+        incremental = CONF.libvirt.incremental_disk_over_commit
+        if incremental:
+            # NOTE: Only the domains which are new, restarted or invalidated
+            # since the last pass are read from their XML below.
+            disk_over_committed_size, instance_domains = (
+                self._disk_over_commit.update(instance_domains))
         if not instance_domains:
             return disk_over_committed_size
 
@@ -7030,6 +7090,8 @@ class LibvirtDriver(driver.ComputeDriver):
                 for info in disk_infos:
                     disk_over_committed_size += int(
                         info['over_committed_disk_size'])
+                if incremental:
+                    self._disk_over_commit.set_disks(dom, disk_infos)
             except libvirt.libvirtError as ex:
                 error_code = ex.get_error_code()
                 LOG.warning(_LW(
@@ -7126,6 +7188,7 @@ class LibvirtDriver(driver.ComputeDriver):
                                    timeout=0, retry_interval=0):
         LOG.debug("Starting migrate_disk_and_power_off",
                    instance=instance)
+        self._disk_over_commit.invalidate(instance.uuid)
 
         ephemerals = driver.block_device_info_get_ephemerals(block_device_info)
 
@@ -7322,6 +7385,7 @@ class LibvirtDriver(driver.ComputeDriver):
                          network_info, image_meta, resize_instance,
                          block_device_info=None, power_on=True):
         LOG.debug("Starting finish_migration", instance=instance)
+        self._disk_over_commit.invalidate(instance.uuid)
 
         block_disk_info = blockinfo.get_disk_info(CONF.libvirt.virt_type,
                                                   instance,
@@ -7425,6 +7489,7 @@ class LibvirtDriver(driver.ComputeDriver):
                                 block_device_info=None, power_on=True):
         LOG.debug("Starting finish_revert_migration",
                   instance=instance)
+        self._disk_over_commit.invalidate(instance.uuid)
 
         inst_base = libvirt_utils.get_instance_path(instance)
         inst_base_resize = inst_base + "_resize"
@@ -206,6 +206,7 @@ class Host(object):
         self._conn_event_handler = conn_event_handler
         self._lifecycle_event_handler = lifecycle_event_handler
         self._skip_list_all_domains = False
+        self._skip_domain_stats = False
         self._caps = None
         self._hostname = None
 
@@ -745,6 +746,65 @@ class Host(object):
 
         return doms
 
+    def _get_domain_inventory_fast(self):
+        # The modern (>= 1.2.8) fast way - 1 single API call for the domains
+        # and their stats
+        stats = (libvirt.VIR_DOMAIN_STATS_STATE |
+                 libvirt.VIR_DOMAIN_STATS_VCPU |
+                 libvirt.VIR_DOMAIN_STATS_BALLOON)
+        inventory = []
+        for dom, record in self.get_connection().getAllDomainStats(stats, 0):
+            inventory.append((dom, {
+                'state': record.get('state.state', libvirt.VIR_DOMAIN_NOSTATE),
+                'vcpus': record.get('vcpu.current', 0),
+                'memory_kb': record.get('balloon.current', 0)}))
+        return inventory
+
+    def _get_domain_inventory_slow(self):
+        # The legacy way - 1 info() call per domain
+        inventory = []
+        for dom in self.list_instance_domains(only_running=False,
+                                              only_guests=False):
+            try:
+                info = libvirt_guest.Guest(dom)._get_domain_info(self)
+            except libvirt.libvirtError as e:
+                LOG.warning(_LW("couldn't obtain the information of domain:"
+                                " %(uuid)s, exception: %(ex)s"),
+                            {"uuid": dom.UUIDString(), "ex": e})
+                continue
+            inventory.append((dom, {'state': info[0],
+                                    'vcpus': info[3],
+                                    'memory_kb': info[2]}))
+        return inventory
+
+    def get_domain_inventory(self, only_guests=True):
+        """Get the libvirt.Domain objects with their state, vcpus and memory
+
+        :param only_guests: True to filter out any host domain (eg Dom-0)
+
+        Query libvirt for all the domains, running or not, and their stats
+        with a single getAllDomainStats() call, or with the domain list and
+        an info() call per domain on libvirt versions which do not have it.
+
+        :returns: list of (libvirt.Domain, dict) tuples, the dicts having the
+                  libvirt 'state' of the domain, its number of 'vcpus' and
+                  its current memory in KiB as 'memory_kb'
+        """
+        if not self._skip_domain_stats:
+            try:
+                inventory = self._get_domain_inventory_fast()
+            except (libvirt.libvirtError, AttributeError) as ex:
+                LOG.info(_LI("Unable to use bulk domain stats APIs, "
+                             "falling back to slow code path: %(ex)s"),
+                         {'ex': ex})
+                self._skip_domain_stats = True
+
+        if self._skip_domain_stats:
+            inventory = self._get_domain_inventory_slow()
+
+        return [(dom, info) for dom, info in inventory
+                if not only_guests or dom.ID() != 0]
+
     def get_online_cpus(self):
         """Get the set of CPUs that are online on the host
 
@@ -20,17 +20,21 @@ http://wiki.openstack.org/nova-image-cache-management.
 
 """
 
+import collections
 import hashlib
 import os
 import re
 import time
 
+import eventlet
+from eventlet import tpool
 from oslo_concurrency import lockutils
 from oslo_concurrency import processutils
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_serialization import jsonutils
 from oslo_utils import fileutils
+from oslo_utils import units
 
 import nova.conf
 from nova.i18n import _LE
@@ -66,12 +70,32 @@ imagecache_opts = [
     cfg.IntOpt('checksum_interval_seconds',
                default=3600,
                help='How frequently to checksum base images'),
+    cfg.IntOpt('checksum_workers',
+               default=1,
+               min=1,
+               help='Number of base images whose checksum is verified at the '
+                    'same time. The images are read and hashed in native '
+                    'threads.'),
+    cfg.IntOpt('checksum_max_bandwidth',
+               default=0,
+               min=0,
+               help='Maximum rate, in MiB per second, at which the base '
+                    'images are read to compute their checksum, shared by '
+                    'all the checksum workers. 0 means unlimited.'),
+    cfg.BoolOpt('reuse_base_image_checksums',
+                default=False,
+                help='Keep the checksum computed for a base image along with '
+                     'its inode, mtime and size, and reuse it instead of '
+                     'reading the image again while none of them changed.'),
     ]
 
 CONF = nova.conf.CONF
 CONF.register_opts(imagecache_opts, 'libvirt')
 CONF.import_opt('instances_path', 'nova.compute.manager')
 
+# The size of the reads made to hash a base image.
+_HASH_CHUNK_SIZE = units.Mi
+
 
 def get_cache_fname(images, key):
     """Return a filename based on the SHA1 hash of a given image ID.
@@ -212,15 +236,60 @@ def write_stored_info(target, field=None, value=None):
     write_file(info_file, field, value)
 
 
-def _hash_file(filename):
-    """Generate a hash for the contents of a file."""
+class _ReadRateLimiter(object):
+    """Limits the rate at which the base images are read to be hashed.
+
+    :param max_bytes_per_second: The maximum rate, or 0 for no limit
+    """
+
+    def __init__(self, max_bytes_per_second):
+        self.max_bytes_per_second = max_bytes_per_second
+        self.start = None
+        self.bytes = 0
+
+    def consume(self, nbytes):
+        """Account for bytes read, sleeping if they were read too fast."""
+        if not self.max_bytes_per_second:
+            return
+        if self.start is None:
+            self.start = time.time()
+        self.bytes += nbytes
+        delay = (float(self.bytes) / self.max_bytes_per_second -
+                 (time.time() - self.start))
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _hash_chunk(f, checksum):
+    chunk = f.read(_HASH_CHUNK_SIZE)
+    checksum.update(chunk)
+    return len(chunk)
+
+
+def _hash_file(filename, limiter=None):
+    """Generate a hash for the contents of a file.
+
+    The file is read and hashed in native threads, one chunk at a time, so
+    that the greenthreads keep running meanwhile.
+
+    :param limiter: The _ReadRateLimiter throttling the reads, if any
+    """
     checksum = hashlib.sha1()
-    with open(filename) as f:
-        for chunk in iter(lambda: f.read(32768), b''):
-            checksum.update(chunk)
+    with open(filename, 'rb') as f:
+        while True:
+            nbytes = tpool.execute(_hash_chunk, f, checksum)
+            if not nbytes:
+                break
+            if limiter is not None:
+                limiter.consume(nbytes)
     return checksum.hexdigest()
 
 
+def _get_file_signature(filename):
+    st = os.stat(filename)
+    return st.st_ino, st.st_mtime, st.st_size
+
+
 def read_stored_checksum(target, timestamped=True):
     """Read the checksum.
 
@@ -238,6 +307,13 @@ class ImageCacheManager(imagecache.ImageCacheManager):
     def __init__(self):
         super(ImageCacheManager, self).__init__()
         self.lock_path = os.path.join(CONF.instances_path, 'locks')
+        # NOTE: The checksums computed for the base images, by path, along
+        # with the signature of the file when it was hashed. They are kept
+        # across passes, see [libvirt]reuse_base_image_checksums.
+        self.checksums = {}
+        self.stats = collections.Counter()
+        self._checksum_pool = None
+        self._checksum_threads = []
         self._reset_state()
 
     def _reset_state(self):
@@ -256,6 +332,9 @@ class ImageCacheManager(imagecache.ImageCacheManager):
         self.removable_base_files = []
         self.unexplained_images = []
 
+        self._read_limiter = _ReadRateLimiter(
+            CONF.libvirt.checksum_max_bandwidth * units.Mi)
+
     def _store_image(self, base_dir, ent, original=False):
         """Store a base image for later examination."""
         entpath = os.path.join(base_dir, ent)
@@ -399,7 +478,7 @@ class ImageCacheManager(imagecache.ImageCacheManager):
                     write_stored_info(base_file, field='sha1',
                                       value=stored_checksum)
 
-                current_checksum = _hash_file(base_file)
+                current_checksum = self._hash_base_file(base_file)
 
                 if current_checksum != stored_checksum:
                     LOG.error(_LE('image %(id)s at (%(base_file)s): image '
@@ -425,12 +504,51 @@ class ImageCacheManager(imagecache.ImageCacheManager):
                                  'checksum'),
                              {'id': img_id,
                               'base_file': base_file})
-                    write_stored_checksum(base_file)
+                    write_stored_info(base_file, field='sha1',
+                                      value=self._hash_base_file(base_file))
 
                 return None
 
         return inner_verify_checksum()
 
+    def _hash_base_file(self, base_file):
+        """Hash a base image, or reuse its checksum if it did not change."""
+        signature = _get_file_signature(base_file)
+        if CONF.libvirt.reuse_base_image_checksums:
+            cached = self.checksums.get(base_file)
+            if cached is not None and cached[0] == signature:
+                LOG.debug('%s did not change since it was last hashed, '
+                          'reusing its checksum', base_file)
+                self.stats['checksums_reused'] += 1
+                return cached[1]
+
+        checksum = _hash_file(base_file, limiter=self._read_limiter)
+        self.stats['images_hashed'] += 1
+        self.stats['bytes_hashed'] += signature[2]
+        if CONF.libvirt.reuse_base_image_checksums:
+            self.checksums[base_file] = (signature, checksum)
+        return checksum
+
+    def _update_mtime(self, base_file):
+        """Touch a base image in use, keeping its checksum."""
+        cached = self.checksums.get(base_file)
+        if cached is not None and cached[0] != _get_file_signature(base_file):
+            cached = None
+        libvirt_utils.update_mtime(base_file)
+        # NOTE: The new mtime is ours, the checksum is kept unless the image
+        # was hashed again meanwhile.
+        if cached is not None and self.checksums.get(base_file) is cached:
+            self.checksums[base_file] = (_get_file_signature(base_file),
+                                         cached[1])
+
+    def _check_base_image(self, img_id, base_file):
+        """Verify the checksum of a base image, recording it if corrupt."""
+        # _verify_checksum returns True if the checksum is ok, and None if
+        # there is no checksum file
+        checksum_result = self._verify_checksum(img_id, base_file)
+        if checksum_result is not None and not checksum_result:
+            self.corrupt_base_files.append(base_file)
+
     @staticmethod
     def _get_age_of_file(base_file):
         if not os.path.exists(base_file):
@@ -512,7 +630,6 @@ class ImageCacheManager(imagecache.ImageCacheManager):
     def _handle_base_image(self, img_id, base_file):
         """Handle the checks for a single base image."""
 
-        image_bad = False
         image_in_use = False
 
         LOG.info(_LI('image %(id)s at (%(base_file)s): checking'),
@@ -524,11 +641,11 @@ class ImageCacheManager(imagecache.ImageCacheManager):
 
         if (base_file and os.path.exists(base_file)
                 and os.path.isfile(base_file)):
-            # _verify_checksum returns True if the checksum is ok, and None if
-            # there is no checksum file
-            checksum_result = self._verify_checksum(img_id, base_file)
-            if checksum_result is not None:
-                image_bad = not checksum_result
+            if self._checksum_pool is not None:
+                self._checksum_threads.append(self._checksum_pool.spawn(
+                    self._check_base_image, img_id, base_file))
+            else:
+                self._check_base_image(img_id, base_file)
 
             # Give other threads a chance to run
             time.sleep(0)
@@ -557,9 +674,6 @@ class ImageCacheManager(imagecache.ImageCacheManager):
                                  'base_file': base_file,
                                  'instance_list': ' '.join(instances)})
 
-        if image_bad:
-            self.corrupt_base_files.append(base_file)
-
         if base_file:
             if not image_in_use:
                 LOG.debug('image %(id)s at (%(base_file)s): image is not in '
@@ -574,7 +688,7 @@ class ImageCacheManager(imagecache.ImageCacheManager):
                           {'id': img_id,
                            'base_file': base_file})
                 if os.path.exists(base_file):
-                    libvirt_utils.update_mtime(base_file)
+                    self._update_mtime(base_file)
 
     def _age_and_verify_swap_images(self, context, base_dir):
         LOG.debug('Verify swap images')
@@ -593,18 +707,34 @@ class ImageCacheManager(imagecache.ImageCacheManager):
 
     def _age_and_verify_cached_images(self, context, all_instances, base_dir):
         LOG.debug('Verify base images')
-        # Determine what images are on disk because they're in use
-        for img in self.used_images:
-            fingerprint = hashlib.sha1(img).hexdigest()
-            LOG.debug('Image id %(id)s yields fingerprint %(fingerprint)s',
-                      {'id': img,
-                       'fingerprint': fingerprint})
-            for result in self._find_base_file(base_dir, fingerprint):
-                base_file, image_small, image_resized = result
-                self._handle_base_image(img, base_file)
-
-                if not image_small and not image_resized:
-                    self.originals.append(base_file)
+        # NOTE: The checksums of the base images are verified by a pool of
+        # greenthreads, which all have to be done before the corrupt and
+        # removable images are listed.
+        if CONF.libvirt.checksum_base_images:
+            self._checksum_pool = eventlet.GreenPool(
+                CONF.libvirt.checksum_workers)
+        try:
+            # Determine what images are on disk because they're in use
+            for img in self.used_images:
+                fingerprint = hashlib.sha1(img).hexdigest()
+                LOG.debug('Image id %(id)s yields fingerprint '
+                          '%(fingerprint)s',
+                          {'id': img,
+                           'fingerprint': fingerprint})
+                for result in self._find_base_file(base_dir, fingerprint):
+                    base_file, image_small, image_resized = result
+                    self._handle_base_image(img, base_file)
+
+                    if not image_small and not image_resized:
+                        self.originals.append(base_file)
+
+            for thread in self._checksum_threads:
+                thread.wait()
+        finally:
+            if self._checksum_pool is not None:
+                self._checksum_pool.waitall()
+                self._checksum_pool = None
+            self._checksum_threads = []
 
         # Elements remaining in unexplained_images might be in use
         inuse_backing_images = self._list_backing_images()
@@ -660,10 +790,14 @@ class ImageCacheManager(imagecache.ImageCacheManager):
         base_dir = self._get_base()
         if not base_dir:
             return
+        start = time.time()
+        stats = self.stats.copy()
         # reset the local statistics
         self._reset_state()
         # read the cached images
         self._list_base_images(base_dir)
+        for base_file in set(self.checksums) - set(self.unexplained_images):
+            del self.checksums[base_file]
         # read running instances data
         running = self._list_running_instances(context, all_instances)
         self.used_images = running['used_images']
@@ -673,3 +807,15 @@ class ImageCacheManager(imagecache.ImageCacheManager):
         # perform the aging and image verification
         self._age_and_verify_cached_images(context, all_instances, base_dir)
         self._age_and_verify_swap_images(context, base_dir)
+
+        elapsed = time.time() - start
+        self.stats['passes'] += 1
+        self.stats['seconds'] += elapsed
+        stats = self.stats - stats
+        LOG.debug('Image cache manager pass took %(seconds).2f seconds, '
+                  'hashed %(images)d images (%(bytes)d bytes) and reused '
+                  '%(reused)d checksums',
+                  {'seconds': elapsed,
+                   'images': stats['images_hashed'],
+                   'bytes': stats['bytes_hashed'],
+                   'reused': stats['checksums_reused']})
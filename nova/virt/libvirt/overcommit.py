@@ -0,0 +1,129 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Incremental accounting of the disk over-commit of the libvirt domains."""
+
+import collections
+import os
+import stat
+
+from oslo_log import log as logging
+
+from nova.virt.disk import api as disk
+
+LOG = logging.getLogger(__name__)
+
+
+class _Disk(object):
+    def __init__(self, path, st, virt_size):
+        self.path = path
+        self.signature = (st.st_ino, st.st_mtime)
+        self.virt_size = virt_size
+
+
+class _Domain(object):
+    def __init__(self, domain_id, fixed, disks):
+        self.domain_id = domain_id
+        self.fixed = fixed
+        self.disks = disks
+
+
+class DiskOverCommitTracker(object):
+    """Keeps the over-committed disk size of the running domains.
+
+    The disk information of a domain is taken from its XML once, and then
+    kept until the domain is restarted, which changes its ID, until it is
+    invalidated, or until it stops running. On each pass the qcow2 disks of
+    the kept domains are only stat'ed: the over-commit of a disk is its
+    virtual size less its file size, and the virtual size is read again from
+    the image only when the inode or the mtime of the file changed.
+
+    The domains, disks and passes seen are counted in stats.
+    """
+
+    def __init__(self):
+        self._domains = {}
+        self.stats = collections.Counter()
+
+    def invalidate(self, instance_uuid):
+        """Forget the disks of an instance, they are read again next pass."""
+        self._domains.pop(instance_uuid, None)
+
+    def update(self, domains):
+        """Update the over-commit of the kept domains.
+
+        :param domains: The running libvirt domains
+        :returns: A tuple of the over-committed size of the kept domains and
+                  of the list of the domains whose disks have to be read from
+                  their XML and given to set_disks().
+        """
+        self.stats['passes'] += 1
+        running = set()
+        stale = []
+        total = 0
+        for dom in domains:
+            instance_uuid = dom.UUIDString()
+            running.add(instance_uuid)
+            entry = self._domains.get(instance_uuid)
+            if entry is None or entry.domain_id != dom.ID():
+                stale.append(dom)
+                continue
+            try:
+                total += self._get_over_commit(entry)
+            except OSError as e:
+                LOG.debug('Unable to stat the disks of domain %(uuid)s, '
+                          'reading them again: %(error)s',
+                          {'uuid': instance_uuid, 'error': e})
+                stale.append(dom)
+                continue
+            self.stats['cached'] += 1
+
+        for instance_uuid in set(self._domains) - running:
+            del self._domains[instance_uuid]
+        for dom in stale:
+            self._domains.pop(dom.UUIDString(), None)
+        self.stats['stale'] += len(stale)
+        return total, stale
+
+    def set_disks(self, dom, disk_infos):
+        """Keep the disks of a domain, as returned by _get_instance_disk_info.
+
+        The domain is not kept when one of its qcow2 disks is not a regular
+        file, its disks are then read from its XML on each pass.
+        """
+        fixed = 0
+        disks = []
+        for info in disk_infos:
+            if info['type'] != 'qcow2':
+                fixed += int(info['over_committed_disk_size'])
+                continue
+            try:
+                st = os.stat(info['path'])
+            except OSError:
+                return
+            if not stat.S_ISREG(st.st_mode):
+                return
+            disks.append(_Disk(info['path'], st,
+                               int(info['virt_disk_size'])))
+        self._domains[dom.UUIDString()] = _Domain(dom.ID(), fixed, disks)
+
+    def _get_over_commit(self, entry):
+        total = entry.fixed
+        for disk_entry in entry.disks:
+            st = os.stat(disk_entry.path)
+            signature = (st.st_ino, st.st_mtime)
+            if signature != disk_entry.signature:
+                disk_entry.virt_size = int(disk.get_disk_size(disk_entry.path))
+                disk_entry.signature = signature
+                self.stats['inspected'] += 1
+            total += disk_entry.virt_size - st.st_size
+        return total
@@ -26,6 +26,7 @@ from oslo_log import log as logging
 import webob
 
 import nova.conf
+from nova.console import pump
 from nova.consoleauth import rpcapi as consoleauth_rpcapi
 from nova import context
 from nova.i18n import _LI
@@ -43,24 +44,13 @@ class XCPVNCProxy(object):
 
     def one_way_proxy(self, source, dest):
         """Proxy tcp connection from source to dest."""
-        while True:
-            try:
-                d = source.recv(32384)
-            except Exception:
-                d = None
-
+        if pump.pump(source, dest):
             # If recv fails, send a write shutdown the other direction
-            if d is None or len(d) == 0:
-                dest.shutdown(socket.SHUT_WR)
-                break
+            dest.shutdown(socket.SHUT_WR)
+        else:
             # If send fails, terminate proxy in both directions
-            try:
-                # sendall raises an exception on write error, unlike send
-                dest.sendall(d)
-            except Exception:
-                source.close()
-                dest.close()
-                break
+            source.close()
+            dest.close()
 
     def handshake(self, req, connect_info, sockets):
         """Execute hypervisor-specific vnc auth handshaking (if needed)."""
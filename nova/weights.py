@@ -18,11 +18,18 @@ Pluggable Weighing support
 """
 
 import abc
+import heapq
+import time
 
 import six
 
 from nova import loadables
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 def normalize(weight_list, minval=None, maxval=None):
     """Normalize the values in a list between 0 and 1.0.
@@ -89,6 +96,17 @@ class BaseWeigher(object):
     def _weigh_object(self, obj, weight_properties):
         """Weigh an specific object."""
 
+    def _record_bounds(self, weights):
+        """Widen minval and maxval so that they bound the weights."""
+        if not weights:
+            return
+        min_weight = min(weights)
+        max_weight = max(weights)
+        if self.minval is None or min_weight < self.minval:
+            self.minval = min_weight
+        if self.maxval is None or max_weight > self.maxval:
+            self.maxval = max_weight
+
     def weigh_objects(self, weighed_obj_list, weight_properties):
         """Weigh multiple objects.
 
@@ -121,15 +139,42 @@ class BaseWeigher(object):
 class BaseWeightHandler(loadables.BaseLoader):
     object_class = WeighedObject
 
-    def get_weighed_objects(self, weighers, obj_list, weighing_properties):
-        """Return a sorted (descending), normalized list of WeighedObjects."""
+    # Set to True in a subclass to add up and sort the weights with numpy
+    # arrays, if numpy is available
+    use_vectorized_weighers = False
+
+    # Set to a nova.scheduler.timings.SchedulerTimings to record the time
+    # spent in each weigher
+    timings = None
+
+    def _weigh_objects(self, weigher, weighed_objs, weighing_properties):
+        start_time = time.time()
+        weights = weigher.weigh_objects(weighed_objs, weighing_properties)
+        if self.timings is not None:
+            self.timings.record('weigher', weigher.__class__.__name__,
+                                time.time() - start_time,
+                                len(weighed_objs), len(weighed_objs))
+        return weights
+
+    def get_weighed_objects(self, weighers, obj_list, weighing_properties,
+                            limit=None):
+        """Return a sorted (descending), normalized list of WeighedObjects.
+
+        If limit is set, only the limit objects with the highest weights are
+        returned.
+        """
         weighed_objs = [self.object_class(obj, 0.0) for obj in obj_list]
 
         if len(weighed_objs) <= 1:
             return weighed_objs
 
+        if self.use_vectorized_weighers and numpy is not None:
+            return self._get_weighed_objects_vectorized(
+                weighers, weighed_objs, weighing_properties, limit)
+
         for weigher in weighers:
-            weights = weigher.weigh_objects(weighed_objs, weighing_properties)
+            weights = self._weigh_objects(weigher, weighed_objs,
+                                          weighing_properties)
 
             # Normalize the weights
             weights = normalize(weights,
@@ -140,4 +185,65 @@ class BaseWeightHandler(loadables.BaseLoader):
                 obj = weighed_objs[i]
                 obj.weight += weigher.weight_multiplier() * weight
 
+        if limit is not None and limit < len(weighed_objs):
+            return heapq.nlargest(limit, weighed_objs, key=lambda x: x.weight)
         return sorted(weighed_objs, key=lambda x: x.weight, reverse=True)
+
+    def get_weight_bounds(self, weighers):
+        """Return the normalization bounds recorded by each weigher.
+
+        The bounds are a list of (minval, maxval) tuples in the same order as
+        the weighers, to be handed over to weigh_object().
+        """
+        return [(weigher.minval, weigher.maxval) for weigher in weighers]
+
+    def weigh_object(self, weighers, obj, weighing_properties, bounds):
+        """Return a WeighedObject for a single object.
+
+        The weights are normalized with the given bounds, as returned by
+        get_weight_bounds(), instead of the weights of the other objects, so
+        that the resulting weight can be compared with the weights of a
+        previous get_weighed_objects() call.
+        """
+        weighed_obj = self.object_class(obj, 0.0)
+        for weigher, (minval, maxval) in zip(weighers, bounds):
+            weights = self._weigh_objects(weigher, [weighed_obj],
+                                          weighing_properties)
+            for weight in normalize(weights, minval=minval, maxval=maxval):
+                weighed_obj.weight += weigher.weight_multiplier() * weight
+        return weighed_obj
+
+    def _get_weighed_objects_vectorized(self, weighers, weighed_objs,
+                                        weighing_properties, limit):
+        total_weights = numpy.zeros(len(weighed_objs))
+        for weigher in weighers:
+            weights = numpy.array(
+                self._weigh_objects(weigher, weighed_objs,
+                                    weighing_properties),
+                dtype=float)
+
+            # Normalize the weights
+            minval = weigher.minval
+            if minval is None:
+                minval = weights.min()
+            maxval = weigher.maxval
+            if maxval is None:
+                maxval = weights.max()
+            if minval == maxval:
+                continue
+            weights -= minval
+            weights /= float(maxval) - float(minval)
+
+            total_weights += weigher.weight_multiplier() * weights
+
+        # NOTE: A stable sort keeps the objects with equal weights in the
+        # same order as sorted() does.
+        order = numpy.argsort(-total_weights, kind='mergesort')
+        if limit is not None:
+            order = order[:limit]
+        result = []
+        for i in order:
+            obj = weighed_objs[i]
+            obj.weight = float(total_weights[i])
+            result.append(obj)
+        return result
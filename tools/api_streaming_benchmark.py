@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark of the streamed serialization of large API listings.
+
+Serializes a synthetic GET /servers/detail body with the given number of
+servers, once in a single string and once streamed, as controlled by the
+[wsgi]streaming_response_threshold option. Each mode runs in its own process,
+as the peak resident set size of a process only grows. For each mode it
+reports the time to the first byte, the total time, the peak resident set
+size and how much serializing raised it above the size reached once the
+listing was built, e.g.:
+
+    tools/api_streaming_benchmark.py --servers 10000
+"""
+
+from __future__ import print_function
+
+import argparse
+import resource
+import subprocess
+import sys
+import time
+
+from oslo_utils import uuidutils
+
+from nova.api.openstack import wsgi
+import nova.conf
+
+CONF = nova.conf.CONF
+
+MODES = (('buffered', 0), ('streamed', 1))
+
+
+def _fake_server(index):
+    server_id = uuidutils.generate_uuid()
+    link = 'http://localhost/v2.1/fake/servers/%s' % server_id
+    return {
+        'id': server_id,
+        'name': 'server-%d' % index,
+        'status': 'ACTIVE',
+        'tenant_id': 'tenant-%d' % (index % 100),
+        'user_id': 'user-%d' % (index % 1000),
+        'metadata': {'key%d' % i: 'value%d' % i for i in range(5)},
+        'hostId': 'a' * 56,
+        'image': {'id': uuidutils.generate_uuid(), 'links': []},
+        'flavor': {'id': '1', 'links': []},
+        'created': '2016-01-01T00:00:00Z',
+        'updated': '2016-01-01T00:00:00Z',
+        'addresses': {'private': [{'addr': '10.0.%d.%d' % (index // 256 % 256,
+                                                          index % 256),
+                                   'version': 4}]},
+        'accessIPv4': '',
+        'accessIPv6': '',
+        'links': [{'rel': 'self', 'href': link},
+                  {'rel': 'bookmark', 'href': link}],
+        'OS-EXT-STS:vm_state': 'active',
+        'OS-EXT-STS:power_state': 1,
+        'OS-EXT-STS:task_state': None,
+        'os-extended-volumes:volumes_attached': [],
+        'security_groups': [{'name': 'default'}],
+    }
+
+
+def _max_rss():
+    # NOTE: In KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run(body, threshold):
+    CONF.set_override('streaming_response_threshold', threshold,
+                      group='wsgi')
+    robj = wsgi.ResponseObject(body)
+    rss_before = _max_rss()
+    start = time.time()
+    response = robj.serialize(None, 'application/json')
+    chunks = iter(response.app_iter)
+    length = len(next(chunks))
+    first_byte = time.time() - start
+    for chunk in chunks:
+        length += len(chunk)
+    total = time.time() - start
+    peak = _max_rss()
+    return first_byte, total, peak, peak - rss_before, length
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--servers', type=int, default=10000,
+                        help='Number of servers in the listing')
+    parser.add_argument('--mode', choices=[mode for mode, _t in MODES],
+                        help='Run only this mode, in this process')
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        body = {'servers': [_fake_server(i) for i in range(args.servers)]}
+        first_byte, total, peak, growth, length = _run(
+            body, dict(MODES)[args.mode])
+        print('%-10s %12.1f %12.1f %14d %14d %12d' % (
+            args.mode, first_byte * 1000, total * 1000, peak, growth,
+            length))
+        return
+
+    print('%-10s %12s %12s %14s %14s %12s' % (
+        'mode', 'ttfb (ms)', 'total (ms)', 'max rss (KiB)', 'growth (KiB)',
+        'bytes'))
+    sys.stdout.flush()
+    for mode, _threshold in MODES:
+        subprocess.check_call([sys.executable, __file__,
+                               '--servers', str(args.servers),
+                               '--mode', mode])
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
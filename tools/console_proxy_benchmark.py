@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark of the copy of the console traffic by the console proxies.
+
+Starts a fake VNC server on localhost which sends the RFB version and then
+the given amount of framebuffer data to each client, and proxies it to the
+given number of concurrent clients with nova.console.pump, as
+nova-xvpvncproxy does. The traffic is copied by the proxy with the 32KiB
+recv() loop nova-xvpvncproxy used before nova.console.pump, as a baseline,
+with reads of [DEFAULT]console_proxy_buffer_size bytes, and with splice(2)
+where it is available. For each mode it reports the throughput and the CPU
+time used by the proxy, e.g.:
+
+    tools/console_proxy_benchmark.py --clients 100 --megabytes 10
+"""
+
+from __future__ import print_function
+
+import argparse
+import resource
+import sys
+import time
+
+import eventlet
+eventlet.monkey_patch()
+
+import nova.conf  # noqa
+from nova.console import pump  # noqa
+from nova import utils  # noqa
+
+CONF = nova.conf.CONF
+
+RFB_VERSION = b'RFB 003.008\n'
+
+
+def _fake_vnc_server(listener, size):
+    chunk = b'\0' * 65536
+    while True:
+        client, _addr = listener.accept()
+        utils.spawn_n(_send_framebuffer, client, chunk, size)
+
+
+def _send_framebuffer(client, chunk, size):
+    client.sendall(RFB_VERSION)
+    while size > 0:
+        client.sendall(chunk[:size])
+        size -= len(chunk)
+    client.close()
+
+
+def _recv_loop(source, dest):
+    # The copy made by nova-xvpvncproxy before nova.console.pump, a new
+    # string per read.
+    while True:
+        try:
+            d = source.recv(32384)
+        except Exception:
+            return True
+        if not d:
+            return True
+        try:
+            dest.sendall(d)
+        except Exception:
+            return False
+
+
+def _proxy(server_address, listener, copy):
+    client, _addr = listener.accept()
+    server = eventlet.connect(server_address)
+    copy(server, client)
+    client.close()
+    server.close()
+
+
+def _vnc_client(proxy_address):
+    sock = eventlet.connect(proxy_address)
+    received = 0
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            break
+        received += len(data)
+    sock.close()
+    return received
+
+
+def _cpu_time():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _run(clients, size, copy, splice):
+    CONF.set_override('console_proxy_splice', splice)
+    server = eventlet.listen(('127.0.0.1', 0))
+    proxy = eventlet.listen(('127.0.0.1', 0), backlog=clients)
+    utils.spawn_n(_fake_vnc_server, server, size)
+    proxies = [utils.spawn(_proxy, server.getsockname(), proxy, copy)
+               for i in range(clients)]
+
+    start, cpu_start = time.time(), _cpu_time()
+    vnc_clients = [utils.spawn(_vnc_client, proxy.getsockname())
+                   for i in range(clients)]
+    received = sum(thread.wait() for thread in vnc_clients)
+    for thread in proxies:
+        thread.wait()
+    elapsed, cpu = time.time() - start, _cpu_time() - cpu_start
+    server.close()
+    proxy.close()
+    return received, elapsed, cpu
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--clients', type=int, default=10,
+                        help='Number of concurrent console clients')
+    parser.add_argument('--megabytes', type=int, default=10,
+                        help='Framebuffer data sent to each client, in MiB')
+    parser.add_argument('--buffer-size', type=int,
+                        default=CONF.console_proxy_buffer_size,
+                        help='Size of the reads made by the proxy')
+    args = parser.parse_args(argv)
+
+    CONF.set_override('console_proxy_buffer_size', args.buffer_size)
+    modes = [('recv', _recv_loop, False), ('copy', pump.pump, False)]
+    CONF.set_override('console_proxy_splice', True)
+    if pump.can_splice():
+        modes.append(('splice', pump.pump, True))
+    print('%-8s %14s %12s %12s' % ('mode', 'MiB/s', 'time (s)', 'cpu (s)'))
+    for mode, copy, splice in modes:
+        received, elapsed, cpu = _run(args.clients,
+                                      args.megabytes * 1024 * 1024, copy,
+                                      splice)
+        print('%-8s %14.1f %12.2f %12.2f' % (
+            mode, received / 1024.0 / 1024.0 / elapsed, elapsed, cpu))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark of the disk over-commit accounting of the libvirt driver.
+
+Starts the given number of domains with a qcow2 disk each on a fake libvirt
+connection, and runs LibvirtDriver._get_disk_over_committed_size_total a few
+times, as the periodic update of the host resources does, with and without
+[libvirt]incremental_disk_over_commit. Between the passes a part of the disk
+files is written to. The database calls are faked, and the qcow2 headers are
+read natively rather than by qemu-img. For each pass it reports the time
+taken, the domain XMLs read, the database calls made, the disk images
+inspected and the over-committed size found, e.g.:
+
+    tools/libvirt_disk_overcommit_benchmark.py --domains 500 --passes 5
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import uuid
+
+import mock
+
+import nova.conf
+from nova import objects
+from nova.tests.unit.virt.libvirt import fakelibvirt
+from nova.virt import fake
+from nova.virt import images
+from nova.virt.libvirt import driver as libvirt_driver
+from nova.virt.libvirt import guest as libvirt_guest
+from nova.virt.libvirt import host
+
+CONF = nova.conf.CONF
+
+libvirt_driver.libvirt = fakelibvirt
+host.libvirt = fakelibvirt
+libvirt_guest.libvirt = fakelibvirt
+
+DOMAIN_XML = """<domain type='kvm'>
+  <name>instance-%(index)08x</name>
+  <uuid>%(uuid)s</uuid>
+  <memory>2097152</memory>
+  <vcpu>1</vcpu>
+  <os><type>hvm</type></os>
+  <devices>
+    <disk type='file' device='disk'>
+      <driver name='qemu' type='qcow2'/>
+      <source file='%(path)s'/>
+      <target dev='vda' bus='virtio'/>
+    </disk>
+  </devices>
+</domain>"""
+
+VIRTUAL_SIZE = 20 * 1024 * 1024 * 1024
+CLUSTER_SIZE = 65536
+
+
+def _write_qcow2(path):
+    header = struct.pack('>4sIQIIQIIQQIIQ', images.QCOW_MAGIC, 2, 0, 0, 16,
+                         VIRTUAL_SIZE, 0, 1, 3 * CLUSTER_SIZE,
+                         CLUSTER_SIZE, 1, 0, 0)
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.truncate(4 * CLUSTER_SIZE)
+
+
+def _grow(path):
+    with open(path, 'ab') as f:
+        f.write(b'\0' * CLUSTER_SIZE)
+
+
+class _Counter(object):
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.func(*args, **kwargs)
+
+
+def _run(domains, paths, incremental, passes, written):
+    CONF.set_override('incremental_disk_over_commit', incremental,
+                      group='libvirt')
+    drvr = libvirt_driver.LibvirtDriver(fake.FakeVirtAPI(), False)
+    xml_desc = _Counter(fakelibvirt.Domain.XMLDesc)
+    img_info = _Counter(images.qemu_img_info)
+
+    with mock.patch.object(drvr._host, 'list_instance_domains',
+                           return_value=domains), \
+            mock.patch.object(objects.InstanceList, 'get_by_filters',
+                              return_value=[]) as mock_instances, \
+            mock.patch.object(objects.BlockDeviceMappingList,
+                              'bdms_by_instance_uuid',
+                              return_value={}) as mock_bdms, \
+            mock.patch.object(fakelibvirt.Domain, 'XMLDesc',
+                              lambda dom, flags: xml_desc(dom, flags)), \
+            mock.patch.object(images, 'qemu_img_info', img_info):
+        results = []
+        for i in range(passes):
+            if i:
+                for path in random.sample(paths, written):
+                    _grow(path)
+            counts = (xml_desc.calls, mock_instances.call_count +
+                      mock_bdms.call_count, img_info.calls)
+            start = time.time()
+            total = drvr._get_disk_over_committed_size_total()
+            elapsed = time.time() - start
+            results.append((elapsed, xml_desc.calls - counts[0],
+                            mock_instances.call_count +
+                            mock_bdms.call_count - counts[1],
+                            img_info.calls - counts[2], total))
+    return results
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--domains', type=int, default=500,
+                        help='Number of running domains')
+    parser.add_argument('--passes', type=int, default=5,
+                        help='Number of over-commit passes per mode')
+    parser.add_argument('--written', type=int, default=10,
+                        help='Percentage of the disks written to between '
+                             'two passes')
+    args = parser.parse_args(argv)
+
+    objects.register_all()
+    CONF.set_override('native_image_info', True)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        conn = fakelibvirt.Connection('qemu:///system')
+        domains = []
+        paths = []
+        for index in range(args.domains):
+            path = os.path.join(tmpdir, 'disk%d' % index)
+            _write_qcow2(path)
+            paths.append(path)
+            domains.append(conn.createXML(DOMAIN_XML % {
+                'index': index, 'uuid': uuid.uuid4(), 'path': path}, 0))
+        written = args.domains * args.written // 100
+
+        print('%-12s %5s %10s %10s %10s %12s %16s' % (
+            'mode', 'pass', 'time (ms)', 'xml reads', 'db calls',
+            'inspections', 'over-commit (GiB)'))
+        for mode, incremental in (('full', False), ('incremental', True)):
+            results = _run(domains, paths, incremental, args.passes,
+                           written)
+            for i, (elapsed, xmls, queries, inspections,
+                    total) in enumerate(results):
+                print('%-12s %5d %10.1f %10d %10d %12d %16.3f' % (
+                    mode, i, elapsed * 1000, xmls, queries, inspections,
+                    total / 1024.0 / 1024.0 / 1024.0))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark of the loading of network info caches.
+
+Loads the given number of serialized instance info caches, once hydrating the
+whole NetworkInfo model as was done before and once with LazyNetworkInfo, and
+lists the fixed IPs of each instance. For each mode it reports the CPU time and
+the peak of the memory allocated, e.g.:
+
+    tools/network_info_benchmark.py --instances 1000 --vifs 4
+"""
+
+from __future__ import print_function
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+from nova.network import model
+
+
+def _fake_vif(index, vif):
+    address = '10.%d.%d.%d' % (vif, index // 256 % 256, index % 256)
+    subnet = model.Subnet(
+        cidr='10.%d.0.0/16' % vif,
+        gateway=model.IP(address='10.%d.0.1' % vif, type='gateway'),
+        dns=[model.IP(address='8.8.8.8', type='dns')],
+        ips=[model.FixedIP(address=address)],
+        routes=[])
+    network = model.Network(id='net-%d' % vif, bridge='br%d' % vif,
+                            label='net-%d' % vif, subnets=[subnet])
+    return model.VIF(id='vif-%d-%d' % (index, vif),
+                     address='fa:16:3e:00:%02x:%02x' % (vif, index % 256),
+                     network=network, type='ovs', devname='tap%d' % vif,
+                     ovs_interfaceid='vif-%d-%d' % (index, vif))
+
+
+def _run(caches, loader):
+    tracemalloc.start()
+    start = time.process_time()
+    count = 0
+    for cache in caches:
+        count += len(loader(cache).fixed_ips())
+    elapsed = time.process_time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, count
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--instances', type=int, default=1000,
+                        help='Number of instance info caches')
+    parser.add_argument('--vifs', type=int, default=2,
+                        help='Number of VIFs per instance')
+    args = parser.parse_args(argv)
+
+    caches = [model.NetworkInfo([_fake_vif(i, vif)
+                                 for vif in range(args.vifs)]).json()
+              for i in range(args.instances)]
+    print('%-10s %12s %14s %12s' % ('mode', 'cpu (ms)', 'peak (KiB)',
+                                    'fixed ips'))
+    for mode, loader in (('eager', model.NetworkInfo.hydrate),
+                         ('lazy', model.LazyNetworkInfo)):
+        elapsed, peak, count = _run(caches, loader)
+        print('%-10s %12.1f %14d %12d' % (mode, elapsed * 1000,
+                                          peak // 1024, count))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
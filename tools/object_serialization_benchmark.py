@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark of the RPC serialization of instances and request specs.
+
+Serializes an Instance with its flavor, info cache, NUMA topology and PCI
+requests, a list of such instances and a RequestSpec with the
+NovaObjectSerializer, in the full and in the compact form. For each form it
+reports the size of the JSON message, the size of the msgpack message when
+msgpack is installed, and the CPU time taken to serialize and deserialize
+the object, including the JSON encoding, e.g.:
+
+    tools/object_serialization_benchmark.py --instances 50 --repeat 200
+"""
+
+from __future__ import print_function
+
+import argparse
+import sys
+import time
+import uuid
+
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
+
+from nova import context
+from nova.network import model as network_model
+from nova import objects
+from nova.objects import base as objects_base
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _fake_flavor():
+    return objects.Flavor(id=1, flavorid='1', name='m1.small', memory_mb=2048,
+                          vcpus=1, root_gb=20, ephemeral_gb=0, swap=0,
+                          rxtx_factor=1.0, vcpu_weight=None, disabled=False,
+                          is_public=True, extra_specs={'hw:cpu_policy':
+                                                       'dedicated'})
+
+
+def _fake_numa_topology(instance_uuid):
+    cells = [objects.InstanceNUMACell(id=cell, cpuset=set([cell * 2,
+                                                           cell * 2 + 1]),
+                                      memory=1024, pagesize=None)
+             for cell in range(2)]
+    return objects.InstanceNUMATopology(instance_uuid=instance_uuid,
+                                        cells=cells)
+
+
+def _fake_pci_requests(instance_uuid):
+    request = objects.InstancePCIRequest(
+        count=1, spec=[{'vendor_id': '8086', 'product_id': '1520'}],
+        alias_name='nic', is_new=False, request_id=None)
+    return objects.InstancePCIRequests(instance_uuid=instance_uuid,
+                                       requests=[request])
+
+
+def _fake_network_info(index):
+    subnet = network_model.Subnet(
+        cidr='10.0.0.0/16',
+        gateway=network_model.IP(address='10.0.0.1', type='gateway'),
+        dns=[network_model.IP(address='8.8.8.8', type='dns')],
+        ips=[network_model.FixedIP(address='10.0.%d.%d' % (index // 256 % 256,
+                                                           index % 256))],
+        routes=[])
+    network = network_model.Network(id='net-0', bridge='br-int',
+                                    label='private', subnets=[subnet])
+    return network_model.NetworkInfo([network_model.VIF(
+        id='vif-%d' % index, address='fa:16:3e:00:00:%02x' % (index % 256),
+        network=network, type='ovs', devname='tap%d' % index)])
+
+
+def _fake_instance(ctxt, index):
+    instance_uuid = str(uuid.uuid4())
+    now = timeutils.utcnow()
+    instance = objects.Instance(
+        ctxt, id=index, uuid=instance_uuid, user_id='fake-user',
+        project_id='fake-project', host='compute-1', node='compute-1',
+        hostname='server-%d' % index, display_name='server-%d' % index,
+        image_ref=str(uuid.uuid4()), vm_state='active', task_state=None,
+        power_state=1, memory_mb=2048, vcpus=1, root_gb=20, ephemeral_gb=0,
+        instance_type_id=1, launched_at=now, created_at=now, updated_at=now,
+        deleted_at=None, deleted=False, availability_zone='nova',
+        metadata={'role': 'web'}, system_metadata={'image_os_type': 'linux'},
+        flavor=_fake_flavor(), old_flavor=None, new_flavor=None,
+        info_cache=objects.InstanceInfoCache(
+            instance_uuid=instance_uuid,
+            network_info=_fake_network_info(index)),
+        numa_topology=_fake_numa_topology(instance_uuid),
+        pci_requests=_fake_pci_requests(instance_uuid))
+    instance.obj_reset_changes(recursive=True)
+    return instance
+
+
+def _fake_request_spec(ctxt):
+    instance_uuid = str(uuid.uuid4())
+    image = objects.ImageMeta.from_dict({
+        'id': str(uuid.uuid4()), 'name': 'cirros', 'status': 'active',
+        'container_format': 'bare', 'disk_format': 'qcow2', 'size': 13267968,
+        'min_disk': 0, 'min_ram': 0,
+        'properties': {'hw_disk_bus': 'virtio', 'os_type': 'linux'}})
+    return objects.RequestSpec(
+        ctxt, id=1, instance_uuid=instance_uuid, image=image,
+        flavor=_fake_flavor(),
+        numa_topology=_fake_numa_topology(instance_uuid),
+        pci_requests=_fake_pci_requests(instance_uuid),
+        project_id='fake-project', availability_zone='nova',
+        num_instances=1, ignore_hosts=None, force_hosts=None,
+        force_nodes=None, retry=None,
+        limits=objects.SchedulerLimits(numa_topology=None, vcpu=16.0,
+                                       disk_gb=None, memory_mb=4096),
+        instance_group=None, scheduler_hints={'group': []})
+
+
+def _run(ctxt, obj, compact, repeat):
+    serializer = objects_base.NovaObjectSerializer()
+    serializer.compact = compact
+    primitive = serializer.serialize_entity(ctxt, obj)
+    message = jsonutils.dumps(primitive)
+    packed = len(msgpack.packb(primitive)) if msgpack else None
+
+    start = time.process_time()
+    for i in range(repeat):
+        jsonutils.dumps(serializer.serialize_entity(ctxt, obj))
+    serialize = time.process_time() - start
+
+    start = time.process_time()
+    for i in range(repeat):
+        serializer.deserialize_entity(ctxt, jsonutils.loads(message))
+    deserialize = time.process_time() - start
+    return len(message), packed, serialize / repeat, deserialize / repeat
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--instances', type=int, default=50,
+                        help='Number of instances in the instance list')
+    parser.add_argument('--repeat', type=int, default=100,
+                        help='Number of serializations timed per object')
+    args = parser.parse_args(argv)
+
+    objects.register_all()
+    ctxt = context.RequestContext('fake-user', 'fake-project')
+    instances = objects.InstanceList(
+        ctxt, objects=[_fake_instance(ctxt, i)
+                       for i in range(args.instances)])
+    cases = [('Instance', _fake_instance(ctxt, 0)),
+             ('InstanceList', instances),
+             ('RequestSpec', _fake_request_spec(ctxt))]
+
+    print('%-14s %-8s %10s %10s %16s %18s' % (
+        'object', 'form', 'json (B)', 'msgpack (B)', 'serialize (ms)',
+        'deserialize (ms)'))
+    for name, obj in cases:
+        for form, compact in (('full', False), ('compact', True)):
+            size, packed, serialize, deserialize = _run(ctxt, obj, compact,
+                                                        args.repeat)
+            print('%-14s %-8s %10d %10s %16.3f %18.3f' % (
+                name, form, size, packed if packed is not None else '-',
+                serialize * 1000, deserialize * 1000))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
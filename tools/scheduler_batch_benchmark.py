@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure how the FilterScheduler scales with the size of a request.
+
+Builds a synthetic fleet of host states in memory and times
+FilterScheduler._schedule() for multi-create requests of increasing size,
+with and without the scheduler_batch_placement option, e.g.:
+
+    tools/scheduler_batch_benchmark.py --hosts 5000 --sizes 1,10,100,500
+"""
+
+from __future__ import print_function
+
+import argparse
+import random
+import sys
+import time
+
+import mock
+from oslo_utils import uuidutils
+
+import nova.conf
+from nova import context as nova_context
+from nova import objects
+from nova import rpc
+from nova.scheduler import filter_scheduler
+from nova.scheduler import host_manager
+
+CONF = nova.conf.CONF
+CONF.import_opt('report_interval', 'nova.service')
+
+DEFAULT_FILTERS = 'RamFilter,CoreFilter,DiskFilter,NumInstancesFilter'
+
+
+def build_host_states(num_hosts, seed):
+    rand = random.Random(seed)
+    host_states = []
+    for i in range(num_hosts):
+        host_state = host_manager.HostState('host%d' % i, 'node%d' % i)
+        host_state.total_usable_ram_mb = 262144
+        host_state.free_ram_mb = rand.randint(0, 256) * 1024
+        host_state.total_usable_disk_gb = 4096
+        host_state.free_disk_mb = rand.randint(0, 4096) * 1024
+        host_state.vcpus_total = 64
+        host_state.vcpus_used = rand.randint(0, 64)
+        host_state.num_instances = rand.randint(0, 40)
+        host_state.ram_allocation_ratio = 1.5
+        host_state.cpu_allocation_ratio = 16.0
+        host_state.disk_allocation_ratio = 1.0
+        host_states.append(host_state)
+    return host_states
+
+
+def build_request_spec(num_instances):
+    return objects.RequestSpec(
+        num_instances=num_instances,
+        flavor=objects.Flavor(memory_mb=2048, root_gb=20, ephemeral_gb=0,
+                              swap=0, vcpus=2),
+        project_id='fake-project',
+        instance_uuid=uuidutils.generate_uuid(),
+        ignore_hosts=None,
+        force_hosts=None,
+        force_nodes=None,
+        pci_requests=None,
+        numa_topology=None,
+        instance_group=None)
+
+
+def time_request(scheduler, context, num_hosts, num_instances, seed):
+    host_states = build_host_states(num_hosts, seed)
+    spec_obj = build_request_spec(num_instances)
+    with mock.patch.object(scheduler, '_get_all_host_states',
+                           return_value=iter(host_states)):
+        start = time.time()
+        selected_hosts = scheduler._schedule(context, spec_obj)
+        elapsed = time.time() - start
+    return elapsed, len(selected_hosts)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hosts', type=int, default=1000,
+                        help='Number of hosts in the synthetic fleet.')
+    parser.add_argument('--sizes', default='1,10,50,100,500',
+                        help='Comma separated list of request sizes.')
+    parser.add_argument('--filters', default=DEFAULT_FILTERS,
+                        help='Comma separated list of filter class names.')
+    parser.add_argument('--subset-size', type=int, default=1,
+                        help='Value of scheduler_host_subset_size.')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the synthetic fleet generator.')
+    args = parser.parse_args(argv)
+
+    CONF([], project='nova')
+    objects.register_all()
+    CONF.set_override('scheduler_host_subset_size', args.subset_size)
+
+    # NOTE: The synthetic fleet replaces the database and the message bus.
+    with mock.patch.object(host_manager.HostManager, '_init_aggregates'), \
+            mock.patch.object(host_manager.HostManager,
+                              '_init_instance_info'), \
+            mock.patch.object(rpc, 'get_notifier'):
+        scheduler = filter_scheduler.FilterScheduler()
+    scheduler.host_manager.default_filters = (
+        scheduler.host_manager._choose_host_filters(args.filters.split(',')))
+    context = nova_context.get_admin_context()
+
+    print('%10s %12s %12s %8s' % ('instances', 'per-instance', 'batch',
+                                  'placed'))
+    for size in [int(size) for size in args.sizes.split(',')]:
+        results = []
+        for batch in (False, True):
+            CONF.set_override('scheduler_batch_placement', batch)
+            results.append(time_request(scheduler, context, args.hosts,
+                                        size, args.seed))
+        print('%10d %11.3fs %11.3fs %8d' % (size, results[0][0],
+                                             results[1][0], results[1][1]))
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
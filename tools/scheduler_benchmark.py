@@ -0,0 +1,349 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Offline throughput benchmark of the nova schedulers.
+
+Builds a synthetic fleet of compute services and nodes, with NUMA topologies,
+PCI device pools and availability zone aggregates, in an in-memory sqlite
+database. Then it drives select_destinations() of the FilterScheduler or the
+CachingScheduler with a mix of requests, and reports the requests per second,
+the p50/p99 latencies and the time spent in each filter and weigher, e.g.:
+
+    tools/scheduler_benchmark.py --hosts 5000 --requests 500 \\
+        --mix small=60,large=20,numa=10,pci=5,anti-affinity=5
+
+Nothing is persisted: the resources consumed by a request are only tracked in
+the host states of the scheduler, as they are between two compute node
+updates in a real deployment.
+"""
+
+from __future__ import print_function
+
+import argparse
+import random
+import sys
+import time
+
+import mock
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
+
+import nova.conf
+from nova import context as nova_context
+from nova.db.sqlalchemy import api as db_api
+from nova.db.sqlalchemy import models
+from nova import exception
+from nova import objects
+from nova import rpc
+from nova.scheduler import caching_scheduler
+from nova.scheduler import filter_scheduler
+from nova.virt import hardware
+
+CONF = nova.conf.CONF
+CONF.import_opt('report_interval', 'nova.service')
+
+SCHEDULERS = {
+    'filter_scheduler': filter_scheduler.FilterScheduler,
+    'caching_scheduler': caching_scheduler.CachingScheduler,
+}
+
+DEFAULT_FILTERS = ('RetryFilter,AvailabilityZoneFilter,RamFilter,DiskFilter,'
+                   'ComputeFilter,ComputeCapabilitiesFilter,'
+                   'ImagePropertiesFilter,ServerGroupAntiAffinityFilter,'
+                   'ServerGroupAffinityFilter,NUMATopologyFilter,'
+                   'PciPassthroughFilter')
+
+PCI_VENDOR_ID = '8086'
+PCI_PRODUCT_ID = '1520'
+
+# Flavor and request properties of each kind of request of the mix
+REQUEST_KINDS = {
+    'small': {'vcpus': 1, 'memory_mb': 2048, 'root_gb': 20},
+    'medium': {'vcpus': 2, 'memory_mb': 4096, 'root_gb': 40},
+    'large': {'vcpus': 8, 'memory_mb': 16384, 'root_gb': 160},
+    'numa': {'vcpus': 4, 'memory_mb': 4096, 'root_gb': 40,
+             'extra_specs': {'hw:numa_nodes': '2'}},
+    'pci': {'vcpus': 2, 'memory_mb': 4096, 'root_gb': 40, 'pci': True},
+    'multi': {'vcpus': 1, 'memory_mb': 2048, 'root_gb': 20,
+              'num_instances': 10},
+    'anti-affinity': {'vcpus': 1, 'memory_mb': 2048, 'root_gb': 20,
+                      'num_instances': 3, 'policy': 'anti-affinity'},
+    'affinity': {'vcpus': 1, 'memory_mb': 2048, 'root_gb': 20,
+                 'num_instances': 3, 'policy': 'affinity'},
+}
+
+
+def _numa_topology(vcpus, memory_mb):
+    cpus_per_cell = vcpus // 2
+    cells = []
+    for cell_id in range(2):
+        cpuset = set(range(cell_id * cpus_per_cell,
+                           (cell_id + 1) * cpus_per_cell))
+        cells.append(objects.NUMACell(
+            id=cell_id, cpuset=cpuset, memory=memory_mb // 2, cpu_usage=0,
+            memory_usage=0, mempages=[], siblings=[],
+            pinned_cpus=set()))
+    return objects.NUMATopology(cells=cells)._to_json()
+
+
+def _pci_stats(count):
+    pools = objects.PciDevicePoolList(objects=[objects.PciDevicePool(
+        vendor_id=PCI_VENDOR_ID, product_id=PCI_PRODUCT_ID, numa_node=0,
+        tags={'dev_type': 'type-PF'}, count=count)])
+    return jsonutils.dumps(pools.obj_to_primitive())
+
+
+def create_fleet(context, args, rand):
+    """Insert the services, compute nodes and aggregates of the fleet."""
+    now = timeutils.utcnow()
+    services = []
+    compute_nodes = []
+    for i in range(args.hosts):
+        host = 'compute%05d' % i
+        vcpus = rand.choice((16, 32, 48, 64))
+        memory_mb = rand.choice((65536, 131072, 262144))
+        local_gb = rand.choice((500, 1000, 2000))
+        vcpus_used = rand.randint(0, vcpus)
+        memory_mb_used = rand.randint(0, memory_mb // 1024) * 1024
+        local_gb_used = rand.randint(0, local_gb)
+        running_vms = rand.randint(0, 40)
+        services.append({
+            'id': i + 1, 'host': host, 'binary': 'nova-compute',
+            'topic': 'compute', 'report_count': 1, 'disabled': False,
+            'forced_down': False, 'version': 0, 'created_at': now,
+            'last_seen_up': now, 'deleted': 0})
+        compute_nodes.append({
+            'id': i + 1, 'service_id': i + 1, 'host': host,
+            'uuid': uuidutils.generate_uuid(),
+            'hypervisor_hostname': host, 'vcpus': vcpus,
+            'memory_mb': memory_mb, 'local_gb': local_gb,
+            'vcpus_used': vcpus_used, 'memory_mb_used': memory_mb_used,
+            'local_gb_used': local_gb_used,
+            'free_ram_mb': memory_mb - memory_mb_used,
+            'free_disk_gb': local_gb - local_gb_used,
+            'disk_available_least': local_gb - local_gb_used,
+            'current_workload': 0, 'running_vms': running_vms,
+            'hypervisor_type': 'QEMU', 'hypervisor_version': 2005000,
+            'cpu_info': '{}', 'host_ip': '10.0.%d.%d' % (i // 250,
+                                                         i % 250 + 1),
+            'supported_instances': jsonutils.dumps(
+                [['x86_64', 'qemu', 'hvm']]),
+            'metrics': '[]',
+            'stats': jsonutils.dumps({'num_instances': str(running_vms),
+                                      'io_workload': '0'}),
+            'numa_topology': (_numa_topology(vcpus, memory_mb)
+                              if rand.random() < args.numa_fraction
+                              else None),
+            'pci_stats': (_pci_stats(rand.randint(1, 8))
+                          if rand.random() < args.pci_fraction else None),
+            'cpu_allocation_ratio': 16.0, 'ram_allocation_ratio': 1.5,
+            'disk_allocation_ratio': 1.0, 'created_at': now, 'deleted': 0})
+
+    aggregates = []
+    aggregate_hosts = []
+    aggregate_metadata = []
+    for i in range(args.aggregates):
+        aggregates.append({'id': i + 1, 'uuid': uuidutils.generate_uuid(),
+                           'name': 'az%d' % i, 'created_at': now,
+                           'deleted': 0})
+        aggregate_metadata.append({'aggregate_id': i + 1,
+                                   'key': 'availability_zone',
+                                   'value': 'az%d' % i, 'created_at': now,
+                                   'deleted': 0})
+    if aggregates:
+        for service in services:
+            aggregate_hosts.append({
+                'aggregate_id': rand.randint(1, len(aggregates)),
+                'host': service['host'], 'created_at': now, 'deleted': 0})
+
+    engine = db_api.get_engine()
+    for model, rows in ((models.Service, services),
+                        (models.ComputeNode, compute_nodes),
+                        (models.Aggregate, aggregates),
+                        (models.AggregateMetadata, aggregate_metadata),
+                        (models.AggregateHost, aggregate_hosts)):
+        if rows:
+            engine.execute(model.__table__.insert(), rows)
+
+
+def parse_mix(mix):
+    kinds = []
+    weights = []
+    for item in mix.split(','):
+        kind, _sep, weight = item.partition('=')
+        if kind not in REQUEST_KINDS:
+            raise ValueError('Unknown request kind %s, valid kinds are: %s'
+                             % (kind, ', '.join(sorted(REQUEST_KINDS))))
+        kinds.append(kind)
+        weights.append(float(weight or 1))
+    return kinds, weights
+
+
+def build_request_spec(context, kind, args, rand):
+    props = REQUEST_KINDS[kind]
+    flavor = objects.Flavor(
+        id=1, flavorid=kind, name=kind, vcpus=props['vcpus'],
+        memory_mb=props['memory_mb'], root_gb=props['root_gb'],
+        ephemeral_gb=0, swap=0, rxtx_factor=1.0, vcpu_weight=0,
+        disabled=False, is_public=True,
+        extra_specs=dict(props.get('extra_specs', {})))
+    image = {'id': uuidutils.generate_uuid(),
+             'properties': {'hw_architecture': 'x86_64'}}
+    image_meta = objects.ImageMeta.from_dict(image)
+
+    pci_requests = None
+    if props.get('pci'):
+        pci_requests = objects.InstancePCIRequests(requests=[
+            objects.InstancePCIRequest(count=1, spec=[
+                {'vendor_id': PCI_VENDOR_ID,
+                 'product_id': PCI_PRODUCT_ID}])])
+
+    instance_group = None
+    if 'policy' in props:
+        instance_group = objects.InstanceGroup(
+            uuid=uuidutils.generate_uuid(), policies=[props['policy']],
+            members=[], hosts=[])
+
+    availability_zone = None
+    if args.aggregates and rand.random() < args.az_fraction:
+        availability_zone = 'az%d' % rand.randint(0, args.aggregates - 1)
+
+    spec_obj = objects.RequestSpec.from_components(
+        context, uuidutils.generate_uuid(), image, flavor,
+        hardware.numa_get_constraints(flavor, image_meta), pci_requests,
+        {}, instance_group, availability_zone)
+    spec_obj.num_instances = props.get('num_instances', 1)
+    return spec_obj
+
+
+def _percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    index = int(round(percent / 100.0 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def run(args):
+    rand = random.Random(args.seed)
+    kinds, weights = parse_mix(args.mix)
+    context = nova_context.get_admin_context()
+
+    start = time.time()
+    create_fleet(context, args, rand)
+    print('Created %d hosts in %.1fs' % (args.hosts, time.time() - start))
+
+    with mock.patch.object(rpc, 'get_notifier'):
+        scheduler = SCHEDULERS[args.scheduler]()
+    # NOTE: The fleet has no instances. Mark the instance info of all hosts
+    # as reported by the computes, as it is once they have synced, instead
+    # of querying the instances of each host for each request.
+    scheduler.host_manager._instance_info = {
+        'compute%05d' % i: {'instances': {}, 'updated': True}
+        for i in range(args.hosts)}
+    if args.scheduler == 'caching_scheduler':
+        scheduler.run_periodic_tasks(context)
+
+    latencies = []
+    failures = 0
+    placed = 0
+    start = time.time()
+    for i in range(args.requests):
+        kind = _weighted_choice(rand, kinds, weights)
+        spec_obj = build_request_spec(context, kind, args, rand)
+        request_start = time.time()
+        try:
+            placed += len(scheduler.select_destinations(context, spec_obj))
+        except exception.NoValidHost:
+            failures += 1
+        latencies.append(time.time() - request_start)
+    elapsed = time.time() - start
+
+    latencies.sort()
+    print('Scheduler: %s, hosts: %d, requests: %d, failed: %d, '
+          'instances placed: %d' % (args.scheduler, args.hosts,
+                                    args.requests, failures, placed))
+    print('Throughput: %.1f requests/s, latency p50: %.1fms, p99: %.1fms, '
+          'max: %.1fms' % (args.requests / elapsed,
+                           _percentile(latencies, 50) * 1000,
+                           _percentile(latencies, 99) * 1000,
+                           latencies[-1] * 1000 if latencies else 0.0))
+    print('Time spent per filter, weigher and host state loading:')
+    for line in scheduler.host_manager.timings.report():
+        print('  ' + line)
+
+
+def _weighted_choice(rand, kinds, weights):
+    threshold = rand.random() * sum(weights)
+    for kind, weight in zip(kinds, weights):
+        threshold -= weight
+        if threshold < 0:
+            return kind
+    return kinds[-1]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--hosts', type=int, default=1000,
+                        help='Number of compute nodes in the fleet.')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Number of select_destinations() calls.')
+    parser.add_argument('--mix', default='small=60,medium=20,large=10,'
+                                         'numa=5,pci=5',
+                        help='Comma separated list of kind=weight of the '
+                             'requests, where kind is one of: %s.' %
+                             ', '.join(sorted(REQUEST_KINDS)))
+    parser.add_argument('--scheduler', choices=sorted(SCHEDULERS),
+                        default='filter_scheduler',
+                        help='Scheduler driver to benchmark.')
+    parser.add_argument('--filters', default=DEFAULT_FILTERS,
+                        help='Comma separated list of filter class names.')
+    parser.add_argument('--numa-fraction', type=float, default=0.5,
+                        help='Fraction of the hosts with a NUMA topology.')
+    parser.add_argument('--pci-fraction', type=float, default=0.1,
+                        help='Fraction of the hosts with PCI devices.')
+    parser.add_argument('--aggregates', type=int, default=4,
+                        help='Number of availability zone aggregates.')
+    parser.add_argument('--az-fraction', type=float, default=0.2,
+                        help='Fraction of the requests asking for an '
+                             'availability zone.')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the fleet and request generators.')
+    parser.add_argument('--config-file', action='append', default=[],
+                        help='Nova configuration file to load, e.g. to '
+                             'enable scheduler options.')
+    args = parser.parse_args(argv)
+
+    config_args = []
+    for config_file in args.config_file:
+        config_args.extend(['--config-file', config_file])
+    CONF(config_args, project='nova')
+    CONF.set_override('connection', 'sqlite://', group='database')
+    CONF.set_override('sqlite_synchronous', False, group='database')
+    CONF.set_override('scheduler_default_filters', args.filters.split(','))
+    # The timings are only logged by the scheduler manager, which is not
+    # used here, so any interval enables them.
+    CONF.set_override('scheduler_timings_log_interval', 1)
+    objects.register_all()
+    db_api.configure(CONF)
+    # NOTE: Creating the tables from the models is much faster than running
+    # the migrations, and the fleet does not need the shadow tables.
+    models.BASE.metadata.create_all(db_api.get_engine())
+
+    run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))